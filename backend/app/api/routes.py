@@ -1,30 +1,56 @@
-from fastapi import APIRouter, Depends, UploadFile, File, HTTPException, status
+from __future__ import annotations
+
+from fastapi import APIRouter, BackgroundTasks, Depends, UploadFile, File, HTTPException, Query, Request, status
+from typing import TYPE_CHECKING, List
 from sqlalchemy.orm import Session
 from sqlalchemy import text
-from app.db.database import SessionLocal
+from app.db.database import AsyncReadSessionLocal, AsyncSessionLocal, ReadSessionLocal, SessionLocal
 from app.schemas.resume import ResumeCreate
 from app.services.resume_service import ResumeService
-from app.services.resume_parser import parse_pdf
-from app.services.resume_analyzer_service import ResumeAnalyzerService
+from app.services.resume_parser import parse_pdf_async, read_pdf_upload
+from sqlalchemy.exc import IntegrityError
+from app.services.resume_section_service import ResumeSectionService
+from app.services.resume_batch_service import ResumeBatchService
 from app.services.job_match_service import JobMatchService
+from app.services.job_match_search_service import JobMatchSearchService
 from app.services.job_service import JobService
 from app.schemas.job import JobCreate
 from app.services.skill_gap_service import SkillGapService
-from app.services.job_search_service import JobSearchService
-from elasticsearch import Elasticsearch
-from app.core.elasticsearch import get_es_client
+from app.services.job_search_service import JobSearchService, SEARCH_PROFILES, month_window_start
+from app.core.elasticsearch import get_async_es_client, get_es_client
 from app.services.resume_search_service import ResumeSearchService
+from app.services.alert_service import AlertService
+from app.services.job_dedup_service import JobDedupService
+from app.schemas.saved_search import SavedSearchCreate, SavedSearch as SavedSearchOut, JobAlert as JobAlertOut
+from app.services.suggest_service import SuggestService, SUGGEST_KINDS, TOP_K
+from app.services.skill_index_service import SkillIndexService
+from app.services.recommendation_service import RecommendationService
+from app.services import export_service
 import logging
 from fastapi import Header
 from app.services.user_service import UserService
 from app.schemas.user import UserCreate, UserOut, Token
-from app.core.security import create_access_token, decode_access_token, verify_password
-
+from app.core.security import (
+    PasswordHasherBusy,
+    create_access_token,
+    decode_access_token,
+    hash_password_async,
+    verify_and_update_async,
+)
+from app.core import admission, metrics, principal_cache, profiling
+from app.core.config import settings
+from starlette.concurrency import run_in_threadpool
+from app.core.principal_cache import Principal
+from app.core.profiling import ProfiledRoute
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from app.core.responses import ORJSONResponse
 
+if TYPE_CHECKING:
+    from elasticsearch import AsyncElasticsearch, Elasticsearch
+    from sqlalchemy.ext.asyncio import AsyncSession
 
 
-
-router = APIRouter(prefix="/api", tags=["api"])
+router = APIRouter(prefix="/api", tags=["api"], route_class=ProfiledRoute)
 
 
 def get_db():
@@ -35,7 +61,26 @@ def get_db():
         db.close()
 
 
-def get_current_user(authorization: str | None = Header(None), db: Session = Depends(get_db)):
+async def get_async_db():
+    async with AsyncSessionLocal() as db:
+        yield db
+
+
+def get_read_db():
+    """Session on the read replica for handlers that only query"""
+    db = ReadSessionLocal()
+    try:
+        yield db
+    finally:
+        db.close()
+
+
+async def get_async_read_db():
+    async with AsyncReadSessionLocal() as db:
+        yield db
+
+
+def get_current_user(authorization: str | None = Header(None)):
     if not authorization:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Missing Authorization header")
 
@@ -44,17 +89,70 @@ def get_current_user(authorization: str | None = Header(None), db: Session = Dep
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid Authorization header format")
 
     token = parts[1]
-    try:
-        payload = decode_access_token(token)
-        user_id = int(payload.get("user_id"))
-    except Exception:
-        raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
-
-    user = UserService.get_by_id(db, user_id)
-    if not user or not user.is_active:
+    principal = principal_cache.get(token)
+    if principal is None:
+        try:
+            payload = decode_access_token(token)
+            user_id = int(payload.get("user_id"))
+        except Exception:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="Invalid or expired token")
+
+        # only a cache miss touches the DB, so routes without their own queries never check out a connection
+        db = SessionLocal()
+        try:
+            user = UserService.get_by_id(db, user_id)
+        finally:
+            db.close()
+        if not user:
+            raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive")
+
+        principal = Principal(id=user.id, is_active=bool(user.is_active))
+        principal_cache.put(token, principal, expires_at=payload.get("exp"))
+
+    if not principal.is_active:
         raise HTTPException(status_code=status.HTTP_401_UNAUTHORIZED, detail="User not found or inactive")
 
-    return user
+    return principal
+
+
+async def _acquire_admission(endpoint_class: str, caller: str):
+    try:
+        await admission.acquire(endpoint_class, caller)
+    except admission.AdmissionRejected as e:
+        raise HTTPException(
+            status_code=e.status_code,
+            detail=f"Too many {endpoint_class} requests, retry shortly",
+            headers={"Retry-After": str(e.retry_after)},
+        )
+
+
+def admit(endpoint_class: str, authenticated: bool = True):
+    """Dependency holding an admission slot of ``endpoint_class`` for the rest of the request.
+
+    Callers are rate limited per user, or per client address when ``authenticated`` is False.
+    """
+    if authenticated:
+        async def dependency(current_user = Depends(get_current_user)):
+            await _acquire_admission(endpoint_class, f"user:{current_user.id}")
+            try:
+                yield
+            finally:
+                admission.release(endpoint_class)
+    else:
+        async def dependency(request: Request):
+            await _acquire_admission(endpoint_class, f"ip:{request.client.host if request.client else 'unknown'}")
+            try:
+                yield
+            finally:
+                admission.release(endpoint_class)
+
+    return dependency
+
+
+def require_admin(x_profile_token: str | None = Header(None)):
+    """Admin routes need the X-Profile-Token header to match PROFILE_ADMIN_TOKEN."""
+    if not profiling.is_admin_token(x_profile_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin token required")
 
 
 @router.get("/health")
@@ -63,6 +161,13 @@ def health_check():
     return {"status": "healthy", "message": "API is running"}
 
 
+@router.get("/health/startup")
+def startup_report(request: Request):
+    """How long each startup phase of this worker took"""
+    report = getattr(request.app.state, "startup_report", None)
+    return report.as_dict() if report else {"total_ms": None, "phases": []}
+
+
 @router.get("/health/full")
 def full_health(db: Session = Depends(get_db), es: Elasticsearch = Depends(get_es_client)):
     """Comprehensive health check for DB and Elasticsearch"""
@@ -75,6 +180,17 @@ def full_health(db: Session = Depends(get_db), es: Elasticsearch = Depends(get_e
         logging.exception("DB health check failed: %s", e)
         status_obj["db"] = False
 
+    if settings.DATABASE_REPLICA_URL != settings.DATABASE_URL:
+        status_obj["db_replica"] = True
+        replica = ReadSessionLocal()
+        try:
+            replica.execute(text("SELECT 1"))
+        except Exception as e:
+            logging.exception("DB replica health check failed: %s", e)
+            status_obj["db_replica"] = False
+        finally:
+            replica.close()
+
     # ES: ping
     try:
         if not es.ping():
@@ -84,15 +200,37 @@ def full_health(db: Session = Depends(get_db), es: Elasticsearch = Depends(get_e
 
     return {"status": status_obj}
 
-@router.post("/resumes/upload")
-def upload_resume(
+def _duplicate_upload_response(resume):
+    return {
+        "id": resume.id,
+        "filename": resume.filename,
+        "message": "Resume already uploaded",
+        "duplicate": True,
+        "analysis": {
+            "role": resume.role,
+            "skills": resume.skills,
+            "experience_years": resume.experience_years,
+        } if resume.skills is not None else None,
+    }
+
+
+@router.post("/resumes/upload", dependencies=[Depends(admit("upload"))])
+async def upload_resume(
     file: UploadFile = File(...),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
     current_user = Depends(get_current_user),
 ):
-    # Extract text from PDF
+    user_id = getattr(current_user, "id", 1)
+
+    # Identical bytes from the same user: reuse the stored resume and its analysis
+    data, file_sha256 = await read_pdf_upload(file)
+    existing = await ResumeService.get_by_hash_async(db, user_id, file_sha256)
+    if existing:
+        return _duplicate_upload_response(existing)
+
+    # Extract text from PDF in a worker process
     try:
-        text = parse_pdf(file)
+        text = await parse_pdf_async(data)
     except HTTPException:
         raise
     except Exception as e:
@@ -105,20 +243,125 @@ def upload_resume(
         content=text,
         skills=None,
         experience_years=None,
+        file_sha256=file_sha256,
     )
 
     # Save to DB with authenticated user
-    resume = ResumeService.create_resume(db=db, resume=resume_data, user_id=getattr(current_user, "id", 1))
+    try:
+        resume = await ResumeService.create_resume_async(db=db, resume=resume_data, user_id=user_id)
+    except IntegrityError:
+        # a concurrent upload of the same file won the unique index
+        await db.rollback()
+        return _duplicate_upload_response(await ResumeService.get_by_hash_async(db, user_id, file_sha256))
 
     return {
         "id": resume.id,
         "filename": resume.filename,
+        "version": resume.version,
         "message": "Resume uploaded successfully",
     }
-    
-@router.post("/resumes/{resume_id}/analyze")
+
+
+@router.post("/resumes/upload/batch", dependencies=[Depends(admit("upload"))])
+def upload_resumes_batch(
+    background_tasks: BackgroundTasks,
+    files: List[UploadFile] = File(..., description="PDF files and/or ZIP archives of PDFs"),
+    analyze: bool = Query(False, description="Queue AI analysis of the new resumes after the response is sent"),
+    db: Session = Depends(get_db),
+    current_user = Depends(get_current_user),
+):
+    user_id = getattr(current_user, "id", 1)
+    results = ResumeBatchService.upload(db, user_id, files)
+
+    created = [r["id"] for r in results if r["status"] == "created"]
+    if analyze and created:
+        background_tasks.add_task(_analyze_batch, created)
+
+    return {
+        "total": len(results),
+        "created": len(created),
+        "analysis_queued": analyze and bool(created),
+        "results": results,
+    }
+
+
+def _run_analysis(db: Session, es: Elasticsearch, resume):
+    previous_skills = list(resume.skills or [])
+    # only sections that changed since the user's earlier versions go to the LLM
+    analysis, section_stats = ResumeSectionService.analyze(db, resume)
+
+    ResumeService.update_analysis(
+        db=db,
+        resume_id=resume.id,
+        skills=analysis.skills,
+        experience_years=analysis.experience_years,
+        role=analysis.role,
+    )
+    SuggestService.update_skills(previous_skills, analysis.skills)
+
+    # 🔹 Index analyzed resume (safe & idempotent)
+    updated_resume = ResumeService.get_resume(db, resume.id)
+    SkillIndexService.add_resume(updated_resume)
+    try:
+        RecommendationService.recompute_for_resume(db, updated_resume)
+    except Exception as e:
+        db.rollback()
+        logging.exception("Recommendation feed update failed for resume %s: %s", resume.id, e)
+    try:
+        ResumeSearchService.create_index(es)
+        ResumeSearchService.index_resume(es, updated_resume)
+    except Exception as e:
+        logging.exception("Elasticsearch resume indexing failed: %s", e)
+
+    return analysis, section_stats
+
+
+def _analyze_batch(resume_ids: List[int]):
+    """Background task: analyze freshly batch-uploaded resumes one by one."""
+    db = SessionLocal()
+    try:
+        es = get_es_client()
+        for resume_id in resume_ids:
+            resume = ResumeService.get_resume(db, resume_id)
+            if resume is None or resume.skills is not None:
+                continue
+            try:
+                _run_analysis(db, es, resume)
+            except Exception as e:
+                db.rollback()
+                logging.exception("Background analysis of resume %s failed: %s", resume_id, e)
+    finally:
+        db.close()
+
+
+def _offer_job_to_feeds(job_id: int):
+    """Background task: add a new job to the feeds of resumes sharing one of its skills."""
+    db = SessionLocal()
+    try:
+        job = JobService.get_job(db, job_id)
+        if job is not None:
+            RecommendationService.on_job_created(db, job)
+    except Exception as e:
+        logging.exception("Recommendation fan-out for job %s failed: %s", job_id, e)
+    finally:
+        db.close()
+
+
+def _refill_feeds(resume_ids: List[int]):
+    """Background task: recompute feeds that lost an entry."""
+    db = SessionLocal()
+    try:
+        RecommendationService.recompute_many(db, resume_ids)
+    except Exception as e:
+        logging.exception("Recommendation refill failed: %s", e)
+    finally:
+        db.close()
+
+
+@router.post("/resumes/{resume_id}/analyze", dependencies=[Depends(admit("analyze"))])
 def analyze_resume(
     resume_id: int,
+    force: bool = Query(False, description="Re-run the AI analysis even if a stored one exists"),
     db: Session = Depends(get_db),
     es: Elasticsearch = Depends(get_es_client),
     current_user = Depends(get_current_user),
@@ -131,56 +374,104 @@ def analyze_resume(
     if getattr(current_user, "id", None) != getattr(resume, "user_id", None):
         raise HTTPException(status_code=403, detail="Not authorized to analyze this resume")
 
+    # content never changes after upload, so a stored analysis is still valid
+    if resume.skills is not None and not force:
+        return {
+            "resume_id": resume_id,
+            "role": resume.role,
+            "skills": resume.skills,
+            "experience_years": resume.experience_years,
+        }
+
     try:
-        analysis = ResumeAnalyzerService.analyze_resume(resume.content)
+        analysis, section_stats = _run_analysis(db, es, resume)
     except Exception as e:
         logging.exception("AI analysis failed: %s", e)
         raise HTTPException(status_code=500, detail=str(e))
 
-    ResumeService.update_analysis(db=db, resume_id=resume_id, skills=analysis.skills, experience_years=analysis.experience_years)
-
-    # 🔹 Index analyzed resume (safe & idempotent)
-    ResumeSearchService.create_index(es)
-    updated_resume = ResumeService.get_resume(db, resume_id)
-
-    try:
-        ResumeSearchService.create_index(es)
-        ResumeSearchService.index_resume(es, updated_resume)
-    except Exception as e:
-        logging.exception("Elasticsearch resume indexing failed: %s", e)
-
     return {
         "resume_id": resume_id,
         "role": analysis.role,
         "skills": analysis.skills,
         "experience_years": analysis.experience_years,
+        "sections": section_stats,
     }
 
+@router.get("/resumes/{resume_id}/recommendations")
+async def resume_recommendations(
+    resume_id: int,
+    limit: int = Query(20, ge=1, le=100),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user = Depends(get_current_user),
+):
+    """Precomputed "jobs for you" feed of a resume, best match first"""
+    resume = await ResumeService.get_resume_async(db, resume_id)
+    if not resume:
+        raise HTTPException(status_code=404, detail="Resume not found")
+    if current_user.id != resume.user_id:
+        raise HTTPException(status_code=403, detail="Not authorized to view this resume")
+
+    results = await RecommendationService.feed_async(db, resume_id, limit)
+    return ORJSONResponse({"resume_id": resume_id, "results": results})
+
+
 @router.post("/jobs")
 def create_job(
     job: JobCreate,
+    background_tasks: BackgroundTasks,
     db: Session = Depends(get_db),
     es: Elasticsearch = Depends(get_es_client),
     current_user = Depends(get_current_user),
 ):
+    signature = JobDedupService.signature_for(job.title, job.company, job.description)
+    duplicate = JobDedupService.find_duplicate(db, signature)
+    if duplicate:
+        duplicate_id, similarity = duplicate
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail={"message": "Near-duplicate of an existing job", "duplicate_of": duplicate_id, "similarity": similarity},
+        )
+
     JobSearchService.create_index(es)
     created_job = JobService.create_job(db, job, owner_id=getattr(current_user, "id", None))
+    JobDedupService.add(db, created_job.id, signature)
+    SuggestService.add_job(created_job)
+    SkillIndexService.add_job(created_job)
+    background_tasks.add_task(_offer_job_to_feeds, created_job.id)
 
     try:
         JobSearchService.index_job(es, created_job)
     except Exception as e:
         logging.exception("Elasticsearch job indexing failed: %s", e)
 
+    try:
+        AlertService.percolate_jobs(db, es, [created_job])
+    except Exception as e:
+        logging.exception("Job alert percolation failed: %s", e)
+
     return created_job
 
 
 @router.delete("/jobs/{job_id}")
-def delete_job(job_id: int, db: Session = Depends(get_db), es: Elasticsearch = Depends(get_es_client), current_user = Depends(get_current_user)):
+def delete_job(
+    job_id: int,
+    background_tasks: BackgroundTasks,
+    db: Session = Depends(get_db),
+    es: Elasticsearch = Depends(get_es_client),
+    current_user = Depends(get_current_user),
+):
     # ensure owner deletes
     deleted = JobService.delete_job_for_owner(db, job_id, getattr(current_user, "id", None))
     if not deleted:
         raise HTTPException(status_code=404, detail="Job not found or not owned by user")
 
+    JobDedupService.remove(db, job_id)
+    SuggestService.remove_job(deleted)
+    SkillIndexService.remove_job(job_id)
+    affected = RecommendationService.on_job_deleted(db, job_id)
+    if affected:
+        background_tasks.add_task(_refill_feeds, affected)
+
     try:
         JobSearchService.delete_job(es, job_id)
     except Exception:
@@ -189,51 +480,206 @@ def delete_job(job_id: int, db: Session = Depends(get_db), es: Elasticsearch = D
     return {"detail": "Job deleted"}
 
 
-@router.post("/admin/reindex/jobs")
-def reindex_jobs(db: Session = Depends(get_db), es: Elasticsearch = Depends(get_es_client), current_user = Depends(get_current_user)):
-    # Basic protection; in a real app check admin role
+@router.post("/saved-searches", response_model=SavedSearchOut)
+async def create_saved_search(
+    data: SavedSearchCreate,
+    db: AsyncSession = Depends(get_async_db),
+    es: AsyncElasticsearch = Depends(get_async_es_client),
+    current_user = Depends(get_current_user),
+):
+    if not (data.query or data.location or data.skills):
+        raise HTTPException(status_code=400, detail="A saved search needs a query, location or skills")
+
+    return await AlertService.create_saved_search_async(db, es, current_user.id, data)
+
+
+@router.get("/saved-searches", response_model=list[SavedSearchOut])
+async def list_saved_searches(db: AsyncSession = Depends(get_async_read_db), current_user = Depends(get_current_user)):
+    return await AlertService.list_saved_searches_async(db, current_user.id)
+
+
+@router.delete("/saved-searches/{saved_search_id}")
+async def delete_saved_search(
+    saved_search_id: int,
+    db: AsyncSession = Depends(get_async_db),
+    es: AsyncElasticsearch = Depends(get_async_es_client),
+    current_user = Depends(get_current_user),
+):
+    deleted = await AlertService.delete_saved_search_async(db, es, current_user.id, saved_search_id)
+    if not deleted:
+        raise HTTPException(status_code=404, detail="Saved search not found")
+
+    return {"detail": "Saved search deleted"}
+
+
+@router.get("/alerts", response_model=list[JobAlertOut])
+async def list_alerts(
+    after_id: int = 0,
+    limit: int = Query(50, ge=1, le=500),
+    db: AsyncSession = Depends(get_async_read_db),
+    current_user = Depends(get_current_user),
+):
+    """Job alerts newer than after_id; poll with the last id seen"""
+    return await AlertService.list_alerts_async(db, current_user.id, after_id=after_id, limit=limit)
+
+
+@router.post("/admin/reindex/jobs", dependencies=[Depends(require_admin), Depends(admit("admin"))])
+def reindex_jobs(
+    months: int | None = Query(None, ge=1, description="Only rebuild the partitions of the last N months"),
+    db: Session = Depends(get_read_db),
+    es: Elasticsearch = Depends(get_es_client),
+    current_user = Depends(get_current_user),
+):
+    """Rebuild the job partitions from the DB"""
     from app.models.job import Job as JobModel
-    jobs = db.query(JobModel).all()
+    jobs_query = db.query(JobModel)
+    if months:
+        jobs_query = jobs_query.filter(JobModel.created_at >= month_window_start(months))
+    jobs = jobs_query.all()
 
-    JobSearchService.reindex_all(es, jobs)
+    JobSearchService.reindex_all(es, jobs, months=months)
     return {"detail": "Reindex started", "jobs": len(jobs)}
 
 
-@router.post("/auth/register", response_model=UserOut)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    existing = UserService.get_by_email(db, user.email)
+@router.post("/admin/reindex/resumes", dependencies=[Depends(require_admin), Depends(admit("admin"))])
+def reindex_resumes(
+    db: Session = Depends(get_read_db),
+    es: Elasticsearch = Depends(get_es_client),
+    current_user = Depends(get_current_user),
+):
+    """Rebuild the resume index under the current mapping and swap the alias onto it"""
+    return {"detail": "Resumes reindexed", "resumes": ResumeSearchService.reindex_all(es, db)}
+
+
+@router.post("/admin/reindex/saved-searches", dependencies=[Depends(require_admin), Depends(admit("admin"))])
+def reindex_saved_searches(
+    db: Session = Depends(get_read_db),
+    es: Elasticsearch = Depends(get_es_client),
+    current_user = Depends(get_current_user),
+):
+    """Rewrite the stored percolator query of every saved search"""
+    return {"detail": "Saved searches reindexed", "saved_searches": AlertService.reindex_saved_searches(db, es)}
+
+
+@router.post("/admin/jobs/retention", dependencies=[Depends(require_admin), Depends(admit("admin"))])
+def apply_job_retention(es: Elasticsearch = Depends(get_es_client), current_user = Depends(get_current_user)):
+    """Roll the write alias to this month and age out old job partitions"""
+    JobSearchService.create_index(es)
+    return JobSearchService.apply_retention(es)
+
+
+@router.post("/admin/skill-index/rebuild", dependencies=[Depends(require_admin), Depends(admit("admin"))])
+def rebuild_skill_index(db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    """Write a new skill index generation; every worker maps it on its next refresh"""
+    return SkillIndexService.build(db)
+
+
+@router.post("/admin/recommendations/rebuild", dependencies=[Depends(require_admin), Depends(admit("admin"))])
+def rebuild_recommendations(db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    """Recompute every resume's recommendation feed in one batch"""
+    return RecommendationService.rebuild_all(db)
+
+
+@router.post("/admin/users/{user_id}/deactivate", response_model=UserOut, dependencies=[Depends(require_admin), Depends(admit("admin"))])
+def deactivate_user(user_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    """Reject the user's tokens, including ones this worker has cached"""
+    return _set_user_active(db, user_id, False)
+
+
+@router.post("/admin/users/{user_id}/activate", response_model=UserOut, dependencies=[Depends(require_admin), Depends(admit("admin"))])
+def activate_user(user_id: int, db: Session = Depends(get_db), current_user = Depends(get_current_user)):
+    """Let a deactivated user back in"""
+    return _set_user_active(db, user_id, True)
+
+
+def _set_user_active(db: Session, user_id: int, is_active: bool):
+    user = UserService.set_active(db, user_id, is_active)
+    if not user:
+        raise HTTPException(status_code=404, detail="User not found")
+    return user
+
+
+@router.get("/admin/profiles", dependencies=[Depends(require_admin)])
+def list_profiles():
+    """Recent request profiles, newest first"""
+    return {"profiles": profiling.list_profiles()}
+
+
+@router.get("/admin/profiles/{profile_id}", response_class=PlainTextResponse, dependencies=[Depends(require_admin)])
+def download_profile(profile_id: int):
+    """Collapsed stacks (flamegraph.pl / speedscope input) for one profile"""
+    profile = profiling.get_profile(profile_id)
+    if not profile:
+        raise HTTPException(status_code=404, detail="Profile not found")
+
+    return PlainTextResponse(
+        profile.collapsed(),
+        headers={"Content-Disposition": f'attachment; filename="profile-{profile_id}.collapsed"'},
+    )
+
+
+def _password_hasher_busy():
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Authentication is busy, retry shortly",
+        headers={"Retry-After": "1"},
+    )
+
+
+@router.post("/auth/register", response_model=UserOut, dependencies=[Depends(admit("auth", authenticated=False))])
+async def register(user: UserCreate, db: Session = Depends(get_db)):
+    existing = await run_in_threadpool(UserService.get_by_email, db, user.email)
     if existing:
         raise HTTPException(status_code=400, detail="Email already registered")
 
-    created = UserService.create_user(db, user)
+    try:
+        hashed = await hash_password_async(user.password)
+    except PasswordHasherBusy:
+        raise _password_hasher_busy()
+
+    created = await run_in_threadpool(UserService.create_user, db, user, hashed)
     return created
 
 
-@router.post("/auth/login", response_model=Token)
-def login(form_data: UserCreate, db: Session = Depends(get_db)):
-    user = UserService.get_by_email(db, form_data.email)
+@router.post("/auth/login", response_model=Token, dependencies=[Depends(admit("auth", authenticated=False))])
+async def login(form_data: UserCreate, db: Session = Depends(get_db)):
+    user = await run_in_threadpool(UserService.get_by_email, db, form_data.email)
     if not user:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
 
-    if not verify_password(form_data.password, user.hashed_password):
+    try:
+        valid, new_hash = await verify_and_update_async(form_data.password, user.hashed_password)
+    except PasswordHasherBusy:
+        raise _password_hasher_busy()
+    if not valid:
         raise HTTPException(status_code=400, detail="Incorrect email or password")
 
+    # the stored hash predates the current BCRYPT_ROUNDS policy
+    if new_hash:
+        await run_in_threadpool(UserService.update_password_hash, db, user.id, new_hash)
+
     access_token = create_access_token({"user_id": user.id})
     return {"access_token": access_token, "token_type": "bearer"}
 
 
+@router.get("/metrics", response_class=PlainTextResponse)
+def get_metrics():
+    """Process metrics in the Prometheus text exposition format"""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
 
 @router.get("/match/resume/{resume_id}/job/{job_id}")
-def match_resume_to_job(
+async def match_resume_to_job(
     resume_id: int,
     job_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    resume = ResumeService.get_resume(db, resume_id)
+    resume = await ResumeService.get_resume_async(db, resume_id)
     if not resume or not resume.skills:
         raise HTTPException(status_code=404, detail="Resume not found or not analyzed")
 
-    job = JobService.get_job(db, job_id)
+    job = await JobService.get_job_async(db, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
@@ -241,17 +687,42 @@ def match_resume_to_job(
     return result
 
 
+@router.get("/match/resume/{resume_id}/top-jobs")
+async def top_jobs_for_resume(
+    resume_id: int,
+    k: int = Query(10, ge=1, le=100),
+    location: str | None = None,
+    q: str | None = None,
+    include_archived: bool = False,
+    verify: bool = Query(False, description="Re-score results with the Python matcher and report mismatches"),
+    db: AsyncSession = Depends(get_async_read_db),
+    es: AsyncElasticsearch = Depends(get_async_es_client),
+):
+    """Best matching jobs for a resume, ranked in Elasticsearch with the JobMatchService formula"""
+    resume = await ResumeService.get_resume_async(db, resume_id)
+    if not resume or not resume.skills:
+        raise HTTPException(status_code=404, detail="Resume not found or not analyzed")
+
+    results = await JobMatchSearchService.top_jobs_async(
+        es, resume, k=k, location=location, query=q, include_archived=include_archived
+    )
+    response = {"resume_id": resume_id, "results": results}
+    if verify:
+        response["parity"] = await JobMatchSearchService.verify_parity_async(db, resume, results)
+    return ORJSONResponse(response)
+
+
 @router.get("/gap/resume/{resume_id}/job/{job_id}")
-def skill_gap_analysis(
+async def skill_gap_analysis(
     resume_id: int,
     job_id: int,
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_read_db),
 ):
-    resume = ResumeService.get_resume(db, resume_id)
+    resume = await ResumeService.get_resume_async(db, resume_id)
     if not resume or not resume.skills:
         raise HTTPException(status_code=404, detail="Resume not found or not analyzed")
 
-    job = JobService.get_job(db, job_id)
+    job = await JobService.get_job_async(db, job_id)
     if not job:
         raise HTTPException(status_code=404, detail="Job not found")
 
@@ -265,17 +736,24 @@ def skill_gap_analysis(
     }
 
 @router.get("/search/jobs")
-def search_jobs(
+async def search_jobs(
     q: str | None = None,
     location: str | None = None,
-    skills: list[str] | None = None,
+    skills: list[str] | None = Query(None),
     page: int = 1,
     size: int = 10,
     sort_by: str = "relevance",
     order: str = "desc",
-    es: Elasticsearch = Depends(get_es_client),
+    fields: str | None = Query(None, description="Comma separated _source fields to return, e.g. title,company"),
+    snippets: bool = True,
+    profile: str = Query("browse", description="Search profile: browse (fast, capped totals) or precise"),
+    include_archived: bool = Query(False, description="Also search postings older than JOB_SEARCH_RECENT_MONTHS"),
+    es: AsyncElasticsearch = Depends(get_async_es_client),
 ):
-    return JobSearchService.search(
+    if profile not in SEARCH_PROFILES:
+        raise HTTPException(status_code=400, detail=f"Unknown search profile. Use one of: {', '.join(SEARCH_PROFILES)}")
+
+    result = await JobSearchService.search_async(
         es=es,
         query=q,
         location=location,
@@ -284,13 +762,118 @@ def search_jobs(
         size=size,
         sort_by=sort_by,
         order=order,
+        fields=[f.strip() for f in fields.split(",") if f.strip()] if fields else None,
+        snippets=snippets,
+        profile=profile,
+        include_archived=include_archived,
+    )
+    # plain dicts from ES: skip jsonable_encoder and serialize straight to bytes
+    return ORJSONResponse(result)
+
+
+def _export_response(chunks, fmt: str, name: str) -> StreamingResponse:
+    return StreamingResponse(
+        chunks,
+        media_type=export_service.EXPORT_FORMATS[fmt],
+        headers={"Content-Disposition": f'attachment; filename="{name}.{fmt}"'},
     )
 
 
-    
+@router.get("/export/jobs", dependencies=[Depends(admit("export"))])
+async def export_jobs(
+    q: str | None = None,
+    location: str | None = None,
+    skills: list[str] | None = Query(None),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    limit: int | None = Query(None, ge=1, description="Stop after this many rows; all matches by default"),
+    include_archived: bool = False,
+    es: AsyncElasticsearch = Depends(get_async_es_client),
+    current_user = Depends(get_current_user),
+):
+    """Every job matching a search, streamed as NDJSON or CSV"""
+    rows = export_service.job_rows(es, q, location, skills, include_archived=include_archived, limit=limit)
+    chunks = await export_service.prime(export_service.encode(rows, format, export_service.JOB_EXPORT_COLUMNS))
+    return _export_response(chunks, format, "jobs")
+
+
+@router.get("/export/match/resume/{resume_id}", dependencies=[Depends(admit("export"))])
+async def export_resume_matches(
+    resume_id: int,
+    location: str | None = None,
+    q: str | None = None,
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    limit: int | None = Query(None, ge=1, description="Stop after this many rows; every candidate job by default"),
+    include_archived: bool = False,
+    es: AsyncElasticsearch = Depends(get_async_es_client),
+    current_user = Depends(get_current_user),
+):
+    """Match report: every job sharing a skill with the resume, best match first"""
+    # a short-lived session: the export can stream for minutes and shouldn't pin a connection
+    async with AsyncReadSessionLocal() as db:
+        resume = await ResumeService.get_resume_async(db, resume_id)
+    if not resume or not resume.skills:
+        raise HTTPException(status_code=404, detail="Resume not found or not analyzed")
 
-    
+    rows = export_service.match_rows(es, resume, location, q, include_archived=include_archived, limit=limit)
+    chunks = await export_service.prime(export_service.encode(rows, format, export_service.MATCH_EXPORT_COLUMNS))
+    return _export_response(chunks, format, f"resume-{resume_id}-matches")
 
 
+@router.get("/search/resumes")
+async def search_resumes(
+    q: str | None = None,
+    skills: list[str] | None = Query(None),
+    min_experience: float | None = Query(None, ge=0),
+    size: int = Query(20, ge=1, le=100),
+    search_after: str | None = Query(None, description="next_search_after from the previous page, comma separated"),
+    es: AsyncElasticsearch = Depends(get_async_es_client),
+    current_user = Depends(get_current_user),
+):
+    """Recruiter resume search ranked by requested-skill coverage, paged with search_after"""
+    cursor = None
+    if search_after:
+        try:
+            score, resume_id = search_after.split(",")
+            cursor = [float(score), int(resume_id)]
+        except ValueError:
+            raise HTTPException(status_code=400, detail="search_after must be '<score>,<resume_id>'")
+
+    result = await ResumeSearchService.search_async(
+        es=es,
+        query=q,
+        skills=skills,
+        min_experience=min_experience,
+        size=size,
+        search_after=cursor,
+    )
+    if result["next_search_after"]:
+        result["next_search_after"] = ",".join(str(v) for v in result["next_search_after"])
+    return ORJSONResponse(result)
+
 
-    
+@router.get("/suggest")
+def suggest(
+    prefix: str = Query(..., min_length=1),
+    kind: str = Query("skill", description="skill or title"),
+    limit: int = Query(TOP_K, ge=1, le=TOP_K),
+):
+    """Typeahead completions served from the in-memory prefix index"""
+    if kind not in SUGGEST_KINDS:
+        raise HTTPException(status_code=400, detail=f"Unknown suggestion kind. Use one of: {', '.join(SUGGEST_KINDS)}")
+
+    return ORJSONResponse({"prefix": prefix, "kind": kind, "suggestions": SuggestService.suggest(prefix, kind, limit)})
+
+
+@router.get("/search/jobs/facets")
+async def search_job_facets(
+    q: str | None = None,
+    location: str | None = None,
+    skills: list[str] | None = Query(None),
+    size: int = Query(20, ge=1, le=100),
+    include_archived: bool = False,
+    es: AsyncElasticsearch = Depends(get_async_es_client),
+):
+    """Skill, location and company facet counts for the same filters as /search/jobs"""
+    return ORJSONResponse(await JobSearchService.facets_async(
+        es=es, query=q, location=location, skills=skills, size=size, include_archived=include_archived
+    ))
@@ -0,0 +1,233 @@
+import asyncio
+import math
+import time
+from collections import deque
+from typing import Deque, Dict, NamedTuple, Optional
+
+from app.core import metrics
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# Admission control for expensive endpoint classes. A request first has to get a token from
+# its caller's bucket and from the class-wide bucket (429 otherwise), then a concurrency slot;
+# when all slots are busy it waits in a bounded queue for at most the class's queue timeout
+# (503 otherwise). Everything runs on the event loop, before a sync route is handed to the
+# threadpool, so shed requests never occupy a worker thread.
+
+metrics.describe("admission_admitted_total", "counter", "Requests admitted per endpoint class")
+metrics.describe("admission_rejected_total", "counter", "Requests shed per endpoint class and reason")
+metrics.describe("admission_active", "gauge", "Requests holding a concurrency slot")
+metrics.describe("admission_queued", "gauge", "Requests waiting for a concurrency slot")
+metrics.describe("admission_queue_wait_seconds_total", "counter", "Time admitted requests spent waiting for a slot")
+metrics.describe("admission_concurrency_limit", "gauge", "Configured concurrency slots per endpoint class")
+metrics.describe("admission_queue_limit", "gauge", "Configured wait queue length per endpoint class")
+
+
+class AdmissionRejected(Exception):
+    """Base for requests shed by admission control; ``retry_after`` is in whole seconds."""
+
+    status_code = 503
+
+    def __init__(self, endpoint_class: str, reason: str, retry_after: int):
+        super().__init__(f"{endpoint_class}: {reason}")
+        self.endpoint_class = endpoint_class
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class RateLimited(AdmissionRejected):
+    status_code = 429
+
+
+class Overloaded(AdmissionRejected):
+    status_code = 503
+
+
+class ClassLimits(NamedTuple):
+    max_concurrent: int
+    queue_size: int
+    queue_timeout: float
+    # requests per second across all callers, and per minute for one caller; 0 disables
+    rate_per_second: float
+    user_rate_per_minute: float
+
+
+ENDPOINT_CLASSES: Dict[str, ClassLimits] = {
+    "upload": ClassLimits(
+        settings.ADMISSION_UPLOAD_CONCURRENCY,
+        settings.ADMISSION_UPLOAD_QUEUE_SIZE,
+        settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        settings.ADMISSION_UPLOAD_RATE_PER_SECOND,
+        settings.ADMISSION_UPLOAD_USER_RATE_PER_MINUTE,
+    ),
+    "analyze": ClassLimits(
+        settings.ADMISSION_ANALYZE_CONCURRENCY,
+        settings.ADMISSION_ANALYZE_QUEUE_SIZE,
+        settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        settings.ADMISSION_ANALYZE_RATE_PER_SECOND,
+        settings.ADMISSION_ANALYZE_USER_RATE_PER_MINUTE,
+    ),
+    "auth": ClassLimits(
+        settings.ADMISSION_AUTH_CONCURRENCY,
+        settings.ADMISSION_AUTH_QUEUE_SIZE,
+        settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        settings.ADMISSION_AUTH_RATE_PER_SECOND,
+        settings.ADMISSION_AUTH_USER_RATE_PER_MINUTE,
+    ),
+    # held for the whole streamed response
+    "export": ClassLimits(
+        settings.ADMISSION_EXPORT_CONCURRENCY,
+        settings.ADMISSION_EXPORT_QUEUE_SIZE,
+        settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        0.0,
+        settings.ADMISSION_EXPORT_USER_RATE_PER_MINUTE,
+    ),
+    "admin": ClassLimits(
+        settings.ADMISSION_ADMIN_CONCURRENCY,
+        settings.ADMISSION_ADMIN_QUEUE_SIZE,
+        settings.ADMISSION_QUEUE_TIMEOUT_SECONDS,
+        0.0,
+        settings.ADMISSION_ADMIN_USER_RATE_PER_MINUTE,
+    ),
+}
+
+
+class TokenBucket:
+    def __init__(self, rate: float, capacity: float):
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = capacity
+        self.updated = time.monotonic()
+
+    def take(self) -> float:
+        """Take a token; returns 0 on success, otherwise the seconds until one is available."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    def refund(self) -> None:
+        self.tokens = min(self.capacity, self.tokens + 1)
+
+
+class _Gate:
+    """Concurrency slots with a bounded FIFO of waiters. Only touched from the event loop."""
+
+    def __init__(self, name: str, limits: ClassLimits):
+        self.name = name
+        self.limits = limits
+        self.active = 0
+        self.waiters: Deque[asyncio.Future] = deque()
+
+    def _gauges(self) -> None:
+        metrics.set_gauge("admission_active", self.active, endpoint_class=self.name)
+        metrics.set_gauge("admission_queued", len(self.waiters), endpoint_class=self.name)
+
+    async def acquire(self) -> None:
+        if self.active < self.limits.max_concurrent and not self.waiters:
+            self.active += 1
+            self._gauges()
+            return
+
+        if len(self.waiters) >= self.limits.queue_size:
+            raise Overloaded(self.name, "queue_full", self._retry_after())
+
+        waiter = asyncio.get_running_loop().create_future()
+        self.waiters.append(waiter)
+        self._gauges()
+        queued_at = time.perf_counter()
+        try:
+            await asyncio.wait_for(waiter, self.limits.queue_timeout)
+        except BaseException as e:
+            if waiter.done() and not waiter.cancelled():
+                # the slot was handed over just as we gave up; pass it on
+                self.release()
+            elif waiter in self.waiters:
+                self.waiters.remove(waiter)
+            self._gauges()
+            if isinstance(e, asyncio.TimeoutError):
+                raise Overloaded(self.name, "queue_timeout", self._retry_after())
+            raise
+        metrics.inc("admission_queue_wait_seconds_total", time.perf_counter() - queued_at, endpoint_class=self.name)
+
+    def release(self) -> None:
+        # hand the slot straight to the oldest live waiter, so newcomers can't jump the queue
+        while self.waiters:
+            waiter = self.waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                self._gauges()
+                return
+        self.active -= 1
+        self._gauges()
+
+    def _retry_after(self) -> int:
+        return max(1, math.ceil(self.limits.queue_timeout))
+
+
+_gates: Dict[str, _Gate] = {}
+_class_buckets: Dict[str, TokenBucket] = {}
+# (endpoint class, caller) -> bucket; idle callers age out and come back with a full bucket
+_caller_buckets = TTLCache(maxsize=settings.ADMISSION_CALLER_BUCKETS, ttl=600)
+
+for _name, _limits in ENDPOINT_CLASSES.items():
+    _gates[_name] = _Gate(_name, _limits)
+    if _limits.rate_per_second > 0:
+        _class_buckets[_name] = TokenBucket(
+            _limits.rate_per_second, max(1.0, _limits.rate_per_second * settings.ADMISSION_BURST_SECONDS)
+        )
+    metrics.set_gauge("admission_concurrency_limit", _limits.max_concurrent, endpoint_class=_name)
+    metrics.set_gauge("admission_queue_limit", _limits.queue_size, endpoint_class=_name)
+
+
+def _caller_bucket(endpoint_class: str, caller: str) -> Optional[TokenBucket]:
+    per_minute = ENDPOINT_CLASSES[endpoint_class].user_rate_per_minute
+    if per_minute <= 0:
+        return None
+    return _caller_buckets.get_or_set(
+        (endpoint_class, caller),
+        lambda: TokenBucket(per_minute / 60.0, max(1.0, float(settings.ADMISSION_USER_BURST))),
+    )
+
+
+def _reject(error: AdmissionRejected) -> AdmissionRejected:
+    metrics.inc("admission_rejected_total", endpoint_class=error.endpoint_class, reason=error.reason)
+    return error
+
+
+async def acquire(endpoint_class: str, caller: str) -> None:
+    """Admit one request of ``endpoint_class`` for ``caller`` or raise an AdmissionRejected.
+
+    Every successful call must be paired with release(endpoint_class).
+    """
+    if not settings.ADMISSION_ENABLED:
+        return
+
+    caller_bucket = _caller_bucket(endpoint_class, caller)
+    if caller_bucket is not None:
+        wait = caller_bucket.take()
+        if wait:
+            raise _reject(RateLimited(endpoint_class, "user_rate", math.ceil(wait)))
+
+    class_bucket = _class_buckets.get(endpoint_class)
+    if class_bucket is not None:
+        wait = class_bucket.take()
+        if wait:
+            if caller_bucket is not None:
+                caller_bucket.refund()
+            raise _reject(RateLimited(endpoint_class, "class_rate", math.ceil(wait)))
+
+    try:
+        await _gates[endpoint_class].acquire()
+    except AdmissionRejected as e:
+        raise _reject(e)
+    metrics.inc("admission_admitted_total", endpoint_class=endpoint_class)
+
+
+def release(endpoint_class: str) -> None:
+    if settings.ADMISSION_ENABLED:
+        _gates[endpoint_class].release()
+
@@ -1,6 +1,7 @@
 from dotenv import load_dotenv
 import os
 import socket
+from functools import cached_property
 from typing import Optional
 from urllib.parse import urlparse, urlunparse
 
@@ -36,59 +37,208 @@ def _is_host_reachable(host: str, port: int, timeout_sec: float = 0.4) -> bool:
         return False
 
 
-class Settings:
-    APP_NAME: str = os.getenv("APP_NAME", "AI Resume Analyzer & Job Matcher")
-    ENV: str = os.getenv("ENV", "development")
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.getenv(name, str(default)))
+    except ValueError:
+        raise ValueError(f"{name} must be an integer")
+
+
+def _env_float(name: str, default: float) -> float:
+    try:
+        return float(os.getenv(name, str(default)))
+    except ValueError:
+        raise ValueError(f"{name} must be a number")
+
 
+def _resolve_database_url(env: str, name: str = "DATABASE_URL") -> str:
     # Provide a sensible default for local development (sqlite file)
-    DATABASE_URL: str = os.getenv("DATABASE_URL")
-    if not DATABASE_URL:
-        if ENV == "production":
-            raise ValueError("DATABASE_URL environment variable is not set")
+    url = os.getenv(name)
+    if not url:
+        if env == "production":
+            raise ValueError(f"{name} environment variable is not set")
         # development fallback
-        DATABASE_URL = f"sqlite:///./{os.getenv('DB_FILENAME','dev.db')}"
+        url = f"sqlite:///./{os.getenv('DB_FILENAME','dev.db')}"
 
-    # Normalize DATABASE_URL: if credentials contain extra '@' (e.g., in password),
+    # Normalize the URL: if credentials contain extra '@' (e.g., in password),
     # URL-encode those '@' characters so SQLAlchemy can parse the URL.
     try:
-        if "@" in DATABASE_URL:
-            scheme_split = DATABASE_URL.split("://", 1)
+        if "@" in url:
+            scheme_split = url.split("://", 1)
             if len(scheme_split) == 2:
                 scheme, rest = scheme_split
                 # If more than one '@' in the rest, then password likely contains '@'
                 if rest.count("@") > 1:
                     creds, host_part = rest.rsplit("@", 1)
                     safe_creds = creds.replace("@", "%40")
-                    DATABASE_URL = f"{scheme}://{safe_creds}@{host_part}"
+                    url = f"{scheme}://{safe_creds}@{host_part}"
     except Exception:
         # If normalization fails, keep the original URL and let engine raise a clear error later
         pass
 
     # Local host mapping: Docker service names won't resolve when backend runs directly on host OS.
-    if ENV != "production" and not _is_running_in_docker():
-        DATABASE_URL = _replace_hostname(DATABASE_URL, "resume_postgres", "localhost")
+    if env != "production" and not _is_running_in_docker():
+        url = _replace_hostname(url, "resume_postgres", "localhost")
 
-    if ENV != "production":
-        parsed_db_url = urlparse(DATABASE_URL)
+    if env != "production":
+        parsed_db_url = urlparse(url)
         if parsed_db_url.scheme.startswith("postgresql"):
             db_host = parsed_db_url.hostname or "localhost"
             db_port = parsed_db_url.port or 5432
             if not _is_host_reachable(db_host, db_port):
-                DATABASE_URL = f"sqlite:///./{os.getenv('DB_FILENAME','dev.db')}"
+                url = f"sqlite:///./{os.getenv('DB_FILENAME','dev.db')}"
+
+    return url
+
+
+def _resolve_elasticsearch_url(env: str) -> str:
+    url = os.getenv("ELASTICSEARCH_URL", "http://localhost:9200")
+    if env != "production" and not _is_running_in_docker():
+        url = _replace_hostname(url, "resume_elasticsearch", "localhost")
+    return url
+
+
+class Settings:
+    APP_NAME: str = os.getenv("APP_NAME", "AI Resume Analyzer & Job Matcher")
+    ENV: str = os.getenv("ENV", "development")
 
     # For production require a JWT secret; for development use a default but warn
     JWT_SECRET_KEY: str | None = os.getenv("JWT_SECRET_KEY")
     if not JWT_SECRET_KEY:
         raise ValueError("JWT_SECRET_KEY environment variable is not set")
     
+    JWT_ALGORITHM: str = os.getenv("JWT_ALGORITHM", "HS256")
+
     try:
         JWT_EXPIRE_MINUTES: int = int(os.getenv("JWT_EXPIRE_MINUTES", "60"))
     except ValueError:
        raise ValueError("JWT_EXPIRE_MINUTES must be an integer")
 
     GEMINI_API_KEY: Optional[str] = os.getenv("GEMINI_API_KEY")
-    ELASTICSEARCH_URL: str = os.getenv("ELASTICSEARCH_URL", "http://localhost:9200")
-    if ENV != "production" and not _is_running_in_docker():
-        ELASTICSEARCH_URL = _replace_hostname(ELASTICSEARCH_URL, "resume_elasticsearch", "localhost")
+
+    # Connection URLs are resolved on first use (normally during startup) rather than at
+    # import: in development the database host is probed and may fall back to SQLite.
+    @cached_property
+    def DATABASE_URL(self) -> str:
+        return _resolve_database_url(self.ENV)
+
+    # Read-only traffic goes here; unset means the primary (a single database, or tests).
+    @cached_property
+    def DATABASE_REPLICA_URL(self) -> str:
+        if not os.getenv("DATABASE_REPLICA_URL"):
+            return self.DATABASE_URL
+        return _resolve_database_url(self.ENV, "DATABASE_REPLICA_URL")
+
+    @cached_property
+    def ELASTICSEARCH_URL(self) -> str:
+        return _resolve_elasticsearch_url(self.ENV)
+
+    # Connection pool per engine (primary and replica each get one, per worker process).
+    # Ignored for SQLite.
+    DB_POOL_SIZE: int = _env_int("DB_POOL_SIZE", 5)
+    DB_MAX_OVERFLOW: int = _env_int("DB_MAX_OVERFLOW", 10)
+    DB_POOL_RECYCLE: int = _env_int("DB_POOL_RECYCLE", 1800)
+    DB_POOL_TIMEOUT: float = _env_float("DB_POOL_TIMEOUT", 30.0)
+
+    # Request tracing: "none" disables it, "file" appends JSON lines, "otlp" posts OTLP/HTTP JSON.
+    TRACE_EXPORTER: str = os.getenv("TRACE_EXPORTER", "none").lower()
+    TRACE_SAMPLE_RATE: float = _env_float("TRACE_SAMPLE_RATE", 0.1)
+    TRACE_EXPORT_PATH: str = os.getenv("TRACE_EXPORT_PATH", "traces.jsonl")
+    TRACE_OTLP_ENDPOINT: str = os.getenv("TRACE_OTLP_ENDPOINT", "http://localhost:4318/v1/traces")
+    TRACE_MAX_SPANS: int = _env_int("TRACE_MAX_SPANS", 256)
+    TRACE_EXPORT_QUEUE_SIZE: int = _env_int("TRACE_EXPORT_QUEUE_SIZE", 1000)
+
+    # Responses at least this many bytes are gzip-compressed when the client accepts it.
+    GZIP_MIN_SIZE: int = _env_int("GZIP_MIN_SIZE", 1024)
+    GZIP_LEVEL: int = _env_int("GZIP_LEVEL", 6)
+
+    # Search facet aggregations are memoized per filter set for a short time.
+    FACET_CACHE_TTL_SECONDS: float = _env_float("FACET_CACHE_TTL_SECONDS", 30.0)
+    FACET_CACHE_SIZE: int = _env_int("FACET_CACHE_SIZE", 512)
+
+    # Monthly job partitions: searches hit the recent ones by default, old ones are
+    # made read-only with no replicas, then deleted. Partitions inside the default search
+    # window are never made read-only, whatever JOB_WARM_AFTER_MONTHS says.
+    JOB_SEARCH_RECENT_MONTHS: int = _env_int("JOB_SEARCH_RECENT_MONTHS", 6)
+    JOB_WARM_AFTER_MONTHS: int = _env_int("JOB_WARM_AFTER_MONTHS", 3)
+    JOB_RETENTION_MONTHS: int = _env_int("JOB_RETENTION_MONTHS", 24)
+
+    # Near-duplicate job postings (estimated Jaccard similarity of shingles) are rejected at ingest.
+    JOB_DEDUP_ENABLED: bool = os.getenv("JOB_DEDUP_ENABLED", "true").lower() == "true"
+    JOB_DEDUP_THRESHOLD: float = _env_float("JOB_DEDUP_THRESHOLD", 0.8)
+
+    # PDF parsing for uploads runs in a process pool sized to the CPU count by default.
+    BATCH_UPLOAD_WORKERS: int = _env_int("BATCH_UPLOAD_WORKERS", os.cpu_count() or 1)
+    BATCH_UPLOAD_MAX_FILES: int = _env_int("BATCH_UPLOAD_MAX_FILES", 500)
+
+    # Memory-mapped skill index shared by all workers. Generations are swapped in by every
+    # worker within SKILL_INDEX_REFRESH_SECONDS. A worker rebuilds in the background once the
+    # live generation is SKILL_INDEX_REBUILD_SECONDS old (0 disables) or its in-memory delta
+    # reaches SKILL_INDEX_MAX_DELTA entries. Entries are only dropped once a generation
+    # containing them is mapped, so a delta twice that size is logged as builds falling behind.
+    SKILL_INDEX_DIR: str = os.getenv("SKILL_INDEX_DIR", "skill_index")
+    SKILL_INDEX_REFRESH_SECONDS: float = _env_float("SKILL_INDEX_REFRESH_SECONDS", 5.0)
+    SKILL_INDEX_KEEP_GENERATIONS: int = _env_int("SKILL_INDEX_KEEP_GENERATIONS", 2)
+    SKILL_INDEX_REBUILD_SECONDS: float = _env_float("SKILL_INDEX_REBUILD_SECONDS", 3600.0)
+    SKILL_INDEX_MAX_DELTA: int = _env_int("SKILL_INDEX_MAX_DELTA", 10000)
+    SKILL_INDEX_BUILD_LOCK_SECONDS: float = _env_float("SKILL_INDEX_BUILD_LOCK_SECONDS", 900.0)
+
+    # Responses to requests sent with an Idempotency-Key are replayed to retries for the TTL.
+    # Duplicates of a running request wait up to IDEMPOTENCY_WAIT_SECONDS for its result; a
+    # claim older than IDEMPOTENCY_LOCK_SECONDS is considered abandoned.
+    IDEMPOTENCY_TTL_SECONDS: int = _env_int("IDEMPOTENCY_TTL_SECONDS", 86400)
+    IDEMPOTENCY_LOCK_SECONDS: int = _env_int("IDEMPOTENCY_LOCK_SECONDS", 120)
+    IDEMPOTENCY_WAIT_SECONDS: float = _env_float("IDEMPOTENCY_WAIT_SECONDS", 30.0)
+
+    # Streaming exports fetch this many hits per search_after page.
+    EXPORT_PAGE_SIZE: int = _env_int("EXPORT_PAGE_SIZE", 1000)
+
+    # Precomputed "jobs for you" feeds: entries kept per resume, and skill-index candidates
+    # rescored when a single resume's feed is recomputed.
+    RECOMMENDATION_TOP_K: int = _env_int("RECOMMENDATION_TOP_K", 20)
+    RECOMMENDATION_CANDIDATES: int = _env_int("RECOMMENDATION_CANDIDATES", 500)
+
+    # Decoded-token cache for authenticated requests. Deactivation evicts immediately in the
+    # process that handled it; other workers pick it up within the TTL.
+    PRINCIPAL_CACHE_TTL_SECONDS: float = _env_float("PRINCIPAL_CACHE_TTL_SECONDS", 60.0)
+    PRINCIPAL_CACHE_SIZE: int = _env_int("PRINCIPAL_CACHE_SIZE", 10000)
+
+    # Password hashing runs on its own executor; requests beyond workers + queue get a 503.
+    BCRYPT_ROUNDS: int = _env_int("BCRYPT_ROUNDS", 12)
+    PASSWORD_HASH_WORKERS: int = _env_int("PASSWORD_HASH_WORKERS", 2)
+    PASSWORD_HASH_QUEUE_SIZE: int = _env_int("PASSWORD_HASH_QUEUE_SIZE", 32)
+
+    # Admission control for expensive endpoint classes: concurrency slots with a bounded wait
+    # queue (503 when full or after the queue timeout) and token buckets per class and per
+    # caller (429). Rates of 0 disable the bucket.
+    ADMISSION_ENABLED: bool = os.getenv("ADMISSION_ENABLED", "true").lower() == "true"
+    ADMISSION_QUEUE_TIMEOUT_SECONDS: float = _env_float("ADMISSION_QUEUE_TIMEOUT_SECONDS", 2.0)
+    ADMISSION_BURST_SECONDS: float = _env_float("ADMISSION_BURST_SECONDS", 2.0)
+    ADMISSION_USER_BURST: int = _env_int("ADMISSION_USER_BURST", 5)
+    ADMISSION_CALLER_BUCKETS: int = _env_int("ADMISSION_CALLER_BUCKETS", 10000)
+    ADMISSION_UPLOAD_CONCURRENCY: int = _env_int("ADMISSION_UPLOAD_CONCURRENCY", 4)
+    ADMISSION_UPLOAD_QUEUE_SIZE: int = _env_int("ADMISSION_UPLOAD_QUEUE_SIZE", 16)
+    ADMISSION_UPLOAD_RATE_PER_SECOND: float = _env_float("ADMISSION_UPLOAD_RATE_PER_SECOND", 10.0)
+    ADMISSION_UPLOAD_USER_RATE_PER_MINUTE: float = _env_float("ADMISSION_UPLOAD_USER_RATE_PER_MINUTE", 30.0)
+    ADMISSION_ANALYZE_CONCURRENCY: int = _env_int("ADMISSION_ANALYZE_CONCURRENCY", 4)
+    ADMISSION_ANALYZE_QUEUE_SIZE: int = _env_int("ADMISSION_ANALYZE_QUEUE_SIZE", 8)
+    ADMISSION_ANALYZE_RATE_PER_SECOND: float = _env_float("ADMISSION_ANALYZE_RATE_PER_SECOND", 2.0)
+    ADMISSION_ANALYZE_USER_RATE_PER_MINUTE: float = _env_float("ADMISSION_ANALYZE_USER_RATE_PER_MINUTE", 10.0)
+    ADMISSION_AUTH_CONCURRENCY: int = _env_int("ADMISSION_AUTH_CONCURRENCY", 8)
+    ADMISSION_AUTH_QUEUE_SIZE: int = _env_int("ADMISSION_AUTH_QUEUE_SIZE", 32)
+    ADMISSION_AUTH_RATE_PER_SECOND: float = _env_float("ADMISSION_AUTH_RATE_PER_SECOND", 20.0)
+    ADMISSION_AUTH_USER_RATE_PER_MINUTE: float = _env_float("ADMISSION_AUTH_USER_RATE_PER_MINUTE", 20.0)
+    ADMISSION_EXPORT_CONCURRENCY: int = _env_int("ADMISSION_EXPORT_CONCURRENCY", 4)
+    ADMISSION_EXPORT_QUEUE_SIZE: int = _env_int("ADMISSION_EXPORT_QUEUE_SIZE", 0)
+    ADMISSION_EXPORT_USER_RATE_PER_MINUTE: float = _env_float("ADMISSION_EXPORT_USER_RATE_PER_MINUTE", 6.0)
+    ADMISSION_ADMIN_CONCURRENCY: int = _env_int("ADMISSION_ADMIN_CONCURRENCY", 1)
+    ADMISSION_ADMIN_QUEUE_SIZE: int = _env_int("ADMISSION_ADMIN_QUEUE_SIZE", 0)
+    ADMISSION_ADMIN_USER_RATE_PER_MINUTE: float = _env_float("ADMISSION_ADMIN_USER_RATE_PER_MINUTE", 2.0)
+
+    # On-demand profiling: a fraction of requests, plus any request carrying X-Profile-Token.
+    PROFILE_SAMPLE_RATE: float = _env_float("PROFILE_SAMPLE_RATE", 0.0)
+    PROFILE_ADMIN_TOKEN: Optional[str] = os.getenv("PROFILE_ADMIN_TOKEN")
+    PROFILE_INTERVAL_MS: float = _env_float("PROFILE_INTERVAL_MS", 5.0)
+    PROFILE_BUFFER_SIZE: int = _env_int("PROFILE_BUFFER_SIZE", 50)
 
 settings = Settings()
@@ -1,23 +1,81 @@
-from elasticsearch import Elasticsearch, exceptions as es_exceptions
+from __future__ import annotations
+
+from functools import lru_cache
+from typing import TYPE_CHECKING, Optional
 from app.core.config import settings
+from app.core import tracing
 import logging
 
+# elasticsearch (and aiohttp under it) is imported on the first client, not at app import
+if TYPE_CHECKING:
+    from elasticsearch import AsyncElasticsearch, Elasticsearch
+
+
+@lru_cache(maxsize=None)
+def _traced_transports():
+    from elastic_transport import AsyncTransport, Transport
+
+    class TracedTransport(Transport):
+        """Transport recording a span for every Elasticsearch HTTP request."""
+
+        def perform_request(self, method, target, **kwargs):
+            with tracing.span(f"es {method} {target.split('?', 1)[0]}", kind="client", method=method, target=target):
+                return super().perform_request(method, target, **kwargs)
+
+    class TracedAsyncTransport(AsyncTransport):
+        """Async counterpart of TracedTransport."""
+
+        async def perform_request(self, method, target, **kwargs):
+            with tracing.span(f"es {method} {target.split('?', 1)[0]}", kind="client", method=method, target=target):
+                return await super().perform_request(method, target, **kwargs)
+
+    return TracedTransport, TracedAsyncTransport
+
+
+_async_client: Optional[AsyncElasticsearch] = None
+
+
+def _hosts() -> list:
+    url = settings.ELASTICSEARCH_URL
+    # allow passing a single url or comma separated
+    return [h.strip() for h in url.split(",")] if "," in url else [url]
+
 
 def get_es_client() -> Elasticsearch:
     """Create an Elasticsearch client and verify connectivity.
 
     This is lightweight and will raise a clear exception if ES isn't reachable.
     """
-    url = settings.ELASTICSEARCH_URL
-    # allow passing a single url or comma separated
-    hosts = [h.strip() for h in url.split(",")] if "," in url else [url]
+    from elasticsearch import Elasticsearch, exceptions as es_exceptions
 
-    client = Elasticsearch(hosts)
+    hosts = _hosts()
+    client = Elasticsearch(hosts, transport_class=_traced_transports()[0])
 
     try:
         if not client.ping():
             logging.warning("Elasticsearch ping failed for hosts=%s", hosts)
-    except es_exceptions.ElasticsearchException as e:
+    except (es_exceptions.ApiError, es_exceptions.TransportError) as e:
         logging.exception("Elasticsearch client could not connect: %s", e)
 
     return client
+
+
+def get_async_es_client() -> AsyncElasticsearch:
+    """Process-wide AsyncElasticsearch client.
+
+    Unlike the sync client it is shared: its aiohttp connection pool lives on the
+    event loop, and building one per request would throw the keep-alive connections away.
+    """
+    global _async_client
+    if _async_client is None:
+        from elasticsearch import AsyncElasticsearch
+
+        _async_client = AsyncElasticsearch(_hosts(), transport_class=_traced_transports()[1])
+    return _async_client
+
+
+async def close_async_es_client() -> None:
+    global _async_client
+    if _async_client is not None:
+        await _async_client.close()
+        _async_client = None
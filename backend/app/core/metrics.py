@@ -0,0 +1,64 @@
+import threading
+from typing import Dict, Tuple
+
+# In-process counters and gauges exposed in the Prometheus text format at /api/metrics.
+# Values are per worker process; Prometheus sums them across scrape targets.
+
+_Key = Tuple[str, Tuple[Tuple[str, str], ...]]
+
+_counters: Dict[_Key, float] = {}
+_gauges: Dict[_Key, float] = {}
+_help: Dict[str, Tuple[str, str]] = {}
+_lock = threading.Lock()
+
+
+def _key(name: str, labels: Dict[str, str]) -> _Key:
+    return name, tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def describe(name: str, kind: str, help_text: str) -> None:
+    _help[name] = (kind, help_text)
+
+
+def inc(name: str, value: float = 1.0, **labels) -> None:
+    key = _key(name, labels)
+    with _lock:
+        _counters[key] = _counters.get(key, 0.0) + value
+
+
+def set_gauge(name: str, value: float, **labels) -> None:
+    with _lock:
+        _gauges[_key(name, labels)] = value
+
+
+def add_gauge(name: str, delta: float, **labels) -> None:
+    key = _key(name, labels)
+    with _lock:
+        _gauges[key] = _gauges.get(key, 0.0) + delta
+
+
+def _format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    if not labels:
+        return ""
+    escaped = ",".join(
+        '{}="{}"'.format(k, v.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")) for k, v in labels
+    )
+    return "{" + escaped + "}"
+
+
+def render() -> str:
+    with _lock:
+        samples = [(key, value, "counter") for key, value in _counters.items()]
+        samples += [(key, value, "gauge") for key, value in _gauges.items()]
+
+    lines = []
+    emitted = set()
+    for (name, labels), value, default_kind in sorted(samples, key=lambda s: s[0]):
+        if name not in emitted:
+            kind, help_text = _help.get(name, (default_kind, ""))
+            if help_text:
+                lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            emitted.add(name)
+        lines.append(f"{name}{_format_labels(labels)} {value!r}")
+    return "\n".join(lines) + "\n"
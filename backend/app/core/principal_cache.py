@@ -0,0 +1,44 @@
+import threading
+import time
+from typing import Dict, NamedTuple, Optional
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+
+class Principal(NamedTuple):
+    """What authenticated routes need to know about the caller, without an ORM instance."""
+    id: int
+    is_active: bool
+
+
+# token -> (principal, user version at caching time, token exp)
+_cache = TTLCache(maxsize=settings.PRINCIPAL_CACHE_SIZE, ttl=settings.PRINCIPAL_CACHE_TTL_SECONDS)
+# bumped whenever a user's auth state changes; cached entries from an older version are dropped
+_user_versions: Dict[int, int] = {}
+_versions_lock = threading.Lock()
+
+
+def get(token: str) -> Optional[Principal]:
+    entry = _cache.get(token)
+    if entry is None:
+        return None
+    principal, version, expires_at = entry
+    if _user_versions.get(principal.id, 0) != version or (expires_at is not None and expires_at <= time.time()):
+        _cache.pop(token)
+        return None
+    return principal
+
+
+def put(token: str, principal: Principal, expires_at: Optional[float] = None) -> None:
+    _cache.set(token, (principal, _user_versions.get(principal.id, 0), expires_at))
+
+
+def invalidate_user(user_id: int) -> None:
+    """Evict every cached token of a user in this process, e.g. on deactivation."""
+    with _versions_lock:
+        _user_versions[user_id] = _user_versions.get(user_id, 0) + 1
+
+
+def clear() -> None:
+    _cache.clear()
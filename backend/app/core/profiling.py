@@ -0,0 +1,245 @@
+"""On-demand sampling profiler for live requests.
+
+Routes registered through ``ProfiledRoute`` can be profiled per request: a
+sampled fraction (``PROFILE_SAMPLE_RATE``) or any request whose
+``X-Profile-Token`` header matches ``PROFILE_ADMIN_TOKEN``. While the handler
+runs, a sampler thread snapshots the handler's stack every
+``PROFILE_INTERVAL_MS`` and aggregates collapsed stacks, the input format of
+flamegraph.pl / speedscope. Finished profiles are kept in a bounded ring buffer.
+
+Sync handlers are sampled on their threadpool thread. Async handlers share the
+event-loop thread with every other request, so they are sampled per task: while
+the handler's task is running its stack is recorded from the loop thread, and
+while it is suspended its await chain is recorded, ending in ``(awaiting)``.
+Work handed to another process (PDF parsing on the parser pool) is sampled in
+that process by ``sample_call`` and merged in under a ``<pool name>;`` root.
+"""
+import asyncio
+import contextvars
+import hmac
+import os
+import random
+import sys
+import threading
+import time
+from collections import Counter, deque
+from datetime import datetime, timezone
+from functools import wraps
+from itertools import count
+from typing import Dict, List, Optional
+
+from fastapi import Request
+from fastapi.routing import APIRoute
+
+from app.core.config import settings
+
+PROFILE_HEADER = "X-Profile-Token"
+MAX_STACK_DEPTH = 128
+
+
+class Profile:
+    def __init__(self, profile_id: int, method: str, path: str, reason: str):
+        self.id = profile_id
+        self.method = method
+        self.path = path
+        self.reason = reason
+        self.started_at = datetime.now(timezone.utc)
+        self.duration_ms: Optional[float] = None
+        self.stacks: Counter = Counter()
+
+    @property
+    def samples(self) -> int:
+        return sum(self.stacks.values())
+
+    def summary(self) -> Dict:
+        return {
+            "id": self.id,
+            "method": self.method,
+            "path": self.path,
+            "reason": self.reason,
+            "started_at": self.started_at.isoformat(),
+            "duration_ms": self.duration_ms,
+            "samples": self.samples,
+        }
+
+    def collapsed(self) -> str:
+        return "\n".join(f"{stack} {n}" for stack, n in self.stacks.most_common()) + "\n"
+
+
+_profiles: deque = deque(maxlen=settings.PROFILE_BUFFER_SIZE)
+_profiles_lock = threading.Lock()
+_ids = count(1)
+_active_profile: contextvars.ContextVar[Optional[Profile]] = contextvars.ContextVar("active_profile", default=None)
+
+
+def _frame_name(frame) -> str:
+    code = frame.f_code
+    return f"{os.path.basename(code.co_filename)}:{code.co_name}"
+
+
+def _collapse(frame, root=None) -> str:
+    """Collapsed stack ending at ``frame``; with ``root``, frames below it are left out."""
+    names: List[str] = []
+    while frame is not None and len(names) < MAX_STACK_DEPTH:
+        names.append(_frame_name(frame))
+        if frame is root:
+            break
+        frame = frame.f_back
+    names.reverse()
+    return ";".join(names)
+
+
+def _task_stack(task: asyncio.Task, loop_frame) -> Optional[str]:
+    coro = task.get_coro()
+    root = getattr(coro, "cr_frame", None)
+    if root is None:
+        return None
+
+    # running: the loop thread is somewhere inside the task's outermost coroutine
+    frame = loop_frame
+    while frame is not None:
+        if frame is root:
+            return _collapse(loop_frame, root)
+        frame = frame.f_back
+
+    # suspended: follow the chain of awaited coroutines down to the pending future
+    names: List[str] = []
+    awaitable = coro
+    while awaitable is not None and len(names) < MAX_STACK_DEPTH:
+        frame = getattr(awaitable, "cr_frame", None) or getattr(awaitable, "gi_frame", None)
+        if frame is None:
+            break
+        names.append(_frame_name(frame))
+        awaitable = getattr(awaitable, "cr_await", None) or getattr(awaitable, "gi_yieldfrom", None)
+    names.append("(awaiting)")
+    return ";".join(names)
+
+
+class _StackSampler:
+    """Samples one thread's stack, or one asyncio task's, on a timer until stopped."""
+
+    def __init__(self, stacks: Counter, thread_id: int, task: Optional[asyncio.Task] = None):
+        self._stacks = stacks
+        self._thread_id = thread_id
+        self._task = task
+        self._interval = settings.PROFILE_INTERVAL_MS / 1000.0
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, name="stack-sampler", daemon=True)
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        while not self._stop.wait(self._interval):
+            frame = sys._current_frames().get(self._thread_id)
+            if self._task is not None:
+                stack = _task_stack(self._task, frame)
+            else:
+                stack = _collapse(frame) if frame is not None else None
+            if stack:
+                self._stacks[stack] += 1
+
+
+def _profile_reason(request: Request) -> Optional[str]:
+    if is_admin_token(request.headers.get(PROFILE_HEADER)):
+        return "header"
+    if settings.PROFILE_SAMPLE_RATE > 0 and random.random() < settings.PROFILE_SAMPLE_RATE:
+        return "sampled"
+    return None
+
+
+def _wrap_endpoint(endpoint):
+    """Run the endpoint under a stack sampler when its request was selected."""
+    if getattr(endpoint, "__profiled__", False):
+        return endpoint
+
+    if asyncio.iscoroutinefunction(endpoint):
+        @wraps(endpoint)
+        async def wrapper(*args, **kwargs):
+            profile = _active_profile.get()
+            if profile is None:
+                return await endpoint(*args, **kwargs)
+            with _StackSampler(profile.stacks, threading.get_ident(), asyncio.current_task()):
+                return await endpoint(*args, **kwargs)
+    else:
+        @wraps(endpoint)
+        def wrapper(*args, **kwargs):
+            profile = _active_profile.get()
+            if profile is None:
+                return endpoint(*args, **kwargs)
+            with _StackSampler(profile.stacks, threading.get_ident()):
+                return endpoint(*args, **kwargs)
+
+    wrapper.__profiled__ = True
+    return wrapper
+
+
+class ProfiledRoute(APIRoute):
+    """APIRoute whose handler can be profiled on demand."""
+
+    def __init__(self, path: str, endpoint, **kwargs):
+        super().__init__(path, _wrap_endpoint(endpoint), **kwargs)
+
+    def get_route_handler(self):
+        handler = super().get_route_handler()
+
+        async def profiled_handler(request: Request):
+            reason = _profile_reason(request)
+            if reason is None:
+                return await handler(request)
+
+            profile = Profile(next(_ids), request.method, self.path, reason)
+            token = _active_profile.set(profile)
+            started = time.perf_counter()
+            try:
+                return await handler(request)
+            finally:
+                profile.duration_ms = round((time.perf_counter() - started) * 1000, 3)
+                _active_profile.reset(token)
+                with _profiles_lock:
+                    _profiles.append(profile)
+
+        return profiled_handler
+
+
+def current_profile() -> Optional[Profile]:
+    """The profile of the request being handled, if it was selected for profiling."""
+    return _active_profile.get()
+
+
+def sample_call(fn, *args):
+    """Run ``fn(*args)`` under a stack sampler; returns (result, collapsed stacks).
+
+    Meant to be submitted to a worker process so its time shows up in the request's profile.
+    """
+    stacks: Counter = Counter()
+    with _StackSampler(stacks, threading.get_ident()):
+        result = fn(*args)
+    return result, stacks
+
+
+def add_stacks(profile: Profile, stacks: Counter, root: str) -> None:
+    for stack, n in stacks.items():
+        profile.stacks[f"{root};{stack}"] += n
+
+
+def is_admin_token(token: Optional[str]) -> bool:
+    return bool(token and settings.PROFILE_ADMIN_TOKEN and hmac.compare_digest(token, settings.PROFILE_ADMIN_TOKEN))
+
+
+def list_profiles() -> List[Dict]:
+    with _profiles_lock:
+        return [p.summary() for p in reversed(_profiles)]
+
+
+def get_profile(profile_id: int) -> Optional[Profile]:
+    with _profiles_lock:
+        for p in _profiles:
+            if p.id == profile_id:
+                return p
+    return None
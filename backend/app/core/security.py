@@ -1,10 +1,38 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Tuple
 from passlib.context import CryptContext
 from jose import jwt, JWTError
+from app.core import metrics
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# min/max pin the policy to BCRYPT_ROUNDS, so hashes made under any other cost
+# report needs_update and are rehashed on the next successful login
+pwd_context = CryptContext(
+    schemes=["bcrypt"],
+    deprecated="auto",
+    bcrypt__default_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__min_rounds=settings.BCRYPT_ROUNDS,
+    bcrypt__max_rounds=settings.BCRYPT_ROUNDS,
+)
+
+# bcrypt is deliberately slow; it gets its own threads so a login burst queues here
+# instead of occupying the threadpool every sync route runs on
+_hash_executor = ThreadPoolExecutor(max_workers=settings.PASSWORD_HASH_WORKERS, thread_name_prefix="password-hash")
+_hash_slots = threading.BoundedSemaphore(settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE)
+
+metrics.describe("password_hash_submitted_total", "counter", "Password hash/verify jobs accepted by the hashing executor")
+metrics.describe("password_hash_rejected_total", "counter", "Password hash/verify jobs rejected because the executor queue was full")
+metrics.describe("password_hash_pending", "gauge", "Password hash/verify jobs queued or running")
+metrics.describe("password_hash_wait_seconds_total", "counter", "Time jobs spent queued before a hashing thread picked them up")
+metrics.describe("password_hash_seconds_total", "counter", "Time spent hashing or verifying passwords")
+
+
+class PasswordHasherBusy(Exception):
+    """The password hashing executor is saturated; the caller should retry later."""
 
 
 def get_password_hash(password: str) -> str:
@@ -15,6 +43,47 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     return pwd_context.verify(plain_password, hashed_password)
 
 
+def verify_and_update(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """Verify, and return a replacement hash when the stored one no longer matches the cost policy."""
+    return pwd_context.verify_and_update(plain_password, hashed_password)
+
+
+def _submit(func, *args) -> "asyncio.Future":
+    if not _hash_slots.acquire(blocking=False):
+        metrics.inc("password_hash_rejected_total", op=func.__name__)
+        raise PasswordHasherBusy()
+
+    metrics.inc("password_hash_submitted_total", op=func.__name__)
+    metrics.add_gauge("password_hash_pending", 1)
+    queued_at = time.perf_counter()
+
+    def run():
+        started = time.perf_counter()
+        metrics.inc("password_hash_wait_seconds_total", started - queued_at, op=func.__name__)
+        try:
+            return func(*args)
+        finally:
+            metrics.inc("password_hash_seconds_total", time.perf_counter() - started, op=func.__name__)
+
+    def release(_):
+        _hash_slots.release()
+        metrics.add_gauge("password_hash_pending", -1)
+
+    future = _hash_executor.submit(run)
+    future.add_done_callback(release)
+    return asyncio.wrap_future(future)
+
+
+async def hash_password_async(password: str) -> str:
+    """get_password_hash on the hashing executor. Raises PasswordHasherBusy when the queue is full."""
+    return await _submit(get_password_hash, password)
+
+
+async def verify_and_update_async(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+    """verify_and_update on the hashing executor. Raises PasswordHasherBusy when the queue is full."""
+    return await _submit(verify_and_update, plain_password, hashed_password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     expire = datetime.utcnow() + (expires_delta or timedelta(minutes=settings.JWT_EXPIRE_MINUTES))
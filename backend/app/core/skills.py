@@ -0,0 +1,40 @@
+import unicodedata
+from typing import Iterable, List, Optional
+
+# Skill comparison shared by every matcher. It mirrors the lowercase_ascii normalizer on
+# the jobs and resumes indices (lowercase, then asciifolding), so a skill compares equal
+# in Python exactly when the Elasticsearch doc values do. Surrounding whitespace is
+# stripped before indexing, so the normalizer never sees it.
+
+# letters asciifolding maps that have no Unicode decomposition
+_FOLD = str.maketrans({
+    "ß": "ss",
+    "æ": "ae",
+    "œ": "oe",
+    "ø": "o",
+    "đ": "d",
+    "ð": "d",
+    "ł": "l",
+    "þ": "th",
+    "ı": "i",
+})
+
+
+def normalize_skill(skill: str) -> str:
+    decomposed = unicodedata.normalize("NFKD", skill.strip().lower().translate(_FOLD))
+    return "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def normalize_skills(skills: Optional[Iterable[str]]) -> List[str]:
+    """Normalized, de-duplicated skills in first-seen order; blanks are dropped."""
+    seen = {}
+    for skill in skills or []:
+        normalized = normalize_skill(skill) if skill else ""
+        if normalized:
+            seen.setdefault(normalized, None)
+    return list(seen)
+
+
+def clean_skills(skills: Optional[Iterable[str]]) -> List[str]:
+    """Skills as stored in an index document: stripped, blanks dropped, spelling kept."""
+    return [skill.strip() for skill in skills or [] if skill and skill.strip()]
@@ -0,0 +1,39 @@
+import logging
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StartupReport:
+    """Wall-clock time of each startup phase, logged once the app is ready."""
+
+    def __init__(self):
+        self.phases: List[Dict] = []
+        self._started = time.perf_counter()
+
+    def record(self, name: str, seconds: float, error: Optional[str] = None) -> None:
+        self.phases.append({"phase": name, "ms": round(seconds * 1000, 1), "ok": error is None, "error": error})
+
+    @contextmanager
+    def phase(self, name: str):
+        """Time a phase. A failing phase is logged and recorded, and startup carries on."""
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as e:
+            logger.exception("Startup phase '%s' failed", name)
+            self.record(name, time.perf_counter() - started, repr(e))
+        else:
+            self.record(name, time.perf_counter() - started)
+
+    def as_dict(self) -> Dict:
+        return {
+            "total_ms": round(sum(p["ms"] for p in self.phases), 1),
+            "phases": self.phases,
+        }
+
+    def log(self) -> None:
+        summary = ", ".join(f"{p['phase']}={p['ms']}ms{'' if p['ok'] else ' (failed)'}" for p in self.phases)
+        logger.info("Startup finished in %.1fms: %s", self.as_dict()["total_ms"], summary)
@@ -0,0 +1,295 @@
+"""Lightweight request tracing.
+
+A trace is started per HTTP request (see the middleware in ``app.main``) and
+carried through route -> service -> DB/ES/LLM calls in a context variable, so
+it follows the request into FastAPI's threadpool. Finished traces are handed to
+a background exporter through a bounded queue; when the queue is full traces
+are dropped rather than slowing the request down.
+"""
+import contextvars
+import inspect
+import json
+import logging
+import queue
+import random
+import secrets
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Dict, List, Optional
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class Span:
+    __slots__ = ("trace_id", "span_id", "parent_id", "name", "kind", "start_ns", "end_ns", "attributes", "error")
+
+    def __init__(self, trace_id: str, parent_id: Optional[str], name: str, kind: str, attributes: Optional[Dict[str, Any]] = None):
+        self.trace_id = trace_id
+        self.span_id = secrets.token_hex(8)
+        self.parent_id = parent_id
+        self.name = name
+        self.kind = kind
+        self.start_ns = time.time_ns()
+        self.end_ns: Optional[int] = None
+        self.attributes = attributes or {}
+        self.error: Optional[str] = None
+
+    def set_attribute(self, key: str, value: Any) -> None:
+        self.attributes[key] = value
+
+    def end(self) -> None:
+        if self.end_ns is None:
+            self.end_ns = time.time_ns()
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "name": self.name,
+            "kind": self.kind,
+            "start_ns": self.start_ns,
+            "end_ns": self.end_ns,
+            "duration_ms": round(((self.end_ns or self.start_ns) - self.start_ns) / 1e6, 3),
+            "attributes": self.attributes,
+            "error": self.error,
+        }
+
+
+class _Trace:
+    __slots__ = ("trace_id", "spans", "dropped")
+
+    def __init__(self, trace_id: str):
+        self.trace_id = trace_id
+        self.spans: List[Span] = []
+        self.dropped = 0
+
+
+_current_trace: contextvars.ContextVar[Optional[_Trace]] = contextvars.ContextVar("current_trace", default=None)
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar("current_span", default=None)
+
+
+def is_enabled() -> bool:
+    return settings.TRACE_EXPORTER != "none"
+
+
+def _parse_traceparent(header: Optional[str]):
+    """Parse a W3C ``traceparent`` header into (trace_id, parent_id, sampled)."""
+    if not header:
+        return None
+    parts = header.strip().split("-")
+    if len(parts) != 4 or len(parts[1]) != 32 or len(parts[2]) != 16:
+        return None
+    try:
+        sampled = bool(int(parts[3], 16) & 0x01)
+    except ValueError:
+        return None
+    return parts[1], parts[2], sampled
+
+
+def _should_sample(parent) -> bool:
+    if parent is not None:
+        return parent[2]
+    return random.random() < settings.TRACE_SAMPLE_RATE
+
+
+@contextmanager
+def start_trace(name: str, traceparent: Optional[str] = None, **attributes):
+    """Start a root span for a request. Yields the span, or None when unsampled."""
+    parent = _parse_traceparent(traceparent)
+    if not is_enabled() or not _should_sample(parent):
+        yield None
+        return
+
+    trace = _Trace(parent[0] if parent else secrets.token_hex(16))
+    root = Span(trace.trace_id, parent[1] if parent else None, name, "server", attributes)
+    trace.spans.append(root)
+    trace_token = _current_trace.set(trace)
+    span_token = _current_span.set(root)
+    try:
+        yield root
+    except Exception as e:
+        root.error = repr(e)
+        raise
+    finally:
+        root.end()
+        _current_span.reset(span_token)
+        _current_trace.reset(trace_token)
+        _exporter.submit(trace)
+
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+
+def start_span(name: str, kind: str = "internal", **attributes) -> Optional[Span]:
+    """Open a child span without making it current; callers must ``end()`` it.
+
+    Used by instrumentation hooks (SQLAlchemy events) that cannot wrap the
+    traced call in a ``with`` block.
+    """
+    trace = _current_trace.get()
+    if trace is None:
+        return None
+    if len(trace.spans) >= settings.TRACE_MAX_SPANS:
+        trace.dropped += 1
+        return None
+    parent = _current_span.get()
+    child = Span(trace.trace_id, parent.span_id if parent else None, name, kind, attributes)
+    trace.spans.append(child)
+    return child
+
+
+@contextmanager
+def span(name: str, kind: str = "internal", **attributes):
+    """Record a child span of the current span. A no-op outside a sampled trace."""
+    child = start_span(name, kind, **attributes)
+    if child is None:
+        yield None
+        return
+
+    token = _current_span.set(child)
+    try:
+        yield child
+    except Exception as e:
+        child.error = repr(e)
+        raise
+    finally:
+        child.end()
+        _current_span.reset(token)
+
+
+def traced(name: str, kind: str = "internal"):
+    """Decorator recording a span around every call of the wrapped function."""
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            # the span has to stay open across the await, not just the coroutine's creation
+            @wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                if _current_trace.get() is None:
+                    return await func(*args, **kwargs)
+                with span(name, kind):
+                    return await func(*args, **kwargs)
+            return async_wrapper
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _current_trace.get() is None:
+                return func(*args, **kwargs)
+            with span(name, kind):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+def trace_service(cls):
+    """Class decorator tracing every public staticmethod of a service class."""
+    for attr_name, attr in list(vars(cls).items()):
+        if isinstance(attr, staticmethod) and not attr_name.startswith("_"):
+            wrapped = traced(f"{cls.__name__}.{attr_name}", kind="service")(attr.__func__)
+            setattr(cls, attr_name, staticmethod(wrapped))
+    return cls
+
+
+def traceparent_for(root: Span) -> str:
+    return f"00-{root.trace_id}-{root.span_id}-01"
+
+
+# ---------------------------
+# Exporters
+# ---------------------------
+
+def _otlp_value(value: Any) -> Dict[str, Any]:
+    if isinstance(value, bool):
+        return {"boolValue": value}
+    if isinstance(value, int):
+        return {"intValue": str(value)}
+    if isinstance(value, float):
+        return {"doubleValue": value}
+    return {"stringValue": str(value)}
+
+
+_OTLP_KINDS = {"internal": 1, "server": 2, "client": 3, "service": 1}
+
+
+def _to_otlp(trace: _Trace) -> Dict[str, Any]:
+    spans = []
+    for s in trace.spans:
+        item = {
+            "traceId": s.trace_id,
+            "spanId": s.span_id,
+            "name": s.name,
+            "kind": _OTLP_KINDS.get(s.kind, 1),
+            "startTimeUnixNano": str(s.start_ns),
+            "endTimeUnixNano": str(s.end_ns or s.start_ns),
+            "attributes": [{"key": k, "value": _otlp_value(v)} for k, v in s.attributes.items()],
+            "status": {"code": 2, "message": s.error} if s.error else {"code": 1},
+        }
+        if s.parent_id:
+            item["parentSpanId"] = s.parent_id
+        spans.append(item)
+
+    return {
+        "resourceSpans": [{
+            "resource": {"attributes": [{"key": "service.name", "value": {"stringValue": settings.APP_NAME}}]},
+            "scopeSpans": [{"scope": {"name": "app.core.tracing"}, "spans": spans}],
+        }]
+    }
+
+
+class _Exporter:
+    """Background thread draining finished traces to the configured sink."""
+
+    def __init__(self):
+        self._queue: Optional[queue.Queue] = None
+        self._lock = threading.Lock()
+        self.dropped = 0
+
+    def _ensure_worker(self) -> queue.Queue:
+        if self._queue is None:
+            with self._lock:
+                if self._queue is None:
+                    self._queue = queue.Queue(maxsize=settings.TRACE_EXPORT_QUEUE_SIZE)
+                    threading.Thread(target=self._run, name="trace-exporter", daemon=True).start()
+        return self._queue
+
+    def submit(self, trace: _Trace) -> None:
+        try:
+            self._ensure_worker().put_nowait(trace)
+        except queue.Full:
+            self.dropped += 1
+
+    def _run(self) -> None:
+        while True:
+            trace = self._queue.get()
+            try:
+                self._export(trace)
+            except Exception:
+                logger.exception("Trace export failed")
+
+    def _export(self, trace: _Trace) -> None:
+        if settings.TRACE_EXPORTER == "file":
+            record = {
+                "trace_id": trace.trace_id,
+                "dropped_spans": trace.dropped,
+                "spans": [s.to_dict() for s in trace.spans],
+            }
+            with open(settings.TRACE_EXPORT_PATH, "a", encoding="utf-8") as fh:
+                fh.write(json.dumps(record, default=str) + "\n")
+        elif settings.TRACE_EXPORTER == "otlp":
+            request = urllib.request.Request(
+                settings.TRACE_OTLP_ENDPOINT,
+                data=json.dumps(_to_otlp(trace), default=str).encode("utf-8"),
+                headers={"Content-Type": "application/json"},
+                method="POST",
+            )
+            with urllib.request.urlopen(request, timeout=2):
+                pass
+
+
+_exporter = _Exporter()
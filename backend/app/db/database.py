@@ -1,19 +1,182 @@
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, declarative_base
+import threading
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import make_url
+from sqlalchemy.orm import Session, sessionmaker, declarative_base
 from app.core.config import settings
+from app.core import tracing
 
 
-# Support sqlite for local development and PostgreSQL in production.
-connect_args = {}
-if settings.DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+# Engines are built on first use: resolving DATABASE_URL may probe the network,
+# and the async engine pulls in its driver and sqlalchemy.ext.asyncio.
+# Keyed by role: "primary" takes writes, "replica" read-only traffic.
+_engines = {}
+_async_engines = {}
+_async_session_factories = {}
+_engine_lock = threading.Lock()
 
-engine = create_engine(settings.DATABASE_URL, pool_pre_ping=True, connect_args=connect_args)
+# async drivers for the same databases the sync engine talks to
+_ASYNC_DRIVERS = {"sqlite": "sqlite+aiosqlite", "postgresql": "postgresql+asyncpg", "postgres": "postgresql+asyncpg"}
 
-SessionLocal = sessionmaker(
+
+def _async_url(url: str):
+    parsed = make_url(url)
+    backend = parsed.drivername.split("+", 1)[0]
+    return parsed.set(drivername=_ASYNC_DRIVERS.get(backend, parsed.drivername))
+
+
+def _trace_sql_start(conn, cursor, statement, parameters, context, executemany):
+    sql_span = tracing.start_span("sql", kind="client", statement=statement[:500])
+    if sql_span is not None:
+        conn.info.setdefault("trace_spans", []).append(sql_span)
+
+
+def _trace_sql_end(conn, cursor, statement, parameters, context, executemany):
+    spans = conn.info.get("trace_spans")
+    if spans:
+        spans.pop().end()
+
+
+def _trace_sql_error(exception_context):
+    conn = exception_context.connection
+    spans = conn.info.get("trace_spans") if conn is not None else None
+    if spans:
+        sql_span = spans.pop()
+        sql_span.error = repr(exception_context.original_exception)
+        sql_span.end()
+
+
+def _instrument(sync_engine) -> None:
+    event.listen(sync_engine, "before_cursor_execute", _trace_sql_start)
+    event.listen(sync_engine, "after_cursor_execute", _trace_sql_end)
+    event.listen(sync_engine, "handle_error", _trace_sql_error)
+
+
+def _url(role: str) -> str:
+    return settings.DATABASE_URL if role == "primary" else settings.DATABASE_REPLICA_URL
+
+
+def _pool_args(url: str) -> dict:
+    if url.startswith("sqlite"):
+        return {}
+    return {
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+    }
+
+
+def _has_replica() -> bool:
+    return settings.DATABASE_REPLICA_URL != settings.DATABASE_URL
+
+
+def get_engine(role: str = "primary"):
+    # without a separate replica URL, reads share the primary's engine and pool
+    if role == "replica" and not _has_replica():
+        role = "primary"
+    with _engine_lock:
+        if role not in _engines:
+            url = _url(role)
+            # Support sqlite for local development and PostgreSQL in production.
+            connect_args = {}
+            if url.startswith("sqlite"):
+                connect_args = {"check_same_thread": False}
+
+            _engines[role] = create_engine(url, pool_pre_ping=True, connect_args=connect_args, **_pool_args(url))
+            _instrument(_engines[role])
+        return _engines[role]
+
+
+def get_read_engine():
+    return get_engine("replica")
+
+
+def get_async_engine(role: str = "primary"):
+    if role == "replica" and not _has_replica():
+        role = "primary"
+    with _engine_lock:
+        if role not in _async_engines:
+            from sqlalchemy.ext.asyncio import create_async_engine
+
+            url = _url(role)
+            _async_engines[role] = create_async_engine(_async_url(url), pool_pre_ping=True, **_pool_args(url))
+            # the async engine runs on a sync engine underneath, so it gets the same SQL spans
+            _instrument(_async_engines[role].sync_engine)
+        return _async_engines[role]
+
+
+class ReadOnlySession(Session):
+    """Session for replica reads. Flushing is an error even when the replica URL points at the primary."""
+
+
+@event.listens_for(ReadOnlySession, "before_flush")
+def _reject_flush(session, flush_context, instances):
+    raise RuntimeError("Attempted to write through a read-only (replica) session")
+
+
+class _LazySessionmaker(sessionmaker):
+    """sessionmaker that binds to its engine when the first session is opened.
+
+    Sessions themselves only check out a connection at their first statement, so a
+    request that never queries never touches the pool.
+    """
+
+    def __init__(self, role: str = "primary", **kw):
+        super().__init__(**kw)
+        self.role = role
+
+    def __call__(self, **local_kw):
+        if self.kw.get("bind") is None:
+            self.configure(bind=get_engine(self.role))
+        return super().__call__(**local_kw)
+
+
+SessionLocal = _LazySessionmaker(
+    autocommit=False,
+    autoflush=False,
+)
+
+ReadSessionLocal = _LazySessionmaker(
+    "replica",
+    class_=ReadOnlySession,
     autocommit=False,
     autoflush=False,
-    bind=engine
 )
 
+
+def _async_session(role: str, **kw):
+    factory = _async_session_factories.get(role)
+    if factory is None:
+        from sqlalchemy.ext.asyncio import async_sessionmaker
+
+        factory = _async_session_factories[role] = async_sessionmaker(
+            get_async_engine(role),
+            sync_session_class=ReadOnlySession if role == "replica" else Session,
+            autoflush=False,
+            expire_on_commit=False,
+        )
+    return factory(**kw)
+
+
+def AsyncSessionLocal(**kw):
+    """Open an AsyncSession; objects stay usable after commit, since lazy refreshes would need a greenlet hop."""
+    return _async_session("primary", **kw)
+
+
+def AsyncReadSessionLocal(**kw):
+    """AsyncSessionLocal on the read replica; flushes are rejected."""
+    return _async_session("replica", **kw)
+
+
+def __getattr__(name):
+    # `from app.db.database import engine` keeps working, it just builds the engine at that point
+    if name == "engine":
+        return get_engine()
+    if name == "read_engine":
+        return get_read_engine()
+    if name == "async_engine":
+        return get_async_engine()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
 Base = declarative_base()
@@ -0,0 +1,60 @@
+"""Additive schema upgrades that ``Base.metadata.create_all`` cannot make.
+
+create_all only creates missing tables, so columns and indexes added to a table that
+already exists have to be applied here. Every step checks the live schema first, so the
+upgrade is safe to run on every startup and on fresh databases. Run it by hand with
+``python -m app.db.upgrade``.
+"""
+import logging
+from typing import List
+
+from sqlalchemy import inspect, text
+
+# columns added to the pre-existing resumes table, in the order they were introduced
+RESUME_COLUMNS = (
+    ("role", "VARCHAR(255)"),
+    ("file_sha256", "VARCHAR(64)"),
+    ("version", "INTEGER"),
+)
+RESUME_HASH_INDEX = "uq_resumes_user_id_file_sha256"
+
+
+def upgrade_schema(engine) -> List[str]:
+    """Apply missing upgrade steps; returns a description of each step applied."""
+    inspector = inspect(engine)
+    if "resumes" not in inspector.get_table_names():
+        return []
+
+    applied = []
+    columns = {column["name"] for column in inspector.get_columns("resumes")}
+    indexes = {index["name"] for index in inspector.get_indexes("resumes")}
+    with engine.begin() as conn:
+        for name, ddl in RESUME_COLUMNS:
+            if name not in columns:
+                conn.execute(text(f"ALTER TABLE resumes ADD COLUMN {name} {ddl}"))
+                applied.append(f"resumes.{name}")
+
+        if RESUME_HASH_INDEX not in indexes:
+            # the unique index can't be built over duplicate hashes: the oldest row of each
+            # (user_id, file_sha256) group keeps its hash, the others are cleared (NULLs never
+            # conflict) and simply won't be matched by repeat uploads
+            cleared = conn.execute(text(
+                "UPDATE resumes SET file_sha256 = NULL "
+                "WHERE file_sha256 IS NOT NULL AND id NOT IN ("
+                "SELECT MIN(id) FROM resumes WHERE file_sha256 IS NOT NULL GROUP BY user_id, file_sha256)"
+            )).rowcount
+            if cleared:
+                logging.warning("Cleared file_sha256 on %d duplicate resumes before adding %s", cleared, RESUME_HASH_INDEX)
+            conn.execute(text(f"CREATE UNIQUE INDEX {RESUME_HASH_INDEX} ON resumes (user_id, file_sha256)"))
+            applied.append(RESUME_HASH_INDEX)
+
+    if applied:
+        logging.info("Schema upgraded: %s", ", ".join(applied))
+    return applied
+
+
+if __name__ == "__main__":
+    from app.db.database import get_engine
+
+    logging.basicConfig(level=logging.INFO)
+    print(upgrade_schema(get_engine()) or "Schema is up to date")
@@ -1,9 +1,25 @@
+import time
+
+_imports_started = time.perf_counter()
+
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request
 from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
-from app.db.database import Base, engine
+from fastapi.middleware.gzip import GZipMiddleware
+from app.db.database import Base, SessionLocal, get_engine
+from app.db.upgrade import upgrade_schema
 from app.api.routes import router
 from app.core.config import settings
+from app.core import tracing
+from app.core.responses import ORJSONResponse
+from app.services.suggest_service import SuggestService
+from app.services.job_dedup_service import JobDedupService
+from app.services.skill_index_service import SkillIndexService
+from app.services.idempotency_service import IdempotencyService
+from app.services.resume_parser import shutdown_parser_pool
+from app.core.elasticsearch import close_async_es_client
+from app.core.startup import StartupReport
 import logging
 from logging.config import dictConfig
 
@@ -20,8 +36,56 @@ dictConfig(LOGGING)
 logger = logging.getLogger(__name__)
 
 
+_imports_seconds = time.perf_counter() - _imports_started
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    report = StartupReport()
+    report.record("imports", _imports_seconds)
+
+    # first access resolves the URLs, including the development-time Postgres probe
+    with report.phase("settings"):
+        settings.DATABASE_URL, settings.ELASTICSEARCH_URL
+
+    # Create tables if missing (for development)
+    with report.phase("create_tables"):
+        Base.metadata.create_all(bind=get_engine())
+    # columns and indexes added to tables that already existed
+    with report.phase("upgrade_schema"):
+        upgrade_schema(get_engine())
+
+    db = SessionLocal()
+    with report.phase("suggest_index"):
+        SuggestService.build(db)
+    with report.phase("dedup_index"):
+        JobDedupService.load(db)
+    db.close()
+
+    # maps the prebuilt index; building it is a separate job
+    with report.phase("skill_index"):
+        SkillIndexService.open()
+
+    report.log()
+    app.state.startup_report = report
+    yield
+
+    shutdown_parser_pool()
+    await close_async_es_client()
+
+
 # Create app
-app = FastAPI(title=settings.APP_NAME)
+app = FastAPI(title=settings.APP_NAME, default_response_class=ORJSONResponse, lifespan=lifespan)
+
+
+# Registered first so it sits inside CORS and GZip: replays get CORS headers and the
+# stored body is the uncompressed one.
+@app.middleware("http")
+async def idempotent_requests(request: Request, call_next):
+    key = request.headers.get("idempotency-key")
+    if key is None or not IdempotencyService.applies(request.method, request.url.path):
+        return await call_next(request)
+    return await IdempotencyService.handle(request, key, call_next)
 
 
 # Apply CORS from env-friendly defaults
@@ -40,15 +104,28 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-
-# Create tables if missing (for development)
-@app.on_event("startup")
-def on_startup():
-    try:
-        Base.metadata.create_all(bind=engine)
-        logger.info("Database tables ensured on startup")
-    except Exception:
-        logger.exception("Failed to create database tables on startup")
+app.add_middleware(GZipMiddleware, minimum_size=settings.GZIP_MIN_SIZE, compresslevel=settings.GZIP_LEVEL)
+
+
+@app.middleware("http")
+async def trace_requests(request: Request, call_next):
+    if not tracing.is_enabled():
+        return await call_next(request)
+
+    with tracing.start_trace(
+        f"{request.method} {request.url.path}",
+        traceparent=request.headers.get("traceparent"),
+        method=request.method,
+        path=request.url.path,
+    ) as root:
+        response = await call_next(request)
+        if root is not None:
+            route = request.scope.get("route")
+            if route is not None:
+                root.name = f"{request.method} {route.path}"
+            root.set_attribute("status_code", response.status_code)
+            response.headers["traceparent"] = tracing.traceparent_for(root)
+        return response
 
 
 @app.exception_handler(Exception)
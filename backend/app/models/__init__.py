@@ -1,3 +1,9 @@
 from app.models.resume import Resume
 from app.models.job import Job
 from app.models.user import User
+from app.models.saved_search import SavedSearch
+from app.models.job_alert import JobAlert
+from app.models.job_signature import JobSignature
+from app.models.resume_section import ResumeSection
+from app.models.idempotency_key import IdempotencyKey
+from app.models.resume_recommendation import ResumeRecommendation
@@ -0,0 +1,26 @@
+from sqlalchemy import Column, Integer, String, DateTime, LargeBinary, Index, JSON
+from app.db.database import Base
+
+
+class IdempotencyKey(Base):
+    """Outcome of a request sent with an Idempotency-Key, replayed to retries until it expires."""
+    __tablename__ = "idempotency_keys"
+
+    user_id = Column(Integer, primary_key=True)
+    key = Column(String(255), primary_key=True)
+    # method + path + sha256 of the body (of the parsed fields and file hashes for multipart
+    # uploads, whose boundary changes on every send); a reused key with another request is rejected
+    fingerprint = Column(String(64), nullable=False)
+    # "in_progress" while the first request runs, then "completed"
+    status = Column(String(20), nullable=False)
+    # an in-progress claim older than this was abandoned (crashed worker) and may be taken over
+    locked_until = Column(DateTime(timezone=True), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(LargeBinary, nullable=True)
+    # [[name, value], ...] in response order, so repeated headers such as Set-Cookie survive;
+    # set together with status_code and response_body when the request completes
+    response_headers = Column(JSON, nullable=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+
+Index('ix_idempotency_keys_expires_at', IdempotencyKey.expires_at)
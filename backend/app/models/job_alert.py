@@ -0,0 +1,19 @@
+from sqlalchemy import Column, Integer, DateTime, Index, UniqueConstraint
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class JobAlert(Base):
+    __tablename__ = "job_alerts"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, nullable=False)
+    saved_search_id = Column(Integer, index=True, nullable=False)
+    job_id = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+    __table_args__ = (UniqueConstraint("saved_search_id", "job_id", name="uq_job_alerts_search_job"),)
+
+
+# clients poll with "alerts for me newer than id X"
+Index('ix_job_alerts_user_id_id', JobAlert.user_id, JobAlert.id)
@@ -0,0 +1,13 @@
+from sqlalchemy import Column, DateTime, Integer, LargeBinary
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class JobSignature(Base):
+    """MinHash signature of a job posting, used to detect near-duplicates at ingest."""
+    __tablename__ = "job_signatures"
+
+    job_id = Column(Integer, primary_key=True)
+    signature = Column(LargeBinary, nullable=False)
+    # workers load signatures incrementally by insert time; job ids are not committed in order
+    inserted_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False, index=True)
@@ -14,10 +14,15 @@ class Resume(Base):
     # store skills as JSON/JSONB where supported
     skills = Column(JSON, nullable=True)
     experience_years = Column(Float, nullable=True)
+    role = Column(String(255), nullable=True)
+    # sha256 of the uploaded file; repeat uploads of the same bytes reuse this row
+    file_sha256 = Column(String(64), nullable=True)
+    # per-user upload sequence number; sections of earlier versions are reused on analysis
+    version = Column(Integer, nullable=True)
     created_at = Column(DateTime(timezone=True), server_default=func.now(), index=True)
     updated_at = Column(DateTime(timezone=True), onupdate=func.now())
 
 
 # additional indexes for fast lookup
 Index('ix_resumes_user_id_created_at', Resume.user_id, Resume.created_at)
-    
\ No newline at end of file
+Index('uq_resumes_user_id_file_sha256', Resume.user_id, Resume.file_sha256, unique=True)
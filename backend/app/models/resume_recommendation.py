@@ -0,0 +1,17 @@
+from sqlalchemy import Column, Integer, Float, DateTime, Index
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class ResumeRecommendation(Base):
+    """One entry of a resume's precomputed "jobs for you" feed (its top-K JobMatchService scores)."""
+    __tablename__ = "resume_recommendations"
+
+    resume_id = Column(Integer, primary_key=True)
+    job_id = Column(Integer, primary_key=True, index=True)
+    score = Column(Float, nullable=False)
+    computed_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# a feed read is one range scan of this index
+Index('ix_resume_recommendations_resume_id_score', ResumeRecommendation.resume_id, ResumeRecommendation.score.desc())
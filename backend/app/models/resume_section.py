@@ -0,0 +1,22 @@
+from sqlalchemy import Column, Integer, String, DateTime, Index, JSON
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class ResumeSection(Base):
+    """One section of a parsed resume with its cached AI extraction."""
+    __tablename__ = "resume_sections"
+
+    id = Column(Integer, primary_key=True, index=True)
+    resume_id = Column(Integer, index=True, nullable=False)
+    user_id = Column(Integer, nullable=False)
+    position = Column(Integer, nullable=False)
+    heading = Column(String(255), nullable=True)
+    content_sha256 = Column(String(64), nullable=False)
+    # {"skills": [...], "experience_years": ..., "role": ...}; SQL NULL while not analyzed yet
+    extraction = Column(JSON(none_as_null=True), nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+# unchanged sections of a user's earlier versions are found by hash
+Index('ix_resume_sections_user_id_sha256', ResumeSection.user_id, ResumeSection.content_sha256)
@@ -0,0 +1,15 @@
+from sqlalchemy import Column, Integer, String, DateTime, JSON
+from sqlalchemy.sql import func
+from app.db.database import Base
+
+
+class SavedSearch(Base):
+    __tablename__ = "saved_searches"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, index=True, nullable=False)
+    name = Column(String(255), nullable=True)
+    query = Column(String(500), nullable=True)
+    location = Column(String(255), nullable=True)
+    skills = Column(JSON, nullable=True)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
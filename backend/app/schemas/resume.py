@@ -11,12 +11,13 @@ class ResumeBase(BaseModel):
 
 
 class ResumeCreate(ResumeBase):
-    pass
+    file_sha256: Optional[str] = None
 
 
 class Resume(ResumeBase):
     id: int
     user_id: int
+    role: Optional[str] = None
     created_at: datetime
     updated_at: Optional[datetime] = None
 
@@ -6,3 +6,9 @@ class ResumeAnalysisResult(BaseModel):
     skills: List[str]
     experience_years: Optional[float]
     role: Optional[str]
+
+
+class SectionExtraction(BaseModel):
+    skills: List[str] = []
+    experience_years: Optional[float] = None
+    role: Optional[str] = None
@@ -0,0 +1,29 @@
+from pydantic import BaseModel
+from datetime import datetime
+from typing import Optional, List
+
+
+class SavedSearchCreate(BaseModel):
+    name: Optional[str] = None
+    query: Optional[str] = None
+    location: Optional[str] = None
+    skills: Optional[List[str]] = None
+
+
+class SavedSearch(SavedSearchCreate):
+    id: int
+    user_id: int
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class JobAlert(BaseModel):
+    id: int
+    saved_search_id: int
+    job_id: int
+    created_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
@@ -0,0 +1,177 @@
+from __future__ import annotations
+
+import logging
+from typing import TYPE_CHECKING, List, Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.core.tracing import trace_service
+from app.models.job import Job
+from app.models.job_alert import JobAlert
+from app.models.saved_search import SavedSearch
+from app.schemas.saved_search import SavedSearchCreate
+from app.services.job_search_service import JobSearchService, JOB_INDEX_SETTINGS, JOB_MAPPINGS
+
+if TYPE_CHECKING:
+    from elasticsearch import AsyncElasticsearch, Elasticsearch
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+SAVED_SEARCH_INDEX = "saved_searches"
+# jobs per percolate request, and saved-search hits fetched per page of results
+PERCOLATE_BATCH_SIZE = 100
+PERCOLATE_PAGE_SIZE = 1000
+
+# percolated documents are analyzed with this index's mapping, so it mirrors the jobs index
+SAVED_SEARCH_MAPPINGS = {
+    "properties": {
+        **JOB_MAPPINGS["properties"],
+        "query": {"type": "percolator"},
+        "saved_search_id": {"type": "integer"},
+        "user_id": {"type": "integer"},
+    }
+}
+_INDEX_BODY = {"index": SAVED_SEARCH_INDEX, "settings": JOB_INDEX_SETTINGS, "mappings": SAVED_SEARCH_MAPPINGS}
+
+
+def _percolator_document(saved: SavedSearch) -> dict:
+    # alerts are pushed to users unasked, so they use whole-word matching rather than
+    # browse's prefix and trigram fallbacks
+    return {
+        "query": JobSearchService.build_query(saved.query, saved.location, saved.skills, profile="precise"),
+        "saved_search_id": saved.id,
+        "user_id": saved.user_id,
+    }
+
+
+@trace_service
+class AlertService:
+    """
+    Saved searches stored as ES percolator queries.
+    New jobs are percolated against them in batches, so the cost of alerting
+    scales with the number of matches rather than the number of saved searches.
+    """
+
+    @staticmethod
+    def create_index(es: Elasticsearch) -> None:
+        if es.indices.exists(index=SAVED_SEARCH_INDEX):
+            return
+        es.indices.create(**_INDEX_BODY)
+
+    @staticmethod
+    async def create_index_async(es: AsyncElasticsearch) -> None:
+        if await es.indices.exists(index=SAVED_SEARCH_INDEX):
+            return
+        await es.indices.create(**_INDEX_BODY)
+
+    @staticmethod
+    async def create_saved_search_async(
+        db: AsyncSession, es: AsyncElasticsearch, user_id: int, data: SavedSearchCreate
+    ) -> SavedSearch:
+        saved = SavedSearch(
+            user_id=user_id,
+            name=data.name,
+            query=data.query,
+            location=data.location,
+            skills=data.skills,
+        )
+        db.add(saved)
+        await db.commit()
+        await db.refresh(saved)
+
+        await AlertService.create_index_async(es)
+        await es.index(
+            index=SAVED_SEARCH_INDEX,
+            id=saved.id,
+            document=_percolator_document(saved),
+        )
+        return saved
+
+    @staticmethod
+    def reindex_saved_searches(db: Session, es: Elasticsearch) -> int:
+        """Rewrite every stored percolator query, e.g. after the query builder changed."""
+        from elasticsearch import helpers
+
+        AlertService.create_index(es)
+        actions = (
+            {"_index": SAVED_SEARCH_INDEX, "_id": saved.id, "_source": _percolator_document(saved)}
+            for saved in db.query(SavedSearch).yield_per(1000)
+        )
+        indexed, _ = helpers.bulk(es, actions)
+        return indexed
+
+    @staticmethod
+    async def list_saved_searches_async(db: AsyncSession, user_id: int) -> List[SavedSearch]:
+        result = await db.scalars(select(SavedSearch).where(SavedSearch.user_id == user_id).order_by(SavedSearch.id))
+        return list(result.all())
+
+    @staticmethod
+    async def delete_saved_search_async(db: AsyncSession, es: AsyncElasticsearch, user_id: int, saved_search_id: int):
+        saved = await db.scalar(
+            select(SavedSearch).where(SavedSearch.id == saved_search_id, SavedSearch.user_id == user_id)
+        )
+        if not saved:
+            return None
+
+        await db.delete(saved)
+        await db.commit()
+        try:
+            await es.delete(index=SAVED_SEARCH_INDEX, id=saved_search_id)
+        except Exception:
+            # ignore missing docs
+            pass
+        return saved
+
+    @staticmethod
+    def percolate_jobs(db: Session, es: Elasticsearch, jobs: List[Job]) -> int:
+        """Record an alert for every (saved search, job) match. Returns the number of alerts created."""
+        if not jobs or not es.indices.exists(index=SAVED_SEARCH_INDEX):
+            return 0
+
+        alerts = []
+        for start in range(0, len(jobs), PERCOLATE_BATCH_SIZE):
+            batch = jobs[start:start + PERCOLATE_BATCH_SIZE]
+            documents = [JobSearchService._document(job) for job in batch]
+            search_after = None
+
+            while True:
+                body = {
+                    "size": PERCOLATE_PAGE_SIZE,
+                    "query": {"percolate": {"field": "query", "documents": documents}},
+                    "_source": ["saved_search_id", "user_id"],
+                    "sort": [{"saved_search_id": "asc"}],
+                }
+                if search_after is not None:
+                    body["search_after"] = search_after
+
+                response = es.search(index=SAVED_SEARCH_INDEX, body=body)
+                hits = response["hits"]["hits"]
+                for hit in hits:
+                    source = hit["_source"]
+                    # which of the batch's documents this saved search matched
+                    for slot in hit.get("fields", {}).get("_percolator_document_slot", [0]):
+                        alerts.append(JobAlert(
+                            user_id=source["user_id"],
+                            saved_search_id=source["saved_search_id"],
+                            job_id=batch[slot].id,
+                        ))
+
+                if len(hits) < PERCOLATE_PAGE_SIZE:
+                    break
+                search_after = hits[-1]["sort"]
+
+        if alerts:
+            db.add_all(alerts)
+            db.commit()
+            logging.info("Created %d job alerts for %d jobs", len(alerts), len(jobs))
+        return len(alerts)
+
+    @staticmethod
+    async def list_alerts_async(db: AsyncSession, user_id: int, after_id: int = 0, limit: int = 50) -> List[JobAlert]:
+        result = await db.scalars(
+            select(JobAlert)
+            .where(JobAlert.user_id == user_id, JobAlert.id > after_id)
+            .order_by(JobAlert.id)
+            .limit(limit)
+        )
+        return list(result.all())
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import csv
+import io
+import logging
+from typing import TYPE_CHECKING, AsyncIterator, Dict, List, Optional
+
+import orjson
+
+from app.core.config import settings
+from app.models.resume import Resume
+from app.services.job_match_search_service import JobMatchSearchService, hit_score
+from app.services.job_match_service import JobMatchService
+from app.services.job_search_service import JobSearchService, LIST_FIELDS
+
+if TYPE_CHECKING:
+    from elasticsearch import AsyncElasticsearch
+
+# Exports walk a point-in-time snapshot with search_after, one page at a time, and encode
+# rows as they arrive. StreamingResponse only pulls the next chunk once the previous one
+# was sent, so a slow client slows the ES paging down instead of buffering the export.
+
+EXPORT_FORMATS = {"ndjson": "application/x-ndjson", "csv": "text/csv; charset=utf-8"}
+JOB_EXPORT_COLUMNS = ["job_id", "score", *LIST_FIELDS, "created_at"]
+MATCH_EXPORT_COLUMNS = ["job_id", "match_score", "verdict", *LIST_FIELDS]
+PIT_KEEP_ALIVE = "2m"
+# bytes buffered before a chunk is handed to the response
+CHUNK_SIZE = 64 * 1024
+
+
+async def _pit_hits(es: AsyncElasticsearch, index: str, body: dict, limit: Optional[int]) -> AsyncIterator[dict]:
+    pit = await es.open_point_in_time(index=index, keep_alive=PIT_KEEP_ALIVE, ignore_unavailable=True)
+    pit_id = pit["id"]
+    page_size = settings.EXPORT_PAGE_SIZE
+    search_after = None
+    sent = 0
+    try:
+        while limit is None or sent < limit:
+            size = page_size if limit is None else min(page_size, limit - sent)
+            page = {**body, "size": size, "pit": {"id": pit_id, "keep_alive": PIT_KEEP_ALIVE}, "track_total_hits": False}
+            if search_after is not None:
+                page["search_after"] = search_after
+
+            response = await es.search(body=page)
+            # the PIT id may change between pages; always continue with the latest
+            pit_id = response.get("pit_id", pit_id)
+            hits = response["hits"]["hits"]
+            for hit in hits:
+                yield hit
+            sent += len(hits)
+            if len(hits) < size:
+                return
+            search_after = hits[-1]["sort"]
+    finally:
+        try:
+            await es.close_point_in_time(id=pit_id)
+        except Exception:
+            # it expires after PIT_KEEP_ALIVE anyway
+            logging.warning("Could not close export point in time", exc_info=True)
+
+
+async def job_rows(
+    es: AsyncElasticsearch,
+    query: Optional[str] = None,
+    location: Optional[str] = None,
+    skills: Optional[List[str]] = None,
+    include_archived: bool = False,
+    limit: Optional[int] = None,
+) -> AsyncIterator[Dict]:
+    """Every job matching a search, best first when there is a query, else in index order."""
+    index = await JobSearchService.search_target_async(es, include_archived)
+    # _shard_doc is the cheapest unique tiebreaker a PIT offers
+    sort = [{"_score": "desc"}, {"_shard_doc": "asc"}] if query else [{"_shard_doc": "asc"}]
+    body = {
+        "query": JobSearchService.build_query(query, location, skills),
+        "_source": [*LIST_FIELDS, "created_at"],
+        "sort": sort,
+    }
+    async for hit in _pit_hits(es, index, body, limit):
+        yield {"job_id": int(hit["_id"]), "score": hit.get("_score"), **(hit.get("_source") or {})}
+
+
+async def match_rows(
+    es: AsyncElasticsearch,
+    resume: Resume,
+    location: Optional[str] = None,
+    query: Optional[str] = None,
+    include_archived: bool = False,
+    limit: Optional[int] = None,
+) -> AsyncIterator[Dict]:
+    """Every job sharing a skill with the resume, ranked by the stored match script."""
+    body = JobMatchSearchService.match_body(resume, location, query)
+    if body is None:
+        return
+    await JobMatchSearchService.ensure_script_async(es)
+    body["sort"] = [{"_score": "desc"}, {"_shard_doc": "asc"}]
+
+    index = await JobSearchService.search_target_async(es, include_archived)
+    async for hit in _pit_hits(es, index, body, limit):
+        yield {
+            "job_id": int(hit["_id"]),
+            "match_score": hit_score(hit),
+            "verdict": JobMatchService.verdict(hit_score(hit)),
+            **(hit.get("_source") or {}),
+        }
+
+
+async def encode_ndjson(rows: AsyncIterator[Dict]) -> AsyncIterator[bytes]:
+    buffer = bytearray()
+    async for row in rows:
+        buffer += orjson.dumps(row)
+        buffer += b"\n"
+        if len(buffer) >= CHUNK_SIZE:
+            yield bytes(buffer)
+            buffer.clear()
+    if buffer:
+        yield bytes(buffer)
+
+
+def _csv_value(value):
+    # list columns (required_skills) become one cell
+    if isinstance(value, list):
+        return ";".join(str(v) for v in value)
+    return value
+
+
+async def encode_csv(rows: AsyncIterator[Dict], columns: List[str]) -> AsyncIterator[bytes]:
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    async for row in rows:
+        writer.writerow([_csv_value(row.get(column)) for column in columns])
+        if buffer.tell() >= CHUNK_SIZE:
+            yield buffer.getvalue().encode("utf-8")
+            buffer.seek(0)
+            buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue().encode("utf-8")
+
+
+def encode(rows: AsyncIterator[Dict], fmt: str, columns: List[str]) -> AsyncIterator[bytes]:
+    if fmt == "csv":
+        return encode_csv(rows, columns)
+    return encode_ndjson(rows)
+
+
+async def prime(chunks: AsyncIterator[bytes]) -> AsyncIterator[bytes]:
+    """Produce the first chunk now, so a failing search becomes an error status rather than a truncated body."""
+    try:
+        first = await chunks.__anext__()
+    except StopAsyncIteration:
+        first = b""
+
+    async def stream() -> AsyncIterator[bytes]:
+        if first:
+            yield first
+        async for chunk in chunks:
+            yield chunk
+
+    return stream()
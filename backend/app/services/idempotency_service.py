@@ -0,0 +1,260 @@
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Dict, List, Optional, Tuple
+
+from fastapi import Request
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import UploadFile
+from sqlalchemy import and_, delete, or_, update
+from sqlalchemy.exc import IntegrityError
+
+from app.core import metrics
+from app.core.config import settings
+from app.core.security import decode_access_token
+from app.core.tracing import trace_service
+from app.db.database import AsyncSessionLocal
+from app.models.idempotency_key import IdempotencyKey
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# Expensive, non-idempotent endpoints that honour an Idempotency-Key header
+IDEMPOTENT_ROUTES = (
+    ("POST", re.compile(r"^/api/resumes/upload$")),
+    ("POST", re.compile(r"^/api/resumes/\d+/analyze$")),
+    ("POST", re.compile(r"^/api/jobs$")),
+)
+MAX_KEY_LENGTH = 255
+# answers a retry must not get again: it may be authorized, or the server may have capacity now
+UNCACHEABLE_STATUS = {401, 403, 408, 429}
+# how often a waiter re-reads a key another worker is running
+POLL_INTERVAL_SECONDS = 0.2
+PURGE_INTERVAL_SECONDS = 300
+# recomputed from the stored body whenever a response is rebuilt
+_FRAMING_HEADERS = {"content-length", "transfer-encoding"}
+
+metrics.describe("idempotency_requests_total", "counter", "Requests with an Idempotency-Key by outcome")
+
+# keys this process is executing; local duplicates wait on the event instead of polling
+_running: Dict[Tuple[int, str], asyncio.Event] = {}
+_last_purge = 0.0
+
+
+def _now() -> datetime:
+    return datetime.now(timezone.utc)
+
+
+def _caller(request: Request) -> Optional[int]:
+    parts = (request.headers.get("authorization") or "").split()
+    if len(parts) != 2 or parts[0].lower() != "bearer":
+        return None
+    try:
+        return int(decode_access_token(parts[1]).get("user_id"))
+    except Exception:
+        return None
+
+
+async def _fingerprint(request: Request, body: bytes) -> str:
+    digest = hashlib.sha256(f"{request.method} {request.url.path}\n".encode())
+    if request.headers.get("content-type", "").lower().startswith("multipart/form-data"):
+        # the raw body embeds a boundary the client picks at random on every send
+        fields = []
+        form = await request.form()
+        try:
+            for name, value in form.multi_items():
+                if isinstance(value, UploadFile):
+                    content = hashlib.sha256(await value.read()).hexdigest()
+                    fields.append([name, value.filename, value.content_type, content])
+                else:
+                    fields.append([name, value])
+        finally:
+            await form.close()
+        digest.update(json.dumps(fields).encode())
+    else:
+        digest.update(body)
+    return digest.hexdigest()
+
+
+def _header_pairs(response: Response) -> List[List[str]]:
+    return [
+        [name.decode("latin-1"), value.decode("latin-1")]
+        for name, value in response.raw_headers
+        if name.decode("latin-1").lower() not in _FRAMING_HEADERS
+    ]
+
+
+def _rebuild(body: bytes, status_code: int, headers: List[List[str]], replayed: bool = False) -> Response:
+    response = Response(content=body, status_code=status_code)
+    response.raw_headers.extend((name.encode("latin-1"), value.encode("latin-1")) for name, value in headers)
+    if replayed:
+        response.headers["Idempotent-Replayed"] = "true"
+    return response
+
+
+def _replay(record: IdempotencyKey) -> Response:
+    return _rebuild(record.response_body or b"", record.status_code, record.response_headers, replayed=True)
+
+
+@trace_service
+class IdempotencyService:
+    """
+    Replays the stored response of a request retried with the same Idempotency-Key.
+    A duplicate arriving while the first is still running waits for its result.
+    """
+
+    @staticmethod
+    def applies(method: str, path: str) -> bool:
+        return any(method == m and pattern.match(path) for m, pattern in IDEMPOTENT_ROUTES)
+
+    @staticmethod
+    async def claim(db: AsyncSession, user_id: int, key: str, fingerprint: str) -> Optional[IdempotencyKey]:
+        """Claim the key for this request. Returns None when claimed, else the record holding it."""
+        now = _now()
+        values = {
+            "fingerprint": fingerprint,
+            "status": "in_progress",
+            "locked_until": now + timedelta(seconds=settings.IDEMPOTENCY_LOCK_SECONDS),
+            "status_code": None,
+            "response_body": None,
+            "response_headers": None,
+            "expires_at": now + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+        }
+        db.add(IdempotencyKey(user_id=user_id, key=key, **values))
+        try:
+            await db.commit()
+            return None
+        except IntegrityError:
+            await db.rollback()
+
+        # an expired record, or a claim abandoned by a crashed worker, can be taken over
+        result = await db.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                or_(
+                    IdempotencyKey.expires_at < now,
+                    and_(IdempotencyKey.status == "in_progress", IdempotencyKey.locked_until < now),
+                ),
+            )
+            .values(**values)
+        )
+        await db.commit()
+        if result.rowcount == 1:
+            return None
+        return await db.get(IdempotencyKey, (user_id, key), populate_existing=True)
+
+    @staticmethod
+    async def complete(db: AsyncSession, user_id: int, key: str, status_code: int, headers: List[List[str]], body: bytes) -> None:
+        await db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            .values(
+                status="completed",
+                status_code=status_code,
+                response_body=body,
+                response_headers=headers,
+                expires_at=_now() + timedelta(seconds=settings.IDEMPOTENCY_TTL_SECONDS),
+            )
+        )
+        await db.commit()
+
+    @staticmethod
+    async def release(db: AsyncSession, user_id: int, key: str) -> None:
+        """Drop an in-progress claim so the next retry runs the request again."""
+        await db.execute(
+            delete(IdempotencyKey).where(
+                IdempotencyKey.user_id == user_id,
+                IdempotencyKey.key == key,
+                IdempotencyKey.status == "in_progress",
+            )
+        )
+        await db.commit()
+
+    @staticmethod
+    async def purge_expired(db: AsyncSession) -> int:
+        result = await db.execute(delete(IdempotencyKey).where(IdempotencyKey.expires_at < _now()))
+        await db.commit()
+        return result.rowcount
+
+    @staticmethod
+    async def handle(request: Request, key: str, call_next) -> Response:
+        global _last_purge
+
+        user_id = _caller(request)
+        if user_id is None:
+            # the route rejects the request itself; nothing worth remembering
+            return await call_next(request)
+        if not key or len(key) > MAX_KEY_LENGTH:
+            return JSONResponse(status_code=400, content={"detail": f"Idempotency-Key must be 1-{MAX_KEY_LENGTH} characters"})
+
+        body = await request.body()
+        fingerprint = await _fingerprint(request, body)
+        running_key = (user_id, key)
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+
+        while True:
+            async with AsyncSessionLocal() as db:
+                if time.monotonic() - _last_purge > PURGE_INTERVAL_SECONDS:
+                    _last_purge = time.monotonic()
+                    await IdempotencyService.purge_expired(db)
+                existing = await IdempotencyService.claim(db, user_id, key, fingerprint)
+
+            if existing is None:
+                break
+            if existing.fingerprint != fingerprint:
+                metrics.inc("idempotency_requests_total", outcome="mismatch")
+                return JSONResponse(
+                    status_code=422,
+                    content={"detail": "Idempotency-Key was already used for a different request"},
+                )
+            if existing.status == "completed":
+                metrics.inc("idempotency_requests_total", outcome="replayed")
+                return _replay(existing)
+
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                metrics.inc("idempotency_requests_total", outcome="timeout")
+                return JSONResponse(
+                    status_code=409,
+                    content={"detail": "A request with this Idempotency-Key is still in progress"},
+                    headers={"Retry-After": "1"},
+                )
+            running = _running.get(running_key)
+            try:
+                if running is not None:
+                    await asyncio.wait_for(running.wait(), remaining)
+                else:
+                    await asyncio.sleep(min(POLL_INTERVAL_SECONDS, remaining))
+            except asyncio.TimeoutError:
+                pass
+
+        metrics.inc("idempotency_requests_total", outcome="executed")
+        done = _running[running_key] = asyncio.Event()
+        try:
+            response = await call_next(request)
+            response_body = b"".join([chunk async for chunk in response.body_iterator])
+            headers = _header_pairs(response)
+            async with AsyncSessionLocal() as db:
+                if response.status_code >= 500 or response.status_code in UNCACHEABLE_STATUS:
+                    await IdempotencyService.release(db, user_id, key)
+                else:
+                    await IdempotencyService.complete(db, user_id, key, response.status_code, headers, response_body)
+            return _rebuild(response_body, response.status_code, headers)
+        except BaseException:
+            try:
+                async with AsyncSessionLocal() as db:
+                    await IdempotencyService.release(db, user_id, key)
+            except Exception:
+                logging.exception("Could not release idempotency key %s of user %s", key, user_id)
+            raise
+        finally:
+            _running.pop(running_key, None)
+            done.set()
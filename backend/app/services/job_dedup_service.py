@@ -0,0 +1,176 @@
+import hashlib
+import logging
+import random
+import re
+import threading
+from array import array
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.tracing import trace_service
+from app.models.job import Job
+from app.models.job_signature import JobSignature
+
+# 16 bands x 4 rows puts the LSH candidate threshold near 0.5 Jaccard, well
+# below JOB_DEDUP_THRESHOLD, so true near-duplicates are almost never missed;
+# candidates are then confirmed against the full signature.
+NUM_PERM = 64
+BANDS = 16
+ROWS = NUM_PERM // BANDS
+SHINGLE_SIZE = 3
+_PRIME = (1 << 61) - 1
+# incremental loads re-read this much before the newest signature seen, so a row inserted
+# earlier but committed later (by another worker) is still picked up
+LOAD_OVERLAP_SECONDS = 120
+
+_rng = random.Random(20240229)  # fixed seed: signatures are persisted and must stay comparable
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(0, _PRIME)) for _ in range(NUM_PERM)]
+_WORD_RE = re.compile(r"\w+")
+
+Signature = Tuple[int, ...]
+
+
+def _shingles(text: str) -> Set[int]:
+    words = _WORD_RE.findall(text.lower())
+    if len(words) < SHINGLE_SIZE:
+        grams = [" ".join(words)] if words else []
+    else:
+        grams = [" ".join(words[i:i + SHINGLE_SIZE]) for i in range(len(words) - SHINGLE_SIZE + 1)]
+    return {int.from_bytes(hashlib.blake2b(g.encode("utf-8"), digest_size=8).digest(), "little") for g in grams}
+
+
+def minhash(text: str) -> Optional[Signature]:
+    hashes = _shingles(text)
+    if not hashes:
+        return None
+    return tuple(min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS)
+
+
+def similarity(a: Signature, b: Signature) -> float:
+    """Estimated Jaccard similarity: the fraction of agreeing MinHash slots."""
+    return sum(x == y for x, y in zip(a, b)) / NUM_PERM
+
+
+def _band_keys(signature: Signature) -> List[Tuple[int, Signature]]:
+    return [(band, signature[band * ROWS:(band + 1) * ROWS]) for band in range(BANDS)]
+
+
+class _LSHIndex:
+    def __init__(self):
+        self.buckets: Dict[Tuple[int, Signature], Set[int]] = {}
+        self.signatures: Dict[int, Signature] = {}
+        # newest inserted_at loaded from job_signatures; local adds don't move it
+        self.loaded_until: Optional[datetime] = None
+        self.lock = threading.Lock()
+
+    def add(self, job_id: int, signature: Signature) -> None:
+        self.signatures[job_id] = signature
+        for key in _band_keys(signature):
+            self.buckets.setdefault(key, set()).add(job_id)
+
+    def remove(self, job_id: int) -> None:
+        signature = self.signatures.pop(job_id, None)
+        if signature is None:
+            return
+        for key in _band_keys(signature):
+            bucket = self.buckets.get(key)
+            if bucket:
+                bucket.discard(job_id)
+                if not bucket:
+                    del self.buckets[key]
+
+    def candidates(self, signature: Signature) -> Set[int]:
+        found: Set[int] = set()
+        for key in _band_keys(signature):
+            found |= self.buckets.get(key, set())
+        return found
+
+
+_index = _LSHIndex()
+
+
+def _pack(signature: Signature) -> bytes:
+    return array("Q", signature).tobytes()
+
+
+def _unpack(blob: bytes) -> Signature:
+    values = array("Q")
+    values.frombytes(blob)
+    return tuple(values)
+
+
+@trace_service
+class JobDedupService:
+    """
+    Near-duplicate detection for incoming job postings.
+    MinHash signatures over title + company + description shingles, looked up
+    in an in-memory LSH index that is persisted to the job_signatures table.
+    """
+
+    @staticmethod
+    def signature_for(title: str, company: str, description: str) -> Optional[Signature]:
+        return minhash(" ".join(part or "" for part in (title, company, description)))
+
+    @staticmethod
+    def load(db: Session) -> None:
+        """Pull signatures written since the last load (by this or another worker) into the index."""
+        with _index.lock:
+            rows = db.query(JobSignature.job_id, JobSignature.signature, JobSignature.inserted_at)
+            if _index.loaded_until is not None:
+                rows = rows.filter(
+                    JobSignature.inserted_at >= _index.loaded_until - timedelta(seconds=LOAD_OVERLAP_SECONDS)
+                )
+            loaded = 0
+            for job_id, blob, inserted_at in rows.order_by(JobSignature.inserted_at).yield_per(1000):
+                if job_id not in _index.signatures:
+                    _index.add(job_id, _unpack(blob))
+                    loaded += 1
+                if _index.loaded_until is None or inserted_at > _index.loaded_until:
+                    _index.loaded_until = inserted_at
+        if loaded:
+            logging.info("Loaded %d job signatures into the dedup index", loaded)
+
+    @staticmethod
+    def find_duplicate(db: Session, signature: Optional[Signature]) -> Optional[Tuple[int, float]]:
+        """Return (job_id, similarity) of the closest existing posting at or above the threshold."""
+        if signature is None or not settings.JOB_DEDUP_ENABLED:
+            return None
+
+        JobDedupService.load(db)
+        with _index.lock:
+            scored = [
+                (job_id, similarity(signature, _index.signatures[job_id]))
+                for job_id in _index.candidates(signature)
+            ]
+        scored = sorted(
+            (item for item in scored if item[1] >= settings.JOB_DEDUP_THRESHOLD),
+            key=lambda item: -item[1],
+        )
+        if not scored:
+            return None
+
+        # another worker may have deleted a candidate; only report postings that still exist
+        existing = {job_id for (job_id,) in db.query(Job.id).filter(Job.id.in_([job_id for job_id, _ in scored]))}
+        for job_id, score in scored:
+            if job_id in existing:
+                return job_id, score
+        return None
+
+    @staticmethod
+    def add(db: Session, job_id: int, signature: Optional[Signature]) -> None:
+        if signature is None:
+            return
+        db.merge(JobSignature(job_id=job_id, signature=_pack(signature)))
+        db.commit()
+        with _index.lock:
+            _index.add(job_id, signature)
+
+    @staticmethod
+    def remove(db: Session, job_id: int) -> None:
+        db.query(JobSignature).filter(JobSignature.job_id == job_id).delete()
+        db.commit()
+        with _index.lock:
+            _index.remove(job_id)
@@ -1,9 +1,16 @@
-from elasticsearch import Elasticsearch
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 from app.models.job import Job
+from app.core.tracing import trace_service
+
+if TYPE_CHECKING:
+    from elasticsearch import Elasticsearch
 
 INDEX_NAME = "jobs"
 
 
+@trace_service
 class JobIndexService:
     @staticmethod
     def index_job(es: Elasticsearch, job: Job) -> None:
@@ -0,0 +1,174 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING, Dict, List, Optional
+
+from sqlalchemy import select
+
+from app.core.skills import normalize_skills
+from app.core.tracing import trace_service
+from app.models.job import Job
+from app.models.resume import Resume
+from app.services.job_match_service import SCORE_DECIMALS, JobMatchService
+from app.services.job_search_service import JobSearchService, LIST_FIELDS
+
+if TYPE_CHECKING:
+    from elasticsearch import AsyncElasticsearch
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+MATCH_SCRIPT_ID = "job-match-score"
+
+# Painless port of JobMatchService.match_resume_to_job's score.
+# required_skills doc values are normalized (lowercase_ascii) and de-duplicated;
+# app.core.skills.normalize_skill gives both the params below and the Python
+# scorer the same normalization, so the two rank identically.
+MATCH_SCRIPT = """
+def jobSkills = doc['required_skills'];
+int total = jobSkills.size();
+double matched = 0;
+for (String skill : jobSkills) {
+    if (params.resume_skills.contains(skill)) { matched += 1; }
+}
+
+double skillScore = total > 0 ? matched / total * 70 : 0;
+
+double experienceScore = 0;
+if (doc.containsKey('experience_years') && doc['experience_years'].size() > 0) {
+    double jobExp = doc['experience_years'].value;
+    if (params.resume_years >= jobExp) {
+        experienceScore = 20;
+    } else if (Math.abs(params.resume_years - jobExp) <= 1) {
+        experienceScore = 10;
+    }
+}
+
+double coverageBonus = (total > 0 && matched / total >= 0.8) ? 10 : 0;
+
+return Math.min(Math.round((skillScore + experienceScore + coverageBonus) * 100) / 100.0, 100);
+"""
+
+# Python rounds half-to-even, Painless half-up
+PARITY_TOLERANCE = 0.011
+
+_script_installed = False
+
+
+def _top_jobs_body(resume: Resume, k: int, location: Optional[str], query: Optional[str]) -> Optional[dict]:
+    resume_skills = sorted(normalize_skills(resume.skills))
+    if not resume_skills:
+        return None
+
+    # candidates share at least one skill; the stored script ranks them
+    candidates = {
+        "bool": {
+            "must": [JobSearchService.build_query(query, location, None)],
+            "filter": [{"terms": {"required_skills": resume_skills}}],
+        }
+    }
+    return {
+        "size": k,
+        "query": {
+            "script_score": {
+                "query": candidates,
+                "script": {
+                    "id": MATCH_SCRIPT_ID,
+                    "params": {
+                        "resume_skills": resume_skills,
+                        "resume_years": float(resume.experience_years or 0),
+                    },
+                },
+            }
+        },
+        "_source": LIST_FIELDS,
+        "track_total_hits": False,
+    }
+
+
+def hit_score(hit: Dict) -> float:
+    """A match script hit's score as the Python scorer reports it (ES scores are float32)."""
+    return round(hit["_score"], SCORE_DECIMALS)
+
+
+def _top_jobs_result(response) -> List[Dict]:
+    return [
+        {
+            "job_id": int(hit["_id"]),
+            "match_score": hit_score(hit),
+            "verdict": JobMatchService.verdict(hit_score(hit)),
+            "source": hit["_source"],
+        }
+        for hit in response["hits"]["hits"]
+    ]
+
+
+def _parity(resume: Resume, results: List[Dict], jobs: Dict[int, Job]) -> Dict:
+    mismatches = []
+    for result in results:
+        job = jobs.get(result["job_id"])
+        if job is None:
+            mismatches.append({"job_id": result["job_id"], "es_score": result["match_score"], "python_score": None})
+            continue
+        expected = JobMatchService.match_resume_to_job(resume, job)["match_score"]
+        if abs(expected - result["match_score"]) > PARITY_TOLERANCE:
+            mismatches.append({"job_id": job.id, "es_score": result["match_score"], "python_score": expected})
+
+    return {"checked": len(results), "mismatches": mismatches}
+
+
+@trace_service
+class JobMatchSearchService:
+    """
+    Top-k job ranking for a resume, scored inside Elasticsearch.
+    JobMatchService stays the reference implementation; verify_parity_async compares the two.
+    """
+
+    @staticmethod
+    async def install_script_async(es: AsyncElasticsearch) -> None:
+        global _script_installed
+        await es.put_script(id=MATCH_SCRIPT_ID, script={"lang": "painless", "source": MATCH_SCRIPT})
+        _script_installed = True
+
+    @staticmethod
+    async def ensure_script_async(es: AsyncElasticsearch) -> None:
+        if not _script_installed:
+            await JobMatchSearchService.install_script_async(es)
+
+    @staticmethod
+    def match_body(resume: Resume, location: Optional[str] = None, query: Optional[str] = None) -> Optional[dict]:
+        """The top-jobs request without a size, for callers that page through every candidate."""
+        body = _top_jobs_body(resume, 0, location, query)
+        if body is not None:
+            body.pop("size")
+        return body
+
+    @staticmethod
+    async def top_jobs_async(
+        es: AsyncElasticsearch,
+        resume: Resume,
+        k: int = 10,
+        location: Optional[str] = None,
+        query: Optional[str] = None,
+        include_archived: bool = False,
+    ) -> List[Dict]:
+        if not _script_installed:
+            await JobMatchSearchService.install_script_async(es)
+
+        body = _top_jobs_body(resume, k, location, query)
+        if body is None:
+            return []
+
+        response = await es.search(
+            index=await JobSearchService.search_target_async(es, include_archived),
+            body=body,
+            ignore_unavailable=True,
+            allow_no_indices=True,
+        )
+        return _top_jobs_result(response)
+
+    @staticmethod
+    async def verify_parity_async(db: AsyncSession, resume: Resume, results: List[Dict]) -> Dict:
+        """Re-score ES results with the Python reference and report disagreements."""
+        job_ids = [r["job_id"] for r in results]
+        jobs = {}
+        if job_ids:
+            jobs = {job.id: job for job in (await db.scalars(select(Job).where(Job.id.in_(job_ids)))).all()}
+        return _parity(resume, results, jobs)
@@ -1,22 +1,42 @@
 from typing import Dict, List, Set
 from app.models.resume import Resume
 from app.models.job import Job
+from app.core.skills import normalize_skill
+from app.core.tracing import trace_service
 
+# match scores are reported with this many decimals, however they were computed
+SCORE_DECIMALS = 2
 
+
+@trace_service
 class JobMatchService:
     """
     Intelligent and explainable Resume ↔ Job matching logic.
     Deterministic, transparent, and production-safe.
     """
 
+    @staticmethod
+    def verdict(score: float) -> str:
+        if score >= 85:
+            return "Excellent Fit"
+        if score >= 70:
+            return "Good Fit"
+        if score >= 50:
+            return "Partial Fit"
+        return "Low Fit"
+
     @staticmethod
     def match_resume_to_job(resume: Resume, job: Job) -> Dict:
-        # Defensive checks
-        resume_skills: Set[str] = set(resume.skills or [])
-        job_skills: Set[str] = set(job.required_skills or [])
+        # Defensive checks; skills compare case- and accent-insensitively, like the ES script,
+        # and are reported in the job's own spelling
+        resume_skills: Set[str] = {normalize_skill(s) for s in resume.skills or [] if s and s.strip()}
+        job_skills: Dict[str, str] = {}
+        for skill in job.required_skills or []:
+            if skill and skill.strip():
+                job_skills.setdefault(normalize_skill(skill), skill.strip())
 
-        matched_skills: List[str] = list(resume_skills & job_skills)
-        missing_skills: List[str] = list(job_skills - resume_skills)
+        matched_skills: List[str] = [spelling for key, spelling in job_skills.items() if key in resume_skills]
+        missing_skills: List[str] = [spelling for key, spelling in job_skills.items() if key not in resume_skills]
 
         # ---------------------------
         # 1️⃣ Skill score (70%)
@@ -50,21 +70,14 @@ class JobMatchService:
         # Final score
         # ---------------------------
         final_score = min(
-            round(skill_score + experience_score + coverage_bonus, 2),
+            round(skill_score + experience_score + coverage_bonus, SCORE_DECIMALS),
             100,
         )
 
         # ---------------------------
         # Verdict
         # ---------------------------
-        if final_score >= 85:
-            verdict = "Excellent Fit"
-        elif final_score >= 70:
-            verdict = "Good Fit"
-        elif final_score >= 50:
-            verdict = "Partial Fit"
-        else:
-            verdict = "Low Fit"
+        verdict = JobMatchService.verdict(final_score)
 
         # ---------------------------
         # Explanation (human-readable)
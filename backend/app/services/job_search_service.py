@@ -1,10 +1,324 @@
-from typing import Optional, List
-from elasticsearch import Elasticsearch
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timezone
+from typing import TYPE_CHECKING, Optional, List
 from app.models.job import Job
+from app.core.skills import clean_skills
+from app.core.tracing import trace_service
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+if TYPE_CHECKING:
+    from elasticsearch import AsyncElasticsearch, Elasticsearch
 
+# Jobs are stored in monthly partitions (jobs-2026.10, ...) named after their created_at.
+# "jobs" is a read alias over every partition; "jobs-write" points at the current month.
+# Rollover is by age only, at the month boundary, rather than ES rollover conditions
+# (max_age / max_primary_shard_size): indexing, deletes, partial reindexes, the search
+# window and retention all derive a job's partition from its created_at month, which a
+# size-triggered rollover would break. A month of postings is far below a shard's size
+# limit; if that changes, raise the template's shard count rather than splitting months.
 JOB_INDEX = "jobs"
+JOB_WRITE_ALIAS = "jobs-write"
+JOB_PARTITION_PREFIX = "jobs-"
+JOB_INDEX_TEMPLATE = "jobs-template"
+
+# fields a client may project with `fields=`; list views default to everything but the full description
+SOURCE_FIELDS = ["title", "company", "description", "required_skills", "location", "salary", "owner_id"]
+LIST_FIELDS = ["title", "company", "required_skills", "location", "salary"]
+SNIPPET_SIZE = 160
+
+# Search profiles trade exactness for ES CPU:
+# - browse: list fields only, hit counting capped, prefix subfields for partial words and a
+#   title trigram fallback for misspelled ones
+# - precise: exact totals, whole-word matching only
+# Typo tolerance comes from n-grams built at index time, not from query-time fuzzy expansion.
+# A single shared trigram is no evidence of a match, so the fallback needs most of them.
+SEARCH_PROFILES = {
+    "browse": {
+        "source": LIST_FIELDS,
+        "track_total_hits": 1000,
+        "fields": [
+            "title^3",
+            "title.prefix^2",
+            "description",
+            "company.text^2",
+            "company.prefix",
+            "required_skills.synonym^2",
+        ],
+        "fuzzy": {"field": "title.trigram", "minimum_should_match": "60%"},
+        "request_cache": True,
+    },
+    "precise": {
+        "source": LIST_FIELDS,
+        "track_total_hits": True,
+        "fields": ["title^3", "description", "company.text^2", "required_skills.synonym^2"],
+        "request_cache": True,
+    },
+}
+DEFAULT_PROFILE = "browse"
+
+FACET_FIELDS = {"skills": "required_skills", "locations": "location", "companies": "company"}
+_facet_cache = TTLCache(maxsize=settings.FACET_CACHE_SIZE, ttl=settings.FACET_CACHE_TTL_SECONDS)
+_partitions_ready_for: Optional[str] = None
+
+# Equivalent skill spellings, expanded at index time on required_skills.synonym
+SKILL_SYNONYMS = [
+    "javascript, js",
+    "typescript, ts",
+    "node.js, nodejs, node",
+    "react, react.js, reactjs",
+    "vue, vue.js, vuejs",
+    "postgresql, postgres, psql",
+    "kubernetes, k8s",
+    "golang, go",
+    "c#, csharp",
+    "c++, cpp",
+    "amazon web services, aws",
+    "google cloud platform, gcp",
+    "machine learning, ml",
+    "ci/cd, cicd",
+    "scikit-learn, sklearn",
+]
+
+JOB_INDEX_SETTINGS = {
+    "analysis": {
+        "filter": {
+            "edge_2_15": {"type": "edge_ngram", "min_gram": 2, "max_gram": 15},
+            "skill_synonyms": {"type": "synonym", "synonyms": SKILL_SYNONYMS},
+        },
+        "tokenizer": {
+            "trigram": {"type": "ngram", "min_gram": 3, "max_gram": 3, "token_chars": ["letter", "digit"]},
+        },
+        "analyzer": {
+            "prefix_index": {
+                "type": "custom",
+                "tokenizer": "standard",
+                "filter": ["lowercase", "asciifolding", "edge_2_15"],
+            },
+            "prefix_search": {"type": "custom", "tokenizer": "standard", "filter": ["lowercase", "asciifolding"]},
+            "trigram": {"type": "custom", "tokenizer": "trigram", "filter": ["lowercase", "asciifolding"]},
+            "skill": {
+                "type": "custom",
+                "tokenizer": "keyword",
+                "filter": ["lowercase", "asciifolding", "skill_synonyms"],
+            },
+        },
+        "normalizer": {
+            "lowercase_ascii": {"type": "custom", "filter": ["lowercase", "asciifolding"]},
+        },
+    }
+}
+
+JOB_MAPPINGS = {
+    "properties": {
+        "title": {
+            "type": "text",
+            "fields": {
+                "raw": {"type": "keyword"},
+                "prefix": {"type": "text", "analyzer": "prefix_index", "search_analyzer": "prefix_search"},
+                "trigram": {"type": "text", "analyzer": "trigram"},
+            },
+        },
+        "company": {
+            "type": "keyword",
+            "fields": {
+                "text": {"type": "text"},
+                "prefix": {"type": "text", "analyzer": "prefix_index", "search_analyzer": "prefix_search"},
+            },
+        },
+        "description": {"type": "text"},
+        # normalized keywords make skill/location filters case- and accent-insensitive
+        "required_skills": {
+            "type": "keyword",
+            "normalizer": "lowercase_ascii",
+            "fields": {"synonym": {"type": "text", "analyzer": "skill"}},
+        },
+        "location": {"type": "keyword", "normalizer": "lowercase_ascii"},
+        "salary": {"type": "keyword"},
+        "owner_id": {"type": "integer"},
+        "experience_years": {"type": "float"},
+        "created_at": {"type": "date"},
+    }
+}
+
+
+def partition_for(created_at: Optional[datetime] = None) -> str:
+    created_at = created_at or datetime.now(timezone.utc)
+    return f"{JOB_PARTITION_PREFIX}{created_at:%Y.%m}"
+
+
+def month_window_start(months: int, now: Optional[datetime] = None) -> datetime:
+    """Start of the oldest month in a window of ``months`` partitions ending with the current one."""
+    oldest = _months_back(months, now)[-1][len(JOB_PARTITION_PREFIX):]
+    year, month = (int(part) for part in oldest.split("."))
+    return datetime(year, month, 1, tzinfo=timezone.utc)
+
+
+def _months_back(n: int, now: Optional[datetime] = None) -> List[str]:
+    """Partition names for the current month and the n - 1 months before it."""
+    now = now or datetime.now(timezone.utc)
+    year, month = now.year, now.month
+    names = []
+    for _ in range(max(n, 1)):
+        names.append(f"{JOB_PARTITION_PREFIX}{year:04d}.{month:02d}")
+        year, month = (year, month - 1) if month > 1 else (year - 1, 12)
+    return names
+
+
+def _partition_age_months(name: str, now: Optional[datetime] = None) -> Optional[int]:
+    now = now or datetime.now(timezone.utc)
+    try:
+        year, month = (int(part) for part in name[len(JOB_PARTITION_PREFIX):].split("."))
+    except ValueError:
+        return None
+    return (now.year - year) * 12 + (now.month - month)
+
+
+# Keywords for exact fields and facets, text plus n-gram subfields for full-text.
+# Every partition created from the template joins the read alias.
+_INDEX_TEMPLATE = {
+    "name": JOB_INDEX_TEMPLATE,
+    "index_patterns": [f"{JOB_PARTITION_PREFIX}*"],
+    "priority": 100,
+    "template": {"settings": JOB_INDEX_SETTINGS, "mappings": JOB_MAPPINGS, "aliases": {JOB_INDEX: {}}},
+}
+
+
+# create_index/rollover and their async twins only differ in awaiting the client calls;
+# everything they send is built here.
+
+def _warn_legacy_index() -> None:
+    logging.warning("Legacy '%s' index found; run /api/admin/reindex/jobs to migrate to partitions", JOB_INDEX)
+
+
+def _write_alias_actions(current: str, previous) -> List[dict]:
+    """Alias update moving jobs-write from ``previous`` indices onto ``current`` atomically."""
+    actions = [{"remove": {"index": index, "alias": JOB_WRITE_ALIAS}} for index in previous if index != current]
+    actions.append({"add": {"index": current, "alias": JOB_WRITE_ALIAS, "is_write_index": True}})
+    return actions
+
+
+def _write_blocked(es: Elasticsearch, index: str) -> bool:
+    index_settings = es.indices.get_settings(index=index)[index]["settings"]["index"]
+    return index_settings.get("blocks", {}).get("write") == "true"
+
+
+def _search_target(partitioned: bool, include_archived: bool) -> str:
+    if not partitioned or include_archived:
+        return JOB_INDEX
+    return ",".join(_months_back(settings.JOB_SEARCH_RECENT_MONTHS))
+
 
+# Request building and response shaping for search_async and facets_async.
 
+def _search_request(query, location, skills, page, size, sort_by, order, fields, snippets, profile) -> dict:
+    if profile not in SEARCH_PROFILES:
+        raise ValueError(f"Unknown search profile '{profile}'. Use one of: {', '.join(SEARCH_PROFILES)}")
+    profile_opts = SEARCH_PROFILES[profile]
+
+    from_ = (page - 1) * size
+
+    es_query = {
+        "from": from_,
+        "size": size,
+        "query": JobSearchService.build_query(query, location, skills, profile),
+        "track_total_hits": profile_opts["track_total_hits"],
+    }
+
+    source_fields = [f for f in fields if f in SOURCE_FIELDS] if fields else profile_opts["source"]
+    es_query["_source"] = source_fields
+
+    # a highlighted fragment of the description replaces the full text in list views;
+    # no_match_size still yields a leading excerpt when the query didn't hit the description
+    if snippets and "description" not in source_fields:
+        es_query["highlight"] = {
+            "fields": {
+                "description": {
+                    "fragment_size": SNIPPET_SIZE,
+                    "number_of_fragments": 1,
+                    "no_match_size": SNIPPET_SIZE,
+                }
+            },
+            # plain-text fragments; the UI renders them as text
+            "pre_tags": [""],
+            "post_tags": [""],
+        }
+
+    # default: rely on ES relevance; allow explicit sorting by created_at or salary
+    if sort_by != "relevance":
+        es_query["sort"] = [{sort_by: {"order": order}}]
+
+    # filter-only pages are identical across users, so let the shard request cache serve them
+    return {
+        "body": es_query,
+        "request_cache": not query and profile_opts["request_cache"],
+        "ignore_unavailable": True,
+        "allow_no_indices": True,
+    }
+
+
+def _search_result(response, page: int, size: int) -> dict:
+    total = 0
+    total_relation = "eq"
+    hits = []
+    if response and "hits" in response:
+        total = response["hits"]["total"]["value"] if isinstance(response["hits"]["total"], dict) else response["hits"]["total"]
+        if isinstance(response["hits"]["total"], dict):
+            total_relation = response["hits"]["total"].get("relation", "eq")
+        hits = response["hits"]["hits"]
+
+    return {
+        "page": page,
+        "size": size,
+        "total": total,
+        # "gte" when the profile capped hit counting
+        "total_relation": total_relation,
+        "results": [
+            JobSearchService._format_hit(hit)
+            for hit in hits
+        ],
+    }
+
+
+def _facets_key(query, location, skills, size, target) -> tuple:
+    return (
+        query or None,
+        (location or "").lower() or None,
+        tuple(sorted(s.lower() for s in skills or [])),
+        size,
+        target,
+    )
+
+
+def _facets_request(query, location, skills, size) -> dict:
+    return {
+        "body": {
+            "size": 0,
+            "query": JobSearchService.build_query(query, location, skills),
+            "aggs": {name: {"terms": {"field": field, "size": size}} for name, field in FACET_FIELDS.items()},
+        },
+        "request_cache": True,
+        "ignore_unavailable": True,
+        "allow_no_indices": True,
+    }
+
+
+def _facets_result(response) -> dict:
+    aggregations = response.get("aggregations", {}) if response else {}
+    return {
+        name: [
+            {"value": bucket["key"], "count": bucket["doc_count"]}
+            for bucket in aggregations.get(name, {}).get("buckets", [])
+        ]
+        for name in FACET_FIELDS
+    }
+
+
+
+
+@trace_service
 class JobSearchService:
     """
     Elasticsearch job indexing & search.
@@ -12,148 +326,277 @@ class JobSearchService:
     """
 
     @staticmethod
-    def create_index(es: Elasticsearch) -> None:
-        if es.indices.exists(index=JOB_INDEX):
-            return
-        # Use a mapping that keeps keywords for exact fields and text for full-text
-        es.indices.create(
-            index=JOB_INDEX,
-            mappings={
-                "properties": {
-                    "title": {"type": "text", "fields": {"raw": {"type": "keyword"}}},
-                    "company": {"type": "keyword"},
-                    "description": {"type": "text"},
-                    "required_skills": {"type": "keyword"},
-                    "location": {"type": "keyword"},
-                    "salary": {"type": "keyword"},
-                }
-            },
-        )
+    def create_index(es: Elasticsearch) -> bool:
+        """Ensure the partition template exists and the write alias points at this month's partition.
+
+        Returns False while a legacy, unpartitioned "jobs" index is still in place;
+        reads and writes then keep using it until reindex_all migrates it.
+        """
+        global _partitions_ready_for
+        current = partition_for()
+        if _partitions_ready_for == current:
+            return True
+
+        if es.indices.exists(index=JOB_INDEX) and not es.indices.exists_alias(name=JOB_INDEX):
+            _warn_legacy_index()
+            return False
+
+        es.indices.put_index_template(**_INDEX_TEMPLATE)
+        JobSearchService.rollover(es)
+        _partitions_ready_for = current
+        return True
+
+    @staticmethod
+    async def create_index_async(es: AsyncElasticsearch) -> bool:
+        """create_index on the async client."""
+        global _partitions_ready_for
+        current = partition_for()
+        if _partitions_ready_for == current:
+            return True
+
+        if await es.indices.exists(index=JOB_INDEX) and not await es.indices.exists_alias(name=JOB_INDEX):
+            _warn_legacy_index()
+            return False
+
+        await es.indices.put_index_template(**_INDEX_TEMPLATE)
+        await JobSearchService.rollover_async(es)
+        _partitions_ready_for = current
+        return True
+
+    @staticmethod
+    async def search_target_async(es: AsyncElasticsearch, include_archived: bool = False) -> str:
+        """Indices a job query should hit: the recent partitions unless archived postings are wanted."""
+        return _search_target(await JobSearchService.create_index_async(es), include_archived)
+
+    @staticmethod
+    def rollover(es: Elasticsearch) -> str:
+        """Create the current month's partition if needed and move the write alias onto it."""
+        current = partition_for()
+        if not es.indices.exists(index=current):
+            es.indices.create(index=current)
+
+        previous = es.indices.get_alias(name=JOB_WRITE_ALIAS) if es.indices.exists_alias(name=JOB_WRITE_ALIAS) else []
+        es.indices.update_aliases(actions=_write_alias_actions(current, previous))
+        return current
+
+    @staticmethod
+    async def rollover_async(es: AsyncElasticsearch) -> str:
+        """rollover on the async client."""
+        current = partition_for()
+        if not await es.indices.exists(index=current):
+            await es.indices.create(index=current)
+
+        previous = await es.indices.get_alias(name=JOB_WRITE_ALIAS) if await es.indices.exists_alias(name=JOB_WRITE_ALIAS) else []
+        await es.indices.update_aliases(actions=_write_alias_actions(current, previous))
+        return current
+
+    @staticmethod
+    def _document(job: Job) -> dict:
+        return {
+            "title": job.title,
+            "company": job.company,
+            "description": job.description,
+            # ensure required_skills indexes as array of keywords; stripped, since the
+            # normalizer does not trim and the Python matcher does
+            "required_skills": clean_skills(job.required_skills),
+            "location": job.location,
+            "owner_id": job.owner_id if hasattr(job, "owner_id") else None,
+            "salary": job.salary,
+            # read by the job-match-score script; jobs don't record it yet
+            "experience_years": getattr(job, "experience_years", None),
+            "created_at": job.created_at.isoformat() if getattr(job, "created_at", None) else None,
+        }
 
     @staticmethod
     def index_job(es: Elasticsearch, job: Job) -> None:
+        # the partition follows created_at, so a job always lands in (and is
+        # reindexed into) the same index regardless of when it is written
+        partitioned = JobSearchService.create_index(es)
         es.index(
-            index=JOB_INDEX,
+            index=partition_for(job.created_at) if partitioned else JOB_INDEX,
             id=job.id,
-            document={
-                "title": job.title,
-                "company": job.company,
-                "description": job.description,
-                # ensure required_skills indexes as array of keywords
-                "required_skills": job.required_skills or [],
-                "location": job.location,
-                "owner_id": job.owner_id if hasattr(job, "owner_id") else None,
-                "salary": job.salary,
-            },
+            document=JobSearchService._document(job),
         )
 
     @staticmethod
     def delete_job(es: Elasticsearch, job_id: int) -> None:
-        try:
-            es.delete(index=JOB_INDEX, id=job_id)
-        except Exception:
-            # ignore missing docs
-            pass
+        """Remove a job from whichever partition holds it; failures are raised to the caller."""
+        from elasticsearch import NotFoundError
+
+        response = es.search(
+            index=JOB_INDEX,
+            query={"ids": {"values": [job_id]}},
+            _source=False,
+            ignore_unavailable=True,
+            allow_no_indices=True,
+        )
+        for hit in response["hits"]["hits"]:
+            index = hit["_index"]
+            # warmed partitions reject writes; lift the block just for this delete
+            blocked = _write_blocked(es, index)
+            if blocked:
+                es.indices.put_settings(index=index, settings={"index.blocks.write": False})
+            try:
+                es.delete(index=index, id=job_id)
+            except NotFoundError:
+                pass
+            finally:
+                if blocked:
+                    es.indices.put_settings(index=index, settings={"index.blocks.write": True})
+
+    @staticmethod
+    def partitions(es: Elasticsearch) -> List[str]:
+        return sorted(
+            name for name in es.indices.get(index=f"{JOB_PARTITION_PREFIX}*", ignore_unavailable=True)
+            if _partition_age_months(name) is not None
+        )
 
     @staticmethod
-    def reindex_all(es: Elasticsearch, jobs: list[Job]) -> None:
-        # recreate index mapping and bulk index
-        if es.indices.exists(index=JOB_INDEX):
-            es.indices.delete(index=JOB_INDEX)
+    def reindex_all(es: Elasticsearch, jobs: list[Job], months: Optional[int] = None) -> None:
+        """Rebuild partitions from the DB.
+
+        With ``months`` only the most recent partitions are dropped and rebuilt,
+        and ``jobs`` is expected to hold just the postings created in that window.
+        """
+        global _partitions_ready_for
+        if months:
+            recent = set(_months_back(months))
+            doomed = [name for name in JobSearchService.partitions(es) if name in recent]
+        else:
+            doomed = JobSearchService.partitions(es)
+            if es.indices.exists(index=JOB_INDEX) and not es.indices.exists_alias(name=JOB_INDEX):
+                doomed.append(JOB_INDEX)
+
+        if doomed:
+            es.indices.delete(index=",".join(doomed))
+        _partitions_ready_for = None
         JobSearchService.create_index(es)
         from elasticsearch import helpers
 
         actions = []
         for job in jobs:
             actions.append({
-                "_index": JOB_INDEX,
+                "_index": partition_for(job.created_at),
                 "_id": job.id,
-                "_source": {
-                    "title": job.title,
-                    "company": job.company,
-                    "description": job.description,
-                    "required_skills": job.required_skills or [],
-                    "location": job.location,
-                    "salary": job.salary,
-                    "owner_id": job.owner_id if hasattr(job, "owner_id") else None,
-                },
+                "_source": JobSearchService._document(job),
             })
 
         if actions:
             helpers.bulk(es, actions)
 
     @staticmethod
-    def search(
-        es: Elasticsearch,
+    def apply_retention(es: Elasticsearch) -> dict:
+        """Delete partitions past retention and shrink the cost of ageing ones.
+
+        Partitions the default search still covers are never warmed.
+        """
+        deleted, warmed = [], []
+        warm_after = max(settings.JOB_WARM_AFTER_MONTHS, settings.JOB_SEARCH_RECENT_MONTHS)
+        for name in JobSearchService.partitions(es):
+            age = _partition_age_months(name)
+            if age >= settings.JOB_RETENTION_MONTHS:
+                es.indices.delete(index=name)
+                deleted.append(name)
+            elif age >= warm_after:
+                if _write_blocked(es, name):
+                    continue
+                # old postings are read-mostly: no replicas, no writes, one segment, recovered last
+                es.indices.put_settings(
+                    index=name,
+                    settings={"index.number_of_replicas": 0, "index.blocks.write": True, "index.priority": 0},
+                )
+                es.indices.forcemerge(index=name, max_num_segments=1, wait_for_completion=False)
+                warmed.append(name)
+        return {"deleted": deleted, "warmed": warmed}
+
+    @staticmethod
+    def _format_hit(hit: dict) -> dict:
+        result = {
+            "job_id": int(hit["_id"]),
+            "score": hit.get("_score"),
+            "source": hit.get("_source"),
+        }
+        highlight = hit.get("highlight", {}).get("description")
+        if highlight:
+            result["snippet"] = highlight[0]
+        return result
+
+    @staticmethod
+    def build_query(
         query: Optional[str] = None,
         location: Optional[str] = None,
         skills: Optional[List[str]] = None,
-        page: int = 1,
-        size: int = 10,
-        sort_by: str = "relevance",
-        order: str = "desc",
-    ):
-        # Build ES query with fuzziness, title boosting and skill filters
-        must_clauses = []
+        profile: str = DEFAULT_PROFILE,
+    ) -> dict:
+        """Build the ES query clause shared by search, facets and saved searches."""
+        profile_opts = SEARCH_PROFILES[profile]
         filter_clauses = []
 
-        if query:
-            must_clauses.append(
-                {
-                    "multi_match": {
-                        "query": query,
-                        "fields": [
-                            "title^3",
-                            "description",
-                            "company",
-                        ],
-                        "fuzziness": "AUTO",
-                    }
-                }
-            )
-
         if skills:
-            # require that at least one of the required_skills matches
-            filter_clauses.append({"terms": {"required_skills": skills}})
+            # require that at least one of the required_skills matches, under any synonym
+            filter_clauses.append({
+                "bool": {
+                    "should": [{"match": {"required_skills.synonym": skill}} for skill in skills],
+                    "minimum_should_match": 1,
+                }
+            })
 
         if location:
             filter_clauses.append({"term": {"location": location}})
 
-        from_ = (page - 1) * size
+        if not query:
+            # filter-only request: no scoring needed, let ES skip it entirely
+            return {"constant_score": {"filter": {"bool": {"filter": filter_clauses}}}}
 
-        es_query = {
-            "from": from_,
-            "size": size,
-            "query": {
-                "bool": {
-                    "must": must_clauses if must_clauses else [{"match_all": {}}],
-                    "filter": filter_clauses,
-                }
-            },
-        }
+        text_clauses = [{"multi_match": {"query": query, "fields": profile_opts["fields"]}}]
+        fuzzy = profile_opts.get("fuzzy")
+        if fuzzy:
+            text_clauses.append({
+                "match": {fuzzy["field"]: {"query": query, "minimum_should_match": fuzzy["minimum_should_match"]}}
+            })
 
-        # default: rely on ES relevance; allow explicit sorting by created_at or salary
-        if sort_by != "relevance":
-            es_query["sort"] = [{sort_by: {"order": order}}]
+        return {
+            "bool": {
+                "should": text_clauses,
+                "minimum_should_match": 1,
+                "filter": filter_clauses,
+            }
+        }
 
-        response = es.search(index=JOB_INDEX, body=es_query)
+    @staticmethod
+    async def search_async(
+        es: AsyncElasticsearch,
+        query: Optional[str] = None,
+        location: Optional[str] = None,
+        skills: Optional[List[str]] = None,
+        page: int = 1,
+        size: int = 10,
+        sort_by: str = "relevance",
+        order: str = "desc",
+        fields: Optional[List[str]] = None,
+        snippets: bool = True,
+        profile: str = DEFAULT_PROFILE,
+        include_archived: bool = False,
+    ):
+        request = _search_request(query, location, skills, page, size, sort_by, order, fields, snippets, profile)
+        response = await es.search(index=await JobSearchService.search_target_async(es, include_archived), **request)
+        return _search_result(response, page, size)
 
-        total = 0
-        hits = []
-        if response and "hits" in response:
-            total = response["hits"]["total"]["value"] if isinstance(response["hits"]["total"], dict) else response["hits"]["total"]
-            hits = response["hits"]["hits"]
+    @staticmethod
+    async def facets_async(
+        es: AsyncElasticsearch,
+        query: Optional[str] = None,
+        location: Optional[str] = None,
+        skills: Optional[List[str]] = None,
+        size: int = 20,
+        include_archived: bool = False,
+    ):
+        target = await JobSearchService.search_target_async(es, include_archived)
+        key = _facets_key(query, location, skills, size, target)
 
-        return {
-            "page": page,
-            "size": size,
-            "total": total,
-            "results": [
-                {
-                    "job_id": int(hit["_id"]),
-                    "score": hit.get("_score"),
-                    "source": hit.get("_source"),
-                }
-                for hit in hits
-            ],
-        }
+        cached = _facet_cache.get(key)
+        if cached is not None:
+            return cached
+        result = _facets_result(await es.search(index=target, **_facets_request(query, location, skills, size)))
+        _facet_cache.set(key, result)
+        return result
@@ -1,8 +1,16 @@
+from __future__ import annotations
+
+from typing import TYPE_CHECKING
 from sqlalchemy.orm import Session
 from app.models.job import Job
 from app.schemas.job import JobCreate
+from app.core.tracing import trace_service
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
 
 
+@trace_service
 class JobService:
     @staticmethod
     def create_job(db: Session, job: JobCreate, owner_id: int | None = None):
@@ -27,6 +35,10 @@ class JobService:
         """Get job by ID"""
         return db.query(Job).filter(Job.id == job_id).first()
 
+    @staticmethod
+    async def get_job_async(db: AsyncSession, job_id: int):
+        return await db.get(Job, job_id)
+
     @staticmethod
     def get_all_jobs(db: Session, skip: int = 0, limit: int = 10):
         """Get all jobs with pagination"""
@@ -0,0 +1,212 @@
+from __future__ import annotations
+
+import logging
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Dict, Iterable, List, Optional
+
+from sqlalchemy import delete, or_, select
+from sqlalchemy.orm import Session, load_only
+
+from app.core.config import settings
+from app.core.tracing import trace_service
+from app.models.job import Job
+from app.models.resume import Resume
+from app.models.resume_recommendation import ResumeRecommendation
+from app.services.job_match_service import JobMatchService
+from app.services.skill_index_service import SkillIndexService, normalize_skills
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
+
+# resumes loaded per query when a new job fans out to them
+FANOUT_BATCH_SIZE = 500
+# rows written by any worker since the skill index generation are read from the DB; the window
+# starts this much earlier to absorb clock skew between app hosts and the database
+CLOCK_SKEW_SECONDS = 120
+
+
+def _score(resume: Resume, job: Job) -> float:
+    return JobMatchService.match_resume_to_job(resume, job)["match_score"]
+
+
+def _top(scored: Dict[int, float]) -> List[tuple]:
+    ranked = sorted(((score, job_id) for job_id, score in scored.items() if score > 0), key=lambda item: (-item[0], item[1]))
+    return ranked[:settings.RECOMMENDATION_TOP_K]
+
+
+def _replace_feed(db: Session, resume_id: int, scored: Dict[int, float]) -> int:
+    db.execute(delete(ResumeRecommendation).where(ResumeRecommendation.resume_id == resume_id))
+    top = _top(scored)
+    db.add_all(ResumeRecommendation(resume_id=resume_id, job_id=job_id, score=score) for score, job_id in top)
+    return len(top)
+
+
+def _written_since() -> Optional[datetime]:
+    """Start of the window of writes the mapped skill index cannot know about; None without an index."""
+    built_from = SkillIndexService.built_from()
+    if built_from is None:
+        return None
+    return datetime.fromtimestamp(built_from, timezone.utc) - timedelta(seconds=CLOCK_SKEW_SECONDS)
+
+
+def _candidate_jobs(db: Session, skills: Optional[Iterable[str]]) -> Iterable[Job]:
+    columns = load_only(Job.id, Job.required_skills)
+    since = _written_since()
+    if since is None:
+        # no mapped index yet (fresh install): every job is a candidate
+        return db.query(Job).options(columns).yield_per(1000)
+
+    candidate_ids = {c["job_id"] for c in SkillIndexService.jobs_for_skills(skills or [], limit=settings.RECOMMENDATION_CANDIDATES)}
+    # jobs any worker created after the build are not in the index
+    wanted = normalize_skills(skills)
+    recent = db.query(Job).options(columns).filter(Job.created_at >= since)
+    candidate_ids.update(job.id for job in recent if wanted & normalize_skills(job.required_skills))
+    if not candidate_ids:
+        return []
+    # the index may still list jobs another worker deleted; the DB decides
+    return db.query(Job).options(columns).filter(Job.id.in_(candidate_ids)).all()
+
+
+def _candidate_resume_ids(db: Session, skills: Optional[Iterable[str]]) -> List[int]:
+    since = _written_since()
+    if since is None:
+        # without the index, fall back to every analyzed resume; the scorer drops the rest
+        return [resume_id for (resume_id,) in db.query(Resume.id).filter(Resume.skills.isnot(None))]
+
+    candidate_ids = {c["resume_id"] for c in SkillIndexService.resumes_for_skills(skills or [], limit=None)}
+    # resumes any worker uploaded or analyzed after the build are not in the index
+    wanted = normalize_skills(skills)
+    recent = db.query(Resume.id, Resume.skills).filter(
+        Resume.skills.isnot(None),
+        or_(Resume.created_at >= since, Resume.updated_at >= since),
+    )
+    candidate_ids.update(resume_id for resume_id, resume_skills in recent if wanted & normalize_skills(resume_skills))
+    return sorted(candidate_ids)
+
+
+@trace_service
+class RecommendationService:
+    """
+    Materialized "jobs for you" feeds: each resume's top RECOMMENDATION_TOP_K jobs by
+    JobMatchService score. Maintained incrementally, so reading a feed is one indexed query.
+    """
+
+    @staticmethod
+    def recompute_for_resume(db: Session, resume: Resume) -> int:
+        """Rebuild one resume's feed from jobs sharing a skill with it."""
+        if not resume.skills:
+            db.execute(delete(ResumeRecommendation).where(ResumeRecommendation.resume_id == resume.id))
+            db.commit()
+            return 0
+
+        scored = {job.id: _score(resume, job) for job in _candidate_jobs(db, resume.skills)}
+        written = _replace_feed(db, resume.id, scored)
+        db.commit()
+        return written
+
+    @staticmethod
+    def on_job_created(db: Session, job: Job) -> int:
+        """Offer a new job to the feeds of resumes sharing one of its skills. Returns feeds changed."""
+        if not normalize_skills(job.required_skills):
+            return 0
+
+        resume_ids = _candidate_resume_ids(db, job.required_skills)
+        changed = 0
+        top_k = settings.RECOMMENDATION_TOP_K
+        for start in range(0, len(resume_ids), FANOUT_BATCH_SIZE):
+            batch = resume_ids[start:start + FANOUT_BATCH_SIZE]
+            resumes = (
+                db.query(Resume)
+                .options(load_only(Resume.id, Resume.skills, Resume.experience_years))
+                .filter(Resume.id.in_(batch))
+                .all()
+            )
+            feeds: Dict[int, List[ResumeRecommendation]] = {}
+            for rec in db.query(ResumeRecommendation).filter(ResumeRecommendation.resume_id.in_(batch)):
+                feeds.setdefault(rec.resume_id, []).append(rec)
+
+            for resume in resumes:
+                score = _score(resume, job)
+                if score <= 0:
+                    continue
+                feed = sorted(feeds.get(resume.id, []), key=lambda rec: (-rec.score, rec.job_id))
+                if len(feed) >= top_k and score <= feed[top_k - 1].score:
+                    continue
+                db.add(ResumeRecommendation(resume_id=resume.id, job_id=job.id, score=score))
+                # the new job pushes the weakest entry out of a full feed
+                for rec in feed[top_k - 1:]:
+                    db.delete(rec)
+                changed += 1
+            db.commit()
+        return changed
+
+    @staticmethod
+    def on_job_deleted(db: Session, job_id: int) -> List[int]:
+        """Drop a job from every feed; returns the resumes whose feeds should be refilled."""
+        affected = [
+            resume_id
+            for (resume_id,) in db.query(ResumeRecommendation.resume_id).filter(ResumeRecommendation.job_id == job_id)
+        ]
+        if affected:
+            db.execute(delete(ResumeRecommendation).where(ResumeRecommendation.job_id == job_id))
+            db.commit()
+        return affected
+
+    @staticmethod
+    def recompute_many(db: Session, resume_ids: List[int]) -> None:
+        for resume_id in resume_ids:
+            resume = db.get(Resume, resume_id)
+            if resume is not None:
+                RecommendationService.recompute_for_resume(db, resume)
+
+    @staticmethod
+    def rebuild_all(db: Session) -> Dict:
+        """Batch job: recompute every analyzed resume's feed against all jobs."""
+        # skill -> jobs, built once per run, so each resume only scores jobs it shares a skill with
+        jobs: Dict[int, Job] = {}
+        jobs_by_skill: Dict[str, List[int]] = {}
+        for job in db.query(Job).options(load_only(Job.id, Job.required_skills)).yield_per(1000):
+            jobs[job.id] = job
+            for skill in normalize_skills(job.required_skills):
+                jobs_by_skill.setdefault(skill, []).append(job.id)
+
+        resume_ids = [resume_id for (resume_id,) in db.query(Resume.id).filter(Resume.skills.isnot(None)).order_by(Resume.id)]
+        resumes_done = 0
+        entries = 0
+        for start in range(0, len(resume_ids), FANOUT_BATCH_SIZE):
+            batch = resume_ids[start:start + FANOUT_BATCH_SIZE]
+            for resume in (
+                db.query(Resume)
+                .options(load_only(Resume.id, Resume.skills, Resume.experience_years))
+                .filter(Resume.id.in_(batch))
+            ):
+                candidate_ids = {job_id for skill in normalize_skills(resume.skills) for job_id in jobs_by_skill.get(skill, ())}
+                entries += _replace_feed(db, resume.id, {job_id: _score(resume, jobs[job_id]) for job_id in candidate_ids})
+                resumes_done += 1
+            # one transaction per batch: readers never see a half-written feed
+            db.commit()
+            db.expunge_all()
+
+        logging.info("Rebuilt recommendation feeds: %d resumes, %d entries", resumes_done, entries)
+        return {"resumes": resumes_done, "entries": entries}
+
+    @staticmethod
+    async def feed_async(db: AsyncSession, resume_id: int, limit: int) -> List[Dict]:
+        rows = await db.execute(
+            select(ResumeRecommendation.job_id, ResumeRecommendation.score, Job.title, Job.company, Job.location)
+            .join(Job, Job.id == ResumeRecommendation.job_id)
+            .where(ResumeRecommendation.resume_id == resume_id)
+            .order_by(ResumeRecommendation.score.desc(), ResumeRecommendation.job_id)
+            .limit(limit)
+        )
+        return [
+            {
+                "job_id": job_id,
+                "match_score": score,
+                "verdict": JobMatchService.verdict(score),
+                "title": title,
+                "company": company,
+                "location": location,
+            }
+            for job_id, score, title, company, location in rows
+        ]
@@ -1,54 +1,103 @@
 import json
-import google.generativeai as genai
-from app.schemas.resume_analysis import ResumeAnalysisResult
+import logging
+from typing import Dict, List, Optional, Tuple
+from app.schemas.resume_analysis import SectionExtraction
 from app.core.config import settings
+from app.core.tracing import trace_service, span
 
+# one call plus one retry for the sections the model's answer left out
+SECTION_ATTEMPTS = 2
 
+
+@trace_service
 class ResumeAnalyzerService:
     @staticmethod
-    def analyze_resume(text: str) -> ResumeAnalysisResult:
-        # 1️⃣ Validate API key
+    def _model():
+        # Validate API key
         if not settings.GEMINI_API_KEY:
             raise ValueError(
                 "GEMINI_API_KEY environment variable is not set. Please check your .env file."
             )
 
-        # 2️⃣ Configure Gemini
+        # ~1s to import; only requests that actually call Gemini pay for it
+        import google.generativeai as genai
+
         genai.configure(api_key=settings.GEMINI_API_KEY)
+        return genai.GenerativeModel("models/gemini-flash-lite-latest")
+
+    @staticmethod
+    def _generate_json(model, prompt: str):
+        with span("gemini.generate_content", kind="client", prompt_chars=len(prompt)):
+            response = model.generate_content(prompt)
+        raw_text = response.text.strip()
+
+        # Clean markdown if Gemini wraps JSON
+        if raw_text.startswith("```"):
+            raw_text = raw_text.strip("```").replace("json", "").strip()
 
-        # 3️⃣ CREATE the model (THIS WAS MISSING)
-        model = genai.GenerativeModel("models/gemini-flash-lite-latest")
+        return json.loads(raw_text)
 
-        # 4️⃣ Prompt
+    @staticmethod
+    def _extract_sections(model, sections: List[Tuple[str, str]]) -> Dict[int, SectionExtraction]:
+        """One LLM call; position -> extraction for the sections the answer covers."""
+        numbered = "\n\n".join(
+            f"### Section {i}: {heading}\n{text}" for i, (heading, text) in enumerate(sections)
+        )
         prompt = f"""
-You are an AI resume analyzer.
+You are an AI resume analyzer. You are given some sections of a resume, not the whole resume.
 
-Extract the following from the resume text:
-1. Technical skills (list of strings)
-2. Total years of professional experience (number, estimate if needed)
-3. Primary job role/title
+For EACH section extract only what that section states:
+1. Technical skills (list of strings, empty if none)
+2. Total years of professional experience covered by the section (number, null if it says nothing)
+3. Primary job role/title (string, null if the section doesn't state one)
 
-Return ONLY valid JSON in this format:
+Return ONLY valid JSON with one entry per section, in the same order:
 {{
-  "skills": ["Python", "FastAPI", "PostgreSQL"],
-  "experience_years": 2.5,
-  "role": "Software Engineer"
+  "sections": [
+    {{"index": 0, "skills": ["Python"], "experience_years": null, "role": null}}
+  ]
 }}
 
-Resume text:
-{text}
+Resume sections:
+{numbered}
 """
 
-        try:
-            response = model.generate_content(prompt)
-            raw_text = response.text.strip()
+        data = ResumeAnalyzerService._generate_json(model, prompt)
+        found: Dict[int, SectionExtraction] = {}
+        for i, item in enumerate(data.get("sections", [])):
+            if not isinstance(item, dict):
+                continue
+            index = item.pop("index", i)
+            if isinstance(index, int) and 0 <= index < len(sections):
+                found[index] = SectionExtraction(**item)
+        return found
+
+    @staticmethod
+    def analyze_sections(sections: List[Tuple[str, str]]) -> List[Optional[SectionExtraction]]:
+        """Extract skills/experience/role from each (heading, text) section, in order.
+
+        Sections the model leaves out of its answer are asked for again; those still
+        missing come back as None rather than as an empty extraction.
+        """
+        model = ResumeAnalyzerService._model()
+        results: List[Optional[SectionExtraction]] = [None] * len(sections)
+        pending = list(range(len(sections)))
 
-            # 5️⃣ Clean markdown if Gemini wraps JSON
-            if raw_text.startswith("```"):
-                raw_text = raw_text.strip("```").replace("json", "").strip()
+        for attempt in range(SECTION_ATTEMPTS):
+            try:
+                found = ResumeAnalyzerService._extract_sections(model, [sections[i] for i in pending])
+            except Exception as e:
+                if attempt == 0:
+                    raise ValueError(f"Failed to analyze resume sections with Gemini API: {str(e)}")
+                logging.warning("Retry for %d resume sections failed: %s", len(pending), e)
+                break
 
-            data = json.loads(raw_text)
-            return ResumeAnalysisResult(**data)
+            for position, extraction in found.items():
+                results[pending[position]] = extraction
+            pending = [i for i in pending if results[i] is None]
+            if not pending:
+                break
 
-        except Exception as e:
-            raise ValueError(f"Failed to analyze resume with Gemini API: {str(e)}")
+        if pending:
+            logging.warning("Gemini left %d of %d resume sections unanalyzed", len(pending), len(sections))
+        return results
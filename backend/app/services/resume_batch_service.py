@@ -0,0 +1,177 @@
+import hashlib
+import logging
+import zipfile
+from concurrent.futures import FIRST_COMPLETED, wait
+from typing import Dict, Iterator, List, NamedTuple, Optional
+
+from fastapi import UploadFile
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.tracing import trace_service
+from app.schemas.resume import ResumeCreate
+from app.services.resume_parser import MAX_FILE_SIZE_MB, submit_extract
+from app.services.resume_service import ResumeService
+
+MAX_FILE_SIZE = MAX_FILE_SIZE_MB * 1024 * 1024
+ZIP_CONTENT_TYPES = {"application/zip", "application/x-zip-compressed"}
+
+class _Entry(NamedTuple):
+    position: int
+    filename: str
+    data: Optional[bytes]
+    error: Optional[str]
+
+
+def _is_zip(file: UploadFile) -> bool:
+    return file.content_type in ZIP_CONTENT_TYPES or (file.filename or "").lower().endswith(".zip")
+
+
+def _iter_entries(files: List[UploadFile]) -> Iterator[_Entry]:
+    """Yield PDFs one at a time; ZIP members are decompressed on demand, never extracted to disk."""
+    position = 0
+    for file in files:
+        if not _is_zip(file):
+            file.file.seek(0, 2)
+            size = file.file.tell()
+            file.file.seek(0)
+            if file.content_type != "application/pdf":
+                yield _Entry(position, file.filename, None, "Only PDF files are allowed")
+            elif size > MAX_FILE_SIZE:
+                yield _Entry(position, file.filename, None, f"File size exceeds {MAX_FILE_SIZE_MB}MB")
+            else:
+                yield _Entry(position, file.filename, file.file.read(), None)
+            position += 1
+            continue
+
+        try:
+            archive = zipfile.ZipFile(file.file)
+        except zipfile.BadZipFile:
+            yield _Entry(position, file.filename, None, "Invalid ZIP archive")
+            position += 1
+            continue
+
+        with archive:
+            for info in archive.infolist():
+                name = info.filename
+                if info.is_dir() or name.startswith("__MACOSX/") or name.rsplit("/", 1)[-1].startswith("."):
+                    continue
+                if not name.lower().endswith(".pdf"):
+                    yield _Entry(position, name, None, "Only PDF files are allowed")
+                elif info.file_size > MAX_FILE_SIZE:
+                    yield _Entry(position, name, None, f"File size exceeds {MAX_FILE_SIZE_MB}MB")
+                else:
+                    # file_size comes from the archive header; cap the read in case it lies
+                    with archive.open(info) as member:
+                        data = member.read(MAX_FILE_SIZE + 1)
+                    if len(data) > MAX_FILE_SIZE:
+                        yield _Entry(position, name, None, f"File size exceeds {MAX_FILE_SIZE_MB}MB")
+                    else:
+                        yield _Entry(position, name, data, None)
+                position += 1
+
+
+@trace_service
+class ResumeBatchService:
+    """
+    Bulk resume onboarding.
+    Files are streamed from the request (or out of a ZIP), parsed in a process
+    pool with a bounded number in flight, and inserted in a single transaction.
+    """
+
+    @staticmethod
+    def upload(db: Session, user_id: int, files: List[UploadFile]) -> List[Dict]:
+        """Parse and store every PDF in ``files``; returns one status dict per file, in upload order."""
+        known = ResumeService.get_hashes(db, user_id)
+        results: Dict[int, Dict] = {}
+        pending_rows: List[tuple] = []
+        seen: Dict[str, int] = {}
+        count = 0
+
+        window = max(1, settings.BATCH_UPLOAD_WORKERS) * 2
+        in_flight: Dict = {}
+
+        def collect(done) -> None:
+            for future in done:
+                entry, sha = in_flight.pop(future)
+                try:
+                    text = future.result()
+                except Exception as e:
+                    logging.warning("Batch parse of %s failed: %s", entry.filename, e)
+                    results[entry.position] = {"filename": entry.filename, "status": "failed", "error": f"PDF parsing failed: {e}"}
+                    continue
+                if not text.strip():
+                    results[entry.position] = {
+                        "filename": entry.filename,
+                        "status": "failed",
+                        "error": "PDF contains no extractable text (possibly scanned)",
+                    }
+                    continue
+                pending_rows.append((entry.position, ResumeCreate(filename=entry.filename, content=text, file_sha256=sha)))
+
+        for entry in _iter_entries(files):
+            count += 1
+            if count > settings.BATCH_UPLOAD_MAX_FILES:
+                results[entry.position] = {
+                    "filename": entry.filename,
+                    "status": "skipped",
+                    "error": f"Batch limit of {settings.BATCH_UPLOAD_MAX_FILES} files reached",
+                }
+                continue
+            if entry.error:
+                results[entry.position] = {"filename": entry.filename, "status": "failed", "error": entry.error}
+                continue
+
+            sha = hashlib.sha256(entry.data).hexdigest()
+            if sha in known:
+                results[entry.position] = {"filename": entry.filename, "status": "duplicate", "id": known[sha]}
+                continue
+            if sha in seen:
+                results[entry.position] = {"filename": entry.filename, "status": "duplicate", "duplicate_of": seen[sha]}
+                continue
+            seen[sha] = entry.position
+
+            # keep at most `window` PDFs in memory/in flight while reading the rest of the upload
+            in_flight[submit_extract(entry.data)] = (entry, sha)
+            if len(in_flight) >= window:
+                done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+                collect(done)
+
+        if in_flight:
+            done, _ = wait(list(in_flight))
+            collect(done)
+
+        pending_rows.sort(key=lambda row: row[0])
+        filenames = {position: resume.filename for position, resume in pending_rows}
+        for position, resume in ResumeBatchService._insert(db, user_id, pending_rows):
+            if resume is None:
+                results[position] = {"filename": filenames[position], "status": "duplicate"}
+            else:
+                results[position] = {"filename": resume.filename, "status": "created", "id": resume.id, "version": resume.version}
+
+        # in-batch duplicates point at the upload position of their first copy; resolve to its id
+        for result in results.values():
+            first = result.pop("duplicate_of", None)
+            if first is not None and results.get(first, {}).get("id") is not None:
+                result["id"] = results[first]["id"]
+
+        return [results[position] for position in sorted(results)]
+
+    @staticmethod
+    def _insert(db: Session, user_id: int, rows: List[tuple]) -> List[tuple]:
+        if not rows:
+            return []
+        try:
+            resumes = ResumeService.create_resumes(db, [resume for _, resume in rows], user_id)
+            return [(position, resume) for (position, _), resume in zip(rows, resumes)]
+        except IntegrityError:
+            # a concurrent upload stored some of the same files; drop those and retry once
+            db.rollback()
+            known = ResumeService.get_hashes(db, user_id)
+            fresh = [(position, resume) for position, resume in rows if resume.file_sha256 not in known]
+            stale = [(position, None) for position, resume in rows if resume.file_sha256 in known]
+            if not fresh:
+                return stale
+            resumes = ResumeService.create_resumes(db, [resume for _, resume in fresh], user_id)
+            return stale + [(position, resume) for (position, _), resume in zip(fresh, resumes)]
@@ -1,47 +1,106 @@
-import pdfplumber
+import asyncio
+import hashlib
+import io
+import multiprocessing
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Optional, Tuple
 from fastapi import UploadFile, HTTPException
+from app.core import profiling
+from app.core.config import settings
 
 MAX_FILE_SIZE_MB = 10
+UPLOAD_CHUNK_BYTES = 256 * 1024
 
+_pool: Optional[ProcessPoolExecutor] = None
+_pool_lock = threading.Lock()
 
-def parse_pdf(file: UploadFile) -> str:
-    # Validate MIME type
+
+def get_parser_pool() -> ProcessPoolExecutor:
+    """Worker processes for PDF text extraction, shared by single and batch uploads."""
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            # spawn, not fork: the server process has threads (ES, tracing exporter, threadpool)
+            _pool = ProcessPoolExecutor(
+                max_workers=max(1, settings.BATCH_UPLOAD_WORKERS),
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _pool
+
+
+def shutdown_parser_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown(wait=False, cancel_futures=True)
+            _pool = None
+
+
+def extract_pdf_text(data: bytes) -> str:
+    """Text of a PDF held in memory. Pure function of the bytes, so it can run in a worker process."""
+    import pdfplumber
+
+    text = ""
+    with pdfplumber.open(io.BytesIO(data)) as pdf:
+        for page in pdf.pages:
+            page_text = page.extract_text()
+            if page_text:
+                text += page_text
+    return text
+
+
+async def read_pdf_upload(file: UploadFile) -> Tuple[bytes, str]:
+    """Validate an upload and return its bytes and sha256 without blocking the event loop."""
     if file.content_type != "application/pdf":
         raise HTTPException(status_code=400, detail="Only PDF files are allowed")
 
-    # Validate size
-    file.file.seek(0, 2)
-    size_mb = file.file.tell() / (1024 * 1024)
-    file.file.seek(0)
+    # hash each chunk as it arrives instead of making a second pass over the whole file
+    sha256 = hashlib.sha256()
+    chunks = []
+    size = 0
+    while chunk := await file.read(UPLOAD_CHUNK_BYTES):
+        size += len(chunk)
+        if size > MAX_FILE_SIZE_MB * 1024 * 1024:
+            raise HTTPException(status_code=400, detail="File size exceeds 10MB")
+        sha256.update(chunk)
+        chunks.append(chunk)
 
-    if size_mb > MAX_FILE_SIZE_MB:
-        raise HTTPException(status_code=400, detail="File size exceeds 10MB")
+    return b"".join(chunks), sha256.hexdigest()
 
-    try:
-        # Ensure pointer at start
-        file.file.seek(0)
-
-        text = ""
-        with pdfplumber.open(file.file) as pdf:
-            for page in pdf.pages:
-                page_text = page.extract_text()
-                if page_text:
-                    text += page_text
-
-        if not text.strip():
-            raise HTTPException(
-                status_code=400,
-                detail="PDF contains no extractable text (possibly scanned)"
-            )
 
-        return text
+def submit_extract(data: bytes) -> Future:
+    """Queue extract_pdf_text on the parser pool.
+
+    While the request is being profiled, the worker process samples itself and its
+    stacks are added to the request's profile under "parser-pool".
+    """
+    profile = profiling.current_profile()
+    if profile is None:
+        return get_parser_pool().submit(extract_pdf_text, data)
+
+    text_future: Future = Future()
 
-    except HTTPException:
-        raise  # rethrow clean errors
+    def unpack(future: Future) -> None:
+        try:
+            text, stacks = future.result()
+        except BaseException as e:
+            text_future.set_exception(e)
+            return
+        profiling.add_stacks(profile, stacks, "parser-pool")
+        text_future.set_result(text)
 
+    get_parser_pool().submit(profiling.sample_call, extract_pdf_text, data).add_done_callback(unpack)
+    return text_future
+
+
+async def parse_pdf_async(data: bytes) -> str:
+    """Validated text of an uploaded PDF, extracted on the parser process pool."""
+    try:
+        text = await asyncio.wrap_future(submit_extract(data))
     except Exception as e:
-        # Convert ALL pdfplumber errors into readable API error
-        raise HTTPException(
-            status_code=500,
-            detail=f"PDF parsing failed: {str(e)}"
-        )
+        raise HTTPException(status_code=500, detail=f"PDF parsing failed: {str(e)}")
+
+    if not text.strip():
+        raise HTTPException(status_code=400, detail="PDF contains no extractable text (possibly scanned)")
+    return text
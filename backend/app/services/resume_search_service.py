@@ -1,10 +1,148 @@
-from typing import Optional, List
-from elasticsearch import Elasticsearch
+from __future__ import annotations
+
+import logging
+import time
+from datetime import datetime, timedelta, timezone
+from typing import TYPE_CHECKING, Optional, List
+from sqlalchemy import or_
 from app.models.resume import Resume
+from app.core.skills import clean_skills, normalize_skills
+from app.core.tracing import trace_service
+
+if TYPE_CHECKING:
+    from elasticsearch import AsyncElasticsearch, Elasticsearch
+    from sqlalchemy.orm import Session
 
+# "resumes" is an alias over a concrete index named resumes-v<version>-<build time>. Bump
+# the version with every mapping change; reindex_all builds a fresh index from the DB and
+# swaps the alias onto it, so searches and writes keep hitting the old index until then.
 RESUME_INDEX = "resumes"
+RESUME_INDEX_VERSION = 2
+# resumes written this long before a rebuild started are copied again after the swap,
+# covering writes that reached the old index after the bulk load read their rows
+REINDEX_CATCH_UP_SECONDS = 120
+RESUME_INDEX_SETTINGS = {
+    "analysis": {
+        "normalizer": {"lowercase_ascii": {"type": "custom", "filter": ["lowercase", "asciifolding"]}},
+    }
+}
+RESUME_MAPPINGS = {
+    "properties": {
+        "resume_id": {"type": "long"},
+        "user_id": {"type": "integer"},
+        "filename": {"type": "keyword"},
+        "content": {"type": "text"},
+        # normalized so the coverage script can compare against lowercased params
+        "skills": {"type": "keyword", "normalizer": "lowercase_ascii"},
+        "experience_years": {"type": "float"},
+    }
+}
+_index_ready = False
+
+RESUME_COVERAGE_SCRIPT = """
+double matched = 0;
+for (String skill : params.skills) {
+    if (doc['skills'].contains(skill)) { matched += 1; }
+}
+double coverage = params.skills.size() == 0 ? 0 : matched / params.skills.size();
+return coverage + 0.01 * (_score / (_score + 1));
+"""
+
+
+def _search_body(query, skills, min_experience, size, search_after) -> dict:
+    must = []
+    filters = []
+
+    if query:
+        must.append(
+            {
+                "multi_match": {
+                    "query": query,
+                    "fields": ["content", "skills"],
+                }
+            }
+        )
+
+    if skills:
+        filters.append({"terms": {"skills": skills}})
+
+    if min_experience is not None:
+        filters.append(
+            {"range": {"experience_years": {"gte": min_experience}}}
+        )
+
+    es_query_clause = {
+        "bool": {
+            "must": must if must else {"match_all": {}},
+            "filter": filters,
+        }
+    }
+
+    if skills:
+        # rank by the fraction of requested skills each resume covers;
+        # text relevance (squashed into [0, 0.01)) only breaks ties
+        es_query_clause = {
+            "script_score": {
+                "query": es_query_clause,
+                "script": {
+                    "source": RESUME_COVERAGE_SCRIPT,
+                    "params": {"skills": sorted(normalize_skills(skills))},
+                },
+            }
+        }
+
+    es_query = {
+        "size": size,
+        "query": es_query_clause,
+        "_source": {"excludes": ["content"]},
+        # resume_id makes the order total so search_after pages are stable
+        "sort": [{"_score": "desc"}, {"resume_id": {"order": "asc", "unmapped_type": "long"}}],
+    }
+    if search_after:
+        es_query["search_after"] = search_after
+    return es_query
+
+
+def _search_result(response, size: int) -> dict:
+    hits = response["hits"]["hits"]
+
+    return {
+        "size": size,
+        "results": [
+            {
+                "resume_id": int(hit["_id"]),
+                "score": hit["sort"][0],
+                "source": hit["_source"],
+            }
+            for hit in hits
+        ],
+        # pass back as search_after to fetch the next page; None on the last page
+        "next_search_after": hits[-1]["sort"] if len(hits) == size else None,
+    }
+
+
+def _version_prefix() -> str:
+    return f"{RESUME_INDEX}-v{RESUME_INDEX_VERSION}-"
+
+
+def _new_index(es: Elasticsearch) -> str:
+    name = f"{_version_prefix()}{int(time.time() * 1000)}"
+    es.indices.create(index=name, settings=RESUME_INDEX_SETTINGS, mappings=RESUME_MAPPINGS)
+    return name
 
 
+def _bulk_index(es: Elasticsearch, index: str, resumes) -> int:
+    from elasticsearch import helpers
+
+    actions = (
+        {"_index": index, "_id": resume.id, "_source": ResumeSearchService._document(resume)}
+        for resume in resumes
+    )
+    indexed, _ = helpers.bulk(es, actions)
+    return indexed
+
+
+@trace_service
 class ResumeSearchService:
     """
     Elasticsearch indexing & search for resumes.
@@ -12,79 +150,89 @@ class ResumeSearchService:
     """
 
     @staticmethod
-    def create_index(es: Elasticsearch) -> None:
-        if es.indices.exists(index=RESUME_INDEX):
-            return
-
-        es.indices.create(
-            index=RESUME_INDEX,
-            mappings={
-                "properties": {
-                    "filename": {"type": "keyword"},
-                    "content": {"type": "text"},
-                    "skills": {"type": "keyword"},
-                    "experience_years": {"type": "float"},
-                }
-            },
-        )
+    def create_index(es: Elasticsearch) -> bool:
+        """Ensure the "resumes" alias exists.
+
+        Returns False while it still resolves to a legacy index or an older version;
+        reads and writes keep using that index until reindex_all replaces it.
+        """
+        global _index_ready
+        if _index_ready:
+            return True
+
+        if es.indices.exists_alias(name=RESUME_INDEX):
+            if not any(name.startswith(_version_prefix()) for name in es.indices.get_alias(name=RESUME_INDEX)):
+                logging.warning("'%s' points at an older mapping; run /api/admin/reindex/resumes", RESUME_INDEX)
+                return False
+        elif es.indices.exists(index=RESUME_INDEX):
+            logging.warning("Legacy '%s' index found; run /api/admin/reindex/resumes to migrate it", RESUME_INDEX)
+            return False
+        else:
+            es.indices.put_alias(index=_new_index(es), name=RESUME_INDEX)
+
+        _index_ready = True
+        return True
+
+    @staticmethod
+    def _document(resume: Resume) -> dict:
+        return {
+            "resume_id": resume.id,
+            "user_id": resume.user_id,
+            "filename": resume.filename,
+            "content": resume.content,
+            "skills": clean_skills(resume.skills),
+            "experience_years": resume.experience_years,
+        }
 
     @staticmethod
     def index_resume(es: Elasticsearch, resume: Resume) -> None:
-        es.index(
-            index=RESUME_INDEX,
-            id=resume.id,
-            document={
-                "filename": resume.filename,
-                "content": resume.content,
-                "skills": resume.skills,
-                "experience_years": resume.experience_years,
-            },
-        )
+        es.index(index=RESUME_INDEX, id=resume.id, document=ResumeSearchService._document(resume))
 
     @staticmethod
-    def search(
-        es: Elasticsearch,
-        query: Optional[str] = None,
-        skills: Optional[List[str]] = None,
-        min_experience: Optional[float] = None,
-    ):
-        must = []
-        filters = []
-
-        if query:
-            must.append(
-                {
-                    "multi_match": {
-                        "query": query,
-                        "fields": ["content", "skills"],
-                    }
-                }
-            )
+    def reindex_all(es: Elasticsearch, db: Session) -> int:
+        """Build a fresh index from the DB, then atomically move the alias onto it.
 
-        if skills:
-            filters.append({"terms": {"skills": skills}})
+        The old index keeps serving searches and writes until the swap. Resumes written
+        while the build ran are copied again afterwards, and only then is the old index
+        deleted. A legacy concrete "resumes" index is dropped in the alias update itself.
+        """
+        global _index_ready
 
-        if min_experience is not None:
-            filters.append(
-                {"range": {"experience_years": {"gte": min_experience}}}
-            )
+        started_at = datetime.now(timezone.utc)
+        target = _new_index(es)
+        analyzed = db.query(Resume).filter(Resume.skills.isnot(None))
+        indexed = _bulk_index(es, target, analyzed.yield_per(1000))
+        es.indices.refresh(index=target)
 
-        es_query = {
-            "query": {
-                "bool": {
-                    "must": must if must else {"match_all": {}},
-                    "filter": filters,
-                }
-            }
-        }
+        previous = []
+        alias_actions = [{"add": {"index": target, "alias": RESUME_INDEX}}]
+        if es.indices.exists_alias(name=RESUME_INDEX):
+            previous = [name for name in es.indices.get_alias(name=RESUME_INDEX) if name != target]
+            alias_actions += [{"remove": {"index": name, "alias": RESUME_INDEX}} for name in previous]
+        elif es.indices.exists(index=RESUME_INDEX):
+            # the legacy index holds the alias's name, so it has to go in the same atomic update
+            alias_actions.append({"remove_index": {"index": RESUME_INDEX}})
+        es.indices.update_aliases(actions=alias_actions)
+        _index_ready = True
 
-        response = es.search(index=RESUME_INDEX, body=es_query)
+        since = started_at - timedelta(seconds=REINDEX_CATCH_UP_SECONDS)
+        recent = analyzed.filter(or_(Resume.created_at >= since, Resume.updated_at >= since))
+        caught_up = _bulk_index(es, target, recent.yield_per(1000))
+        if caught_up:
+            logging.info("Re-copied %d resumes written during the rebuild of %s", caught_up, target)
 
-        return [
-            {
-                "resume_id": hit["_id"],
-                "score": hit["_score"],
-                "source": hit["_source"],
-            }
-            for hit in response["hits"]["hits"]
-        ]
+        if previous:
+            es.indices.delete(index=",".join(previous))
+        return indexed
+
+    @staticmethod
+    async def search_async(
+        es: AsyncElasticsearch,
+        query: Optional[str] = None,
+        skills: Optional[List[str]] = None,
+        min_experience: Optional[float] = None,
+        size: int = 20,
+        search_after: Optional[list] = None,
+    ):
+        es_query = _search_body(query, skills, min_experience, size, search_after)
+        return _search_result(await es.search(index=RESUME_INDEX, body=es_query), size)
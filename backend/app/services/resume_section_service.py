@@ -0,0 +1,138 @@
+import hashlib
+import re
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.tracing import trace_service
+from app.models.resume import Resume
+from app.models.resume_section import ResumeSection
+from app.schemas.resume_analysis import ResumeAnalysisResult, SectionExtraction
+from app.services.resume_analyzer_service import ResumeAnalyzerService
+
+KNOWN_HEADINGS = {
+    "summary", "professional summary", "profile", "about", "about me", "objective", "career objective",
+    "experience", "work experience", "professional experience", "employment", "employment history", "work history",
+    "education", "academic background", "qualifications",
+    "skills", "technical skills", "core skills", "key skills", "technologies", "tech stack", "tools",
+    "projects", "personal projects", "key projects",
+    "certifications", "certificates", "licenses", "courses", "training",
+    "achievements", "awards", "honors", "publications", "languages", "interests", "hobbies",
+    "volunteer", "volunteering", "leadership", "activities", "references",
+}
+MAX_HEADING_LENGTH = 40
+HEADER_SECTION = "header"
+
+
+def _normalize_heading(line: str) -> str:
+    return re.sub(r"[^a-z ]", "", line.lower()).strip()
+
+
+def _is_heading(line: str) -> bool:
+    stripped = line.strip().rstrip(":")
+    if not stripped or len(stripped) > MAX_HEADING_LENGTH:
+        return False
+    if _normalize_heading(stripped) in KNOWN_HEADINGS:
+        return True
+    # short ALL CAPS lines ("WORK HISTORY") are headings in most templates
+    letters = [c for c in stripped if c.isalpha()]
+    return len(letters) >= 4 and all(c.isupper() for c in letters) and len(stripped.split()) <= 4
+
+
+def _hash(heading: str, text: str) -> str:
+    normalized = " ".join(f"{heading}\n{text}".split()).lower()
+    return hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+
+
+@trace_service
+class ResumeSectionService:
+    """
+    Section-level, incremental resume analysis.
+    Each section's extraction is cached by content hash, so a re-uploaded,
+    lightly edited resume only sends its changed sections to the LLM.
+    """
+
+    @staticmethod
+    def split(text: str) -> List[Tuple[str, str]]:
+        """Split resume text into (heading, body) sections in document order."""
+        sections: List[Tuple[str, List[str]]] = [(HEADER_SECTION, [])]
+        for line in text.splitlines():
+            if _is_heading(line):
+                sections.append((line.strip().rstrip(":"), []))
+            else:
+                sections[-1][1].append(line)
+
+        return [(heading, "\n".join(lines).strip()) for heading, lines in sections if "\n".join(lines).strip()]
+
+    @staticmethod
+    def merge(extractions: List[SectionExtraction]) -> ResumeAnalysisResult:
+        skills: List[str] = []
+        seen = set()
+        for extraction in extractions:
+            for skill in extraction.skills:
+                if skill.strip() and skill.strip().lower() not in seen:
+                    seen.add(skill.strip().lower())
+                    skills.append(skill.strip())
+
+        # the section covering the whole career (usually Experience) reports the largest span
+        years = [e.experience_years for e in extractions if e.experience_years is not None]
+        roles = [e.role for e in extractions if e.role]
+
+        return ResumeAnalysisResult(
+            skills=skills,
+            experience_years=max(years) if years else None,
+            role=roles[0] if roles else None,
+        )
+
+    @staticmethod
+    def analyze(db: Session, resume: Resume) -> Tuple[ResumeAnalysisResult, Dict[str, int]]:
+        """Analyze a resume, reusing cached extractions of sections seen in the user's earlier versions.
+
+        Returns the merged analysis and counts of reused and re-analyzed sections.
+        """
+        sections = ResumeSectionService.split(resume.content)
+        hashes = [_hash(heading, text) for heading, text in sections]
+
+        cached: Dict[str, dict] = {}
+        if hashes:
+            rows = (
+                db.query(ResumeSection.content_sha256, ResumeSection.extraction)
+                .filter(
+                    ResumeSection.user_id == resume.user_id,
+                    ResumeSection.content_sha256.in_(set(hashes)),
+                    ResumeSection.extraction.isnot(None),
+                )
+                .order_by(ResumeSection.id)
+            )
+            # later rows win, so the most recent extraction of a section is used
+            cached = {sha: extraction for sha, extraction in rows}
+
+        changed = [i for i, sha in enumerate(hashes) if sha not in cached]
+        fresh: Dict[int, Optional[SectionExtraction]] = {}
+        if changed:
+            results = ResumeAnalyzerService.analyze_sections([sections[i] for i in changed])
+            fresh = dict(zip(changed, results))
+
+        # a section the LLM skipped is stored without an extraction, so the next analysis retries it
+        extractions: List[Optional[SectionExtraction]] = [
+            fresh[i] if i in fresh else SectionExtraction(**cached[hashes[i]])
+            for i in range(len(sections))
+        ]
+        missing = sum(e is None for e in extractions)
+
+        db.query(ResumeSection).filter(ResumeSection.resume_id == resume.id).delete()
+        db.add_all([
+            ResumeSection(
+                resume_id=resume.id,
+                user_id=resume.user_id,
+                position=i,
+                heading=heading[:255],
+                content_sha256=hashes[i],
+                extraction=extractions[i].model_dump() if extractions[i] is not None else None,
+            )
+            for i, (heading, _) in enumerate(sections)
+        ])
+        db.commit()
+
+        merged = ResumeSectionService.merge([e for e in extractions if e is not None])
+        return merged, {"reused": len(sections) - len(changed), "analyzed": len(changed) - missing, "missing": missing}
@@ -1,29 +1,100 @@
+from __future__ import annotations
+
+from sqlalchemy import func, select
 from sqlalchemy.orm import Session
 from app.models.resume import Resume
 from app.schemas.resume import ResumeCreate
-from typing import List, Optional
+from typing import TYPE_CHECKING, Dict, List, Optional
+from app.core.tracing import trace_service
+
+if TYPE_CHECKING:
+    from sqlalchemy.ext.asyncio import AsyncSession
 
+@trace_service
 class ResumeService:
     @staticmethod
     def create_resume(db: Session, resume: ResumeCreate, user_id: int):
-        """Create a new resume"""
+        """Create a new resume as the user's next version"""
+        latest = db.query(func.max(Resume.version)).filter(Resume.user_id == user_id).scalar()
         db_resume = Resume(
             user_id=user_id,
             filename=resume.filename,
             content=resume.content,
             skills=resume.skills,
-            experience_years=resume.experience_years
+            experience_years=resume.experience_years,
+            file_sha256=resume.file_sha256,
+            version=(latest or 0) + 1,
         )
         db.add(db_resume)
         db.commit()
         db.refresh(db_resume)
         return db_resume
 
+    @staticmethod
+    async def create_resume_async(db: AsyncSession, resume: ResumeCreate, user_id: int):
+        latest = await db.scalar(select(func.max(Resume.version)).where(Resume.user_id == user_id))
+        db_resume = Resume(
+            user_id=user_id,
+            filename=resume.filename,
+            content=resume.content,
+            skills=resume.skills,
+            experience_years=resume.experience_years,
+            file_sha256=resume.file_sha256,
+            version=(latest or 0) + 1,
+        )
+        db.add(db_resume)
+        await db.commit()
+        await db.refresh(db_resume)
+        return db_resume
+
+    @staticmethod
+    def create_resumes(db: Session, resumes: List[ResumeCreate], user_id: int) -> List[Resume]:
+        """Create several resumes in one transaction, versioned in list order"""
+        latest = db.query(func.max(Resume.version)).filter(Resume.user_id == user_id).scalar() or 0
+        db_resumes = [
+            Resume(
+                user_id=user_id,
+                filename=resume.filename,
+                content=resume.content,
+                skills=resume.skills,
+                experience_years=resume.experience_years,
+                file_sha256=resume.file_sha256,
+                version=latest + i,
+            )
+            for i, resume in enumerate(resumes, start=1)
+        ]
+        db.add_all(db_resumes)
+        db.commit()
+        # one SELECT reloads every expired instance instead of a refresh per row
+        db.query(Resume).filter(Resume.id.in_([r.id for r in db_resumes])).all()
+        return db_resumes
+
     @staticmethod
     def get_resume(db: Session, resume_id: int):
         """Get resume by ID"""
         return db.query(Resume).filter(Resume.id == resume_id).first()
 
+    @staticmethod
+    async def get_resume_async(db: AsyncSession, resume_id: int):
+        return await db.get(Resume, resume_id)
+
+    @staticmethod
+    def get_by_hash(db: Session, user_id: int, file_sha256: str):
+        """Get a user's resume uploaded from identical file bytes"""
+        return db.query(Resume).filter(Resume.user_id == user_id, Resume.file_sha256 == file_sha256).first()
+
+    @staticmethod
+    async def get_by_hash_async(db: AsyncSession, user_id: int, file_sha256: str):
+        return await db.scalar(
+            select(Resume).where(Resume.user_id == user_id, Resume.file_sha256 == file_sha256).limit(1)
+        )
+
+    @staticmethod
+    def get_hashes(db: Session, user_id: int) -> Dict[str, int]:
+        """Map of file sha256 to resume id for a user's uploads"""
+        rows = db.query(Resume.file_sha256, Resume.id).filter(Resume.user_id == user_id, Resume.file_sha256.isnot(None))
+        return {sha: resume_id for sha, resume_id in rows}
+
     @staticmethod
     def get_user_resumes(db: Session, user_id: int):
         """Get all resumes for a user"""
@@ -44,6 +115,7 @@ class ResumeService:
         resume_id: int,
         skills: List[str],
         experience_years: Optional[float],
+        role: Optional[str] = None,
     ):
         resume = db.query(Resume).filter(Resume.id == resume_id).first()
         if not resume:
@@ -52,6 +124,7 @@ class ResumeService:
         # store skills as native JSON list
         resume.skills = skills
         resume.experience_years = experience_years
+        resume.role = role
 
         db.commit()
         db.refresh(resume)
@@ -1,6 +1,7 @@
 from typing import Dict, List
 from app.models.resume import Resume
 from app.models.job import Job
+from app.core.tracing import trace_service
 
 
 SKILL_CATEGORIES = {
@@ -20,6 +21,7 @@ SKILL_CATEGORIES = {
 }
 
 
+@trace_service
 class SkillGapService:
     @staticmethod
     def categorize(skill: str) -> str:
@@ -0,0 +1,462 @@
+from __future__ import annotations
+
+import json
+import logging
+import os
+import shutil
+import threading
+import time
+from typing import TYPE_CHECKING, Dict, FrozenSet, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.skills import normalize_skill
+from app.core.tracing import trace_service
+from app.models.job import Job
+from app.models.resume import Resume
+
+if TYPE_CHECKING:
+    import numpy as np
+
+# On-disk skill index shared by every worker process.
+#
+# SKILL_INDEX_DIR/
+#   CURRENT                 name of the live generation, replaced atomically
+#   gen-<ms>-<pid>/
+#     meta.json             build time and counts
+#     vocab.npy             sorted normalized skills (fixed-width unicode)
+#     <side>_ids.npy        entity ids, row order           (side = jobs | resumes)
+#     <side>_skills.npy     distinct indexed skills per row
+#     <side>_indptr.npy     CSR offsets, len(vocab) + 1
+#     <side>_postings.npy   row numbers per skill, ascending
+#     resumes_exp.npy       experience_years per resume row, NaN when unknown
+#
+# Workers np.load(..., mmap_mode="r") these files, so every process reads the
+# same page-cache pages: RAM stays flat as workers are added and opening an
+# index costs a few syscalls, not a DB scan. Writes since the generation was
+# built live in a per-process delta that is consulted on every query.
+#
+# The delta is kept small by rebuilding: a worker whose generation is older than
+# SKILL_INDEX_REBUILD_SECONDS, or whose delta reaches SKILL_INDEX_MAX_DELTA, builds
+# a new generation on a background thread, reading the primary. BUILD_LOCK (created
+# with O_EXCL) lets only one worker build at a time; the others drop their covered
+# delta entries when they map the result.
+
+SIDES = ("jobs", "resumes")
+# skills longer than this are prose, not skills; keeping them would widen every vocab entry
+MAX_SKILL_LENGTH = 64
+_CURRENT = "CURRENT"
+# bumped when the stored vocabulary changes meaning (e.g. normalization); older generations are rebuilt
+INDEX_FORMAT = 2
+_BUILD_LOCK = "BUILD_LOCK"
+# a worker whose background build failed or was skipped waits this long before trying again
+REBUILD_RETRY_SECONDS = 60.0
+
+
+def normalize_skills(skills: Optional[Iterable[str]]) -> FrozenSet[str]:
+    """The matchers' normalized skills (app.core.skills), minus blanks and over-long entries."""
+    normalized = (normalize_skill(s) for s in skills or [] if s)
+    return frozenset(s for s in normalized if s and len(s) <= MAX_SKILL_LENGTH)
+
+
+def _csr(rows: List[FrozenSet[str]], term_ids: Dict[str, int]) -> Tuple["np.ndarray", "np.ndarray"]:
+    import numpy as np
+
+    counts = np.zeros(len(term_ids) + 1, dtype=np.int64)
+    for skills in rows:
+        for skill in skills:
+            counts[term_ids[skill] + 1] += 1
+    indptr = np.cumsum(counts)
+
+    postings = np.empty(int(indptr[-1]), dtype=np.int32)
+    cursor = indptr[:-1].copy()
+    # rows are visited in order, so each posting list comes out ascending
+    for row, skills in enumerate(rows):
+        for skill in skills:
+            term = term_ids[skill]
+            postings[cursor[term]] = row
+            cursor[term] += 1
+    return indptr, postings
+
+
+def _write_generation(root: str, jobs: Dict[int, FrozenSet[str]], resumes: Dict[int, Tuple[FrozenSet[str], Optional[float]]], started_at: float) -> str:
+    import numpy as np
+
+    vocab = sorted(set().union(*jobs.values(), *(skills for skills, _ in resumes.values())))
+    term_ids = {term: i for i, term in enumerate(vocab)}
+
+    name = f"gen-{int(time.time() * 1000)}-{os.getpid()}"
+    tmp_path = os.path.join(root, f".{name}.tmp")
+    os.makedirs(tmp_path)
+
+    def save(filename: str, array) -> None:
+        np.save(os.path.join(tmp_path, filename), array, allow_pickle=False)
+
+    save("vocab.npy", np.array(vocab, dtype=f"<U{max(map(len, vocab), default=1)}"))
+
+    job_ids = sorted(jobs)
+    job_rows = [jobs[i] for i in job_ids]
+    indptr, postings = _csr(job_rows, term_ids)
+    save("jobs_ids.npy", np.array(job_ids, dtype=np.int64))
+    save("jobs_skills.npy", np.array([len(s) for s in job_rows], dtype=np.int32))
+    save("jobs_indptr.npy", indptr)
+    save("jobs_postings.npy", postings)
+
+    resume_ids = sorted(resumes)
+    resume_rows = [resumes[i][0] for i in resume_ids]
+    indptr, postings = _csr(resume_rows, term_ids)
+    save("resumes_ids.npy", np.array(resume_ids, dtype=np.int64))
+    save("resumes_skills.npy", np.array([len(s) for s in resume_rows], dtype=np.int32))
+    save("resumes_indptr.npy", indptr)
+    save("resumes_postings.npy", postings)
+    exp = [resumes[i][1] for i in resume_ids]
+    save("resumes_exp.npy", np.array([np.nan if e is None else e for e in exp], dtype=np.float32))
+
+    meta = {"format": INDEX_FORMAT, "started_at": started_at, "built_at": time.time(), "skills": len(vocab), "jobs": len(job_ids), "resumes": len(resume_ids)}
+    with open(os.path.join(tmp_path, "meta.json"), "w") as f:
+        json.dump(meta, f)
+
+    # readers only ever see complete generations: the directory is renamed into place,
+    # then CURRENT is swapped with a rename as well
+    os.rename(tmp_path, os.path.join(root, name))
+    current_tmp = os.path.join(root, f".{_CURRENT}.{os.getpid()}.tmp")
+    with open(current_tmp, "w") as f:
+        f.write(name)
+        f.flush()
+        os.fsync(f.fileno())
+    os.replace(current_tmp, os.path.join(root, _CURRENT))
+    return name
+
+
+def _prune_generations(root: str, keep: int) -> None:
+    # workers still mapping a removed generation keep reading it until they swap;
+    # the unlinked files stay valid for as long as they are mapped
+    generations = sorted(n for n in os.listdir(root) if n.startswith("gen-"))
+    for name in generations[:-keep] if keep > 0 else []:
+        shutil.rmtree(os.path.join(root, name), ignore_errors=True)
+
+
+class _Side:
+    def __init__(self, path: str, side: str):
+        import numpy as np
+
+        def load(suffix: str):
+            return np.load(os.path.join(path, f"{side}_{suffix}.npy"), mmap_mode="r")
+
+        self.ids = load("ids")
+        self.skills = load("skills")
+        self.indptr = load("indptr")
+        self.postings = load("postings")
+        self.exp = load("exp") if side == "resumes" else None
+
+
+class _Generation:
+    def __init__(self, root: str, name: str):
+        import numpy as np
+
+        path = os.path.join(root, name)
+        self.name = name
+        with open(os.path.join(path, "meta.json")) as f:
+            self.meta = json.load(f)
+        self.vocab = np.load(os.path.join(path, "vocab.npy"), mmap_mode="r")
+        self.sides = {side: _Side(path, side) for side in SIDES}
+
+    def term_ids(self, skills: FrozenSet[str]) -> List[int]:
+        import numpy as np
+
+        if not skills or not len(self.vocab):
+            return []
+        terms = np.array(sorted(skills))
+        positions = np.searchsorted(self.vocab, terms)
+        positions = np.minimum(positions, len(self.vocab) - 1)
+        return [int(p) for p, t in zip(positions, terms) if self.vocab[p] == t]
+
+    def match(self, side: str, skills: FrozenSet[str]) -> Dict[int, Tuple[int, int, Optional[float]]]:
+        """entity id -> (matched skills, indexed skills, experience) for entities sharing a skill."""
+        import numpy as np
+
+        index = self.sides[side]
+        term_ids = self.term_ids(skills)
+        if not term_ids:
+            return {}
+        rows, matched = np.unique(
+            np.concatenate([index.postings[index.indptr[t]:index.indptr[t + 1]] for t in term_ids]),
+            return_counts=True,
+        )
+        ids = index.ids[rows]
+        totals = index.skills[rows]
+        exp = index.exp[rows] if index.exp is not None else None
+        return {
+            int(ids[i]): (
+                int(matched[i]),
+                int(totals[i]),
+                None if exp is None or np.isnan(exp[i]) else float(exp[i]),
+            )
+            for i in range(len(rows))
+        }
+
+
+class _Delta:
+    """Writes made in this process since the live generation was built."""
+
+    def __init__(self):
+        # id -> (skills, experience, recorded at); skills None marks a deletion
+        self.entries: Dict[str, Dict[int, Tuple[Optional[FrozenSet[str]], Optional[float], float]]] = {side: {} for side in SIDES}
+
+    def put(self, side: str, entity_id: int, skills: Optional[FrozenSet[str]], exp: Optional[float] = None) -> None:
+        self.entries[side][entity_id] = (skills, exp, time.time())
+
+    def drop_before(self, timestamp: float) -> None:
+        # entries recorded before the builder started reading are part of the new generation
+        for side in SIDES:
+            self.entries[side] = {k: v for k, v in self.entries[side].items() if v[2] >= timestamp}
+
+    def __len__(self) -> int:
+        return sum(len(e) for e in self.entries.values())
+
+
+_generation: Optional[_Generation] = None
+_delta = _Delta()
+_lock = threading.Lock()
+_checked_at = 0.0
+_building = threading.Event()
+_build_attempted_at = float("-inf")
+
+
+def _read_current(root: str) -> Optional[str]:
+    try:
+        with open(os.path.join(root, _CURRENT)) as f:
+            return f.read().strip() or None
+    except FileNotFoundError:
+        return None
+
+
+def _refresh(force: bool = False) -> Optional[_Generation]:
+    """Swap to the newest generation if CURRENT moved; checked at most every SKILL_INDEX_REFRESH_SECONDS."""
+    global _generation, _checked_at
+    now = time.monotonic()
+    if not force and now - _checked_at < settings.SKILL_INDEX_REFRESH_SECONDS:
+        return _generation
+    _checked_at = now
+
+    name = _read_current(settings.SKILL_INDEX_DIR)
+    if name is None or (_generation is not None and _generation.name == name):
+        return _generation
+
+    try:
+        generation = _Generation(settings.SKILL_INDEX_DIR, name)
+    except (OSError, ValueError) as e:
+        logging.warning("Could not open skill index generation %s: %s", name, e)
+        return _generation
+
+    with _lock:
+        _generation = generation
+        _delta.drop_before(generation.meta["started_at"])
+    logging.info("Opened skill index %s (%d skills, %d jobs, %d resumes)", name, generation.meta["skills"], generation.meta["jobs"], generation.meta["resumes"])
+    return generation
+
+
+def _acquire_build_lock(root: str) -> bool:
+    path = os.path.join(root, _BUILD_LOCK)
+    try:
+        if time.time() - os.path.getmtime(path) > settings.SKILL_INDEX_BUILD_LOCK_SECONDS:
+            # the builder that took it died without releasing it
+            os.remove(path)
+    except FileNotFoundError:
+        pass
+    try:
+        fd = os.open(path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+    except FileExistsError:
+        return False
+    with os.fdopen(fd, "w") as f:
+        f.write(str(os.getpid()))
+    return True
+
+
+def _release_build_lock(root: str) -> None:
+    try:
+        os.remove(os.path.join(root, _BUILD_LOCK))
+    except FileNotFoundError:
+        pass
+
+
+def _rebuild_in_background() -> None:
+    from app.db.database import SessionLocal
+
+    try:
+        # the primary, not the replica: the delta entries recorded before started_at are
+        # dropped on the swap, so the build must see every write committed before it started
+        db = SessionLocal()
+        try:
+            SkillIndexService.build(db)
+        finally:
+            db.close()
+    except Exception as e:
+        logging.exception("Background skill index build failed: %s", e)
+    finally:
+        _building.clear()
+
+
+def _maybe_rebuild() -> None:
+    """Start a background build when the generation is stale or the delta has grown too large."""
+    global _build_attempted_at
+    if _building.is_set() or time.monotonic() - _build_attempted_at < REBUILD_RETRY_SECONDS:
+        return
+    generation = _generation
+    age_limit = settings.SKILL_INDEX_REBUILD_SECONDS
+    if generation is not None and generation.meta.get("format") != INDEX_FORMAT:
+        stale = True
+    else:
+        stale = age_limit > 0 and (generation is None or time.time() - generation.meta["built_at"] >= age_limit)
+    if not stale and len(_delta) < settings.SKILL_INDEX_MAX_DELTA:
+        return
+    with _lock:
+        if _building.is_set():
+            return
+        _building.set()
+        _build_attempted_at = time.monotonic()
+    threading.Thread(target=_rebuild_in_background, name="skill-index-build", daemon=True).start()
+
+
+def _put(side: str, entity_id: int, skills: Optional[FrozenSet[str]], exp: Optional[float] = None) -> None:
+    with _lock:
+        _delta.put(side, entity_id, skills, exp)
+        size = len(_delta)
+    # entries only leave the delta once a generation containing them is mapped: dropping
+    # them any earlier would lose writes (and resurrect deleted rows) if that build never lands
+    if size == 2 * settings.SKILL_INDEX_MAX_DELTA:
+        logging.warning("Skill index delta reached %d entries; background builds are not keeping up", size)
+    _maybe_rebuild()
+
+
+def _ranked(side: str, skills: FrozenSet[str]) -> Dict[int, Tuple[int, int, Optional[float]]]:
+    generation = _refresh()
+    _maybe_rebuild()
+    found = generation.match(side, skills) if generation is not None else {}
+
+    with _lock:
+        delta = list(_delta.entries[side].items())
+    for entity_id, (entity_skills, exp, _) in delta:
+        found.pop(entity_id, None)
+        if entity_skills:
+            matched = len(skills & entity_skills)
+            if matched:
+                found[entity_id] = (matched, len(entity_skills), exp)
+    return found
+
+
+@trace_service
+class SkillIndexService:
+    """
+    Skill -> job / resume candidate lookup over a memory-mapped on-disk index.
+    Generations are written by build() (admin endpoint, `python -m app.services.skill_index_service`,
+    or a worker's background rebuild) and picked up by every worker; this process's writes since
+    then are kept in memory.
+    """
+
+    @staticmethod
+    def build(db: Session) -> Dict:
+        root = settings.SKILL_INDEX_DIR
+        os.makedirs(root, exist_ok=True)
+        if not _acquire_build_lock(root):
+            generation = _refresh(force=True)
+            return {"generation": generation.name if generation else None, "skipped": "another build is running"}
+        try:
+            return SkillIndexService._build(db, root)
+        finally:
+            _release_build_lock(root)
+
+    @staticmethod
+    def _build(db: Session, root: str) -> Dict:
+        started_at = time.time()
+
+        jobs = {
+            job_id: normalize_skills(skills)
+            for job_id, skills in db.query(Job.id, Job.required_skills).yield_per(1000)
+        }
+        resumes = {
+            resume_id: (normalize_skills(skills), exp)
+            for resume_id, skills, exp in db.query(Resume.id, Resume.skills, Resume.experience_years)
+            .filter(Resume.skills.isnot(None))
+            .yield_per(1000)
+        }
+
+        name = _write_generation(root, jobs, resumes, started_at)
+        _prune_generations(root, settings.SKILL_INDEX_KEEP_GENERATIONS)
+        generation = _refresh(force=True)
+        logging.info("Built skill index %s in %.2fs", name, time.time() - started_at)
+        return {"generation": name, **(generation.meta if generation else {})}
+
+    @staticmethod
+    def open() -> bool:
+        """Map the live generation if there is one. Never scans the DB."""
+        generation = _refresh(force=True)
+        if generation is None:
+            logging.warning("No skill index in %s yet; POST /api/admin/skill-index/rebuild to build one", settings.SKILL_INDEX_DIR)
+        return generation is not None
+
+    @staticmethod
+    def built_from() -> Optional[float]:
+        """Epoch time the mapped generation started reading the DB; later writes are not in it."""
+        generation = _refresh()
+        return generation.meta["started_at"] if generation is not None else None
+
+    @staticmethod
+    def add_job(job: Job) -> None:
+        _put("jobs", job.id, normalize_skills(job.required_skills))
+
+    @staticmethod
+    def remove_job(job_id: int) -> None:
+        _put("jobs", job_id, None)
+
+    @staticmethod
+    def add_resume(resume: Resume) -> None:
+        _put("resumes", resume.id, normalize_skills(resume.skills), resume.experience_years)
+
+    @staticmethod
+    def jobs_for_skills(skills: Iterable[str], limit: Optional[int] = 50) -> List[Dict]:
+        """Jobs sharing at least one skill, best coverage of their required skills first.
+
+        Candidates only: jobs deleted by another worker since the last build can appear,
+        so callers load the rows they return.
+        """
+        found = _ranked("jobs", normalize_skills(skills))
+        ranked = sorted(found.items(), key=lambda item: (-item[1][0] / item[1][1], -item[1][0], item[0]))
+        return [
+            {"job_id": job_id, "matched": matched, "required": total}
+            for job_id, (matched, total, _) in ranked[:limit]
+        ]
+
+    @staticmethod
+    def resumes_for_skills(skills: Iterable[str], min_years: Optional[float] = None, limit: Optional[int] = 50) -> List[Dict]:
+        """Resumes holding the most of the given skills, optionally with at least ``min_years`` experience."""
+        found = _ranked("resumes", normalize_skills(skills))
+        if min_years is not None:
+            found = {k: v for k, v in found.items() if v[2] is not None and v[2] >= min_years}
+        ranked = sorted(found.items(), key=lambda item: (-item[1][0], -(item[1][2] or 0), item[0]))
+        return [
+            {"resume_id": resume_id, "matched": matched, "experience_years": exp}
+            for resume_id, (matched, _, exp) in ranked[:limit]
+        ]
+
+    @staticmethod
+    def stats() -> Dict:
+        generation = _refresh()
+        return {
+            "generation": generation.name if generation else None,
+            **(generation.meta if generation else {}),
+            "delta": len(_delta),
+            "building": _building.is_set(),
+        }
+
+
+if __name__ == "__main__":
+    from app.db.database import SessionLocal
+
+    logging.basicConfig(level=logging.INFO)
+    session = SessionLocal()
+    try:
+        print(json.dumps(SkillIndexService.build(session)))
+    finally:
+        session.close()
@@ -0,0 +1,170 @@
+import heapq
+import logging
+import threading
+from typing import Dict, Iterable, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.tracing import trace_service
+from app.models.job import Job
+from app.models.resume import Resume
+
+TOP_K = 10
+# completions are looked up by prefix; nobody types 40 characters into a typeahead
+MAX_PREFIX_LENGTH = 40
+
+
+class _Node:
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        # normalized terms under this prefix, most frequent first (at most TOP_K)
+        self.top: List[str] = []
+
+
+class _PrefixIndex:
+    """Trie whose nodes cache their TOP_K most frequent completions.
+
+    A lookup is a walk of len(prefix) nodes plus a slice, independent of how
+    many terms share the prefix. Writers hold a lock; readers don't, since
+    each node's ``top`` list is replaced rather than mutated.
+    """
+
+    def __init__(self):
+        self._root = _Node()
+        self._counts: Dict[str, int] = {}
+        self._display: Dict[str, str] = {}
+        self._lock = threading.Lock()
+
+    def add(self, term: Optional[str], n: int = 1) -> None:
+        if not term or not term.strip():
+            return
+        display = term.strip()
+        key = display.lower()
+
+        with self._lock:
+            count = self._counts.get(key, 0) + n
+            self._counts[key] = count
+            self._display.setdefault(key, display)
+
+            node = self._root
+            for ch in key[:MAX_PREFIX_LENGTH]:
+                node = node.children.setdefault(ch, _Node())
+                top = node.top
+                if key in top or len(top) < TOP_K or self._counts[top[-1]] < count:
+                    ranked = [t for t in top if t != key] + [key]
+                    ranked.sort(key=lambda t: -self._counts[t])
+                    node.top = ranked[:TOP_K]
+
+    def remove(self, term: Optional[str], n: int = 1) -> None:
+        if not term or not term.strip():
+            return
+        key = term.strip().lower()
+
+        with self._lock:
+            count = self._counts.get(key)
+            if count is None:
+                return
+            if count > n:
+                self._counts[key] = count - n
+            else:
+                del self._counts[key]
+                del self._display[key]
+
+            path = []
+            node = self._root
+            for ch in key[:MAX_PREFIX_LENGTH]:
+                node = node.children.get(ch)
+                if node is None:
+                    break
+                path.append(node)
+
+            # a term that lost count can fall out of a node's top K, letting one that was
+            # never cached there in; refill those nodes from the terms under their prefix
+            stale = [depth for depth, node in enumerate(path) if key in node.top]
+            if not stale:
+                return
+            shallowest = key[:stale[0] + 1]
+            candidates = [t for t in self._counts if t.startswith(shallowest)]
+            for depth in stale:
+                prefix = key[:depth + 1]
+                path[depth].top = heapq.nsmallest(
+                    TOP_K, (t for t in candidates if t.startswith(prefix)), key=lambda t: -self._counts[t]
+                )
+
+    def suggest(self, prefix: str, limit: int = TOP_K) -> List[Dict]:
+        node = self._root
+        for ch in prefix.strip().lower()[:MAX_PREFIX_LENGTH]:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return [{"value": self._display[t], "count": self._counts[t]} for t in node.top[:limit]]
+
+    def __len__(self) -> int:
+        return len(self._counts)
+
+
+_indexes: Dict[str, _PrefixIndex] = {"skill": _PrefixIndex(), "title": _PrefixIndex()}
+SUGGEST_KINDS = tuple(_indexes)
+
+
+def _distinct(skills: Optional[Iterable[str]]) -> Dict[str, str]:
+    """Each job or resume counts once per skill: normalized key -> first spelling."""
+    distinct: Dict[str, str] = {}
+    for skill in skills or []:
+        if skill and skill.strip():
+            distinct.setdefault(skill.strip().lower(), skill)
+    return distinct
+
+
+@trace_service
+class SuggestService:
+    """
+    In-process typeahead for skills and job titles. Counts are the number of jobs and
+    resumes using a term; built from the DB at startup and kept current as jobs are
+    created and deleted and resumes are (re-)analyzed.
+    """
+
+    @staticmethod
+    def build(db: Session) -> None:
+        _indexes["skill"] = skills = _PrefixIndex()
+        _indexes["title"] = titles = _PrefixIndex()
+
+        for title, required_skills in db.query(Job.title, Job.required_skills).yield_per(1000):
+            titles.add(title)
+            for skill in _distinct(required_skills).values():
+                skills.add(skill)
+
+        for (resume_skills,) in db.query(Resume.skills).filter(Resume.skills.isnot(None)).yield_per(1000):
+            for skill in _distinct(resume_skills).values():
+                skills.add(skill)
+
+        logging.info("Suggest index built: %d skills, %d titles", len(skills), len(titles))
+
+    @staticmethod
+    def add_job(job: Job) -> None:
+        _indexes["title"].add(job.title)
+        SuggestService.update_skills(None, job.required_skills)
+
+    @staticmethod
+    def remove_job(job: Job) -> None:
+        _indexes["title"].remove(job.title)
+        SuggestService.update_skills(job.required_skills, None)
+
+    @staticmethod
+    def update_skills(previous: Optional[Iterable[str]], current: Optional[Iterable[str]]) -> None:
+        """Count the skills one job or resume gained and uncount the ones it dropped."""
+        before, after = _distinct(previous), _distinct(current)
+        for key, skill in before.items():
+            if key not in after:
+                _indexes["skill"].remove(skill)
+        for key, skill in after.items():
+            if key not in before:
+                _indexes["skill"].add(skill)
+
+    @staticmethod
+    def suggest(prefix: str, kind: str = "skill", limit: int = TOP_K) -> List[Dict]:
+        if kind not in _indexes:
+            raise ValueError(f"Unknown suggestion kind '{kind}'. Use one of: {', '.join(SUGGEST_KINDS)}")
+        return _indexes[kind].suggest(prefix, limit)
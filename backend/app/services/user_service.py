@@ -1,14 +1,18 @@
+from typing import Optional
 from sqlalchemy.orm import Session
 from app.models.user import User
 from app.schemas.user import UserCreate
 from app.core.security import get_password_hash
 from app.core.security import verify_password
+from app.core import principal_cache
+from app.core.tracing import trace_service
 
 
+@trace_service
 class UserService:
     @staticmethod
-    def create_user(db: Session, user: UserCreate):
-        hashed = get_password_hash(user.password)
+    def create_user(db: Session, user: UserCreate, hashed_password: Optional[str] = None):
+        hashed = hashed_password or get_password_hash(user.password)
         db_user = User(email=user.email, hashed_password=hashed)
         db.add(db_user)
         db.commit()
@@ -23,6 +27,27 @@ class UserService:
     def get_by_id(db: Session, user_id: int):
         return db.query(User).filter(User.id == user_id).first()
     
+    @staticmethod
+    def update_password_hash(db: Session, user_id: int, hashed_password: str):
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            return None
+        user.hashed_password = hashed_password
+        db.commit()
+        return user
+
+    @staticmethod
+    def set_active(db: Session, user_id: int, is_active: bool):
+        user = db.query(User).filter(User.id == user_id).first()
+        if not user:
+            return None
+        user.is_active = is_active
+        db.commit()
+        db.refresh(user)
+        # cached tokens carry the old is_active; drop them now rather than at TTL expiry
+        principal_cache.invalidate_user(user_id)
+        return user
+
     @staticmethod
     def authenticate_user(db: Session, email: str, password: str):
         user = UserService.get_by_email(db, email)
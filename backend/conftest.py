@@ -0,0 +1,4 @@
+import os
+
+# app.core.config refuses to load without a secret; tests never issue real tokens
+os.environ.setdefault("JWT_SECRET_KEY", "test-secret")
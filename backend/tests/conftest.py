@@ -0,0 +1,29 @@
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.job import Job
+from app.models.resume import Resume
+from app.models.resume_recommendation import ResumeRecommendation
+from app.services import skill_index_service
+from app.services.skill_index_service import _Delta
+
+
+@pytest.fixture
+def skill_index_db(tmp_path, monkeypatch):
+    """Session on a fresh in-memory DB, with the skill index reset to nothing built or pending."""
+    monkeypatch.setattr(settings, "SKILL_INDEX_DIR", str(tmp_path / "skill_index"))
+    monkeypatch.setattr(settings, "SKILL_INDEX_REBUILD_SECONDS", 0.0)
+    monkeypatch.setattr(skill_index_service, "_generation", None)
+    monkeypatch.setattr(skill_index_service, "_delta", _Delta())
+    monkeypatch.setattr(skill_index_service, "_checked_at", 0.0)
+    monkeypatch.setattr(skill_index_service, "_build_attempted_at", float("-inf"))
+    skill_index_service._building.clear()
+
+    engine = create_engine("sqlite://")
+    for model in (Job, Resume, ResumeRecommendation):
+        model.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
@@ -0,0 +1,152 @@
+import asyncio
+
+import pytest
+
+from app.api import routes
+from app.core import admission
+from app.core.admission import ClassLimits, Overloaded, RateLimited, TokenBucket, _Gate
+
+
+class Clock:
+    def __init__(self):
+        self.now = 100.0
+
+    def monotonic(self):
+        return self.now
+
+    def perf_counter(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(admission, "time", clock)
+    return clock
+
+
+async def _settle():
+    # a waiter woken through wait_for needs a few loop iterations to resume
+    for _ in range(5):
+        await asyncio.sleep(0)
+
+
+def _gate(max_concurrent=1, queue_size=2, queue_timeout=5.0):
+    return _Gate("test", ClassLimits(max_concurrent, queue_size, queue_timeout, 0.0, 0.0))
+
+
+def test_bucket_allows_a_burst_then_refills_at_its_rate(clock):
+    bucket = TokenBucket(rate=2.0, capacity=3.0)
+    assert [bucket.take() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.take() == pytest.approx(0.5)
+
+    clock.now += 0.5
+    assert bucket.take() == 0.0
+    # refills never exceed the capacity
+    clock.now += 60
+    assert [bucket.take() for _ in range(4)][-1] > 0
+
+
+def test_refund_returns_a_token_up_to_the_capacity(clock):
+    bucket = TokenBucket(rate=1.0, capacity=1.0)
+    bucket.take()
+    bucket.refund()
+    bucket.refund()
+    assert bucket.tokens == 1.0
+
+
+def test_gate_hands_slots_to_waiters_in_arrival_order(clock):
+    async def scenario():
+        gate = _gate(queue_size=3)
+        order = []
+
+        async def request(name):
+            await gate.acquire()
+            order.append(name)
+
+        await gate.acquire()
+        tasks = [asyncio.create_task(request(name)) for name in ("a", "b")]
+        await _settle()
+        assert len(gate.waiters) == 2
+
+        # the freed slot is handed over, so a newcomer queues behind "b" instead of taking it
+        gate.release()
+        late = asyncio.create_task(request("late"))
+        await _settle()
+        assert order == ["a"]
+        assert len(gate.waiters) == 2
+
+        gate.release()
+        await _settle()
+        gate.release()
+        await asyncio.gather(*tasks, late)
+
+        assert order == ["a", "b", "late"]
+        assert gate.active == 1
+
+    asyncio.run(scenario())
+
+
+def test_gate_sheds_when_the_queue_is_full_or_the_wait_times_out(clock):
+    async def scenario():
+        gate = _gate(queue_size=1, queue_timeout=0.01)
+        await gate.acquire()
+
+        waiting = asyncio.create_task(gate.acquire())
+        await asyncio.sleep(0)
+        with pytest.raises(Overloaded) as exc:
+            await gate.acquire()
+        assert exc.value.reason == "queue_full"
+        assert exc.value.retry_after == 1
+
+        with pytest.raises(Overloaded) as exc:
+            await waiting
+        assert exc.value.reason == "queue_timeout"
+        assert not gate.waiters
+        assert gate.active == 1
+
+    asyncio.run(scenario())
+
+
+def test_cancelled_waiter_leaves_the_queue(clock):
+    async def scenario():
+        gate = _gate()
+        await gate.acquire()
+        waiting = asyncio.create_task(gate.acquire())
+        await asyncio.sleep(0)
+
+        waiting.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await waiting
+        assert not gate.waiters
+
+        gate.release()
+        assert gate.active == 0
+
+    asyncio.run(scenario())
+
+
+def test_class_rate_rejection_refunds_the_callers_token(clock, monkeypatch):
+    monkeypatch.setattr(admission.settings, "ADMISSION_ENABLED", True)
+    monkeypatch.setitem(admission.ENDPOINT_CLASSES, "test", ClassLimits(5, 5, 1.0, 1.0, 60.0))
+    monkeypatch.setitem(admission._gates, "test", _gate(max_concurrent=5))
+    monkeypatch.setitem(admission._class_buckets, "test", TokenBucket(rate=1.0, capacity=1.0))
+    monkeypatch.setattr(admission, "_caller_buckets", admission.TTLCache(maxsize=10, ttl=600))
+    monkeypatch.setattr(admission.settings, "ADMISSION_USER_BURST", 2)
+
+    async def scenario():
+        await admission.acquire("test", "user:1")
+        with pytest.raises(RateLimited) as exc:
+            await admission.acquire("test", "user:1")
+        assert exc.value.reason == "class_rate"
+        assert exc.value.status_code == 429
+        assert admission._caller_bucket("test", "user:1").tokens == pytest.approx(1.0)
+
+    asyncio.run(scenario())
+
+
+def test_every_admin_route_requires_the_admin_token():
+    admin_routes = [route for route in routes.router.routes if "/admin/" in route.path]
+    assert admin_routes
+    for route in admin_routes:
+        assert routes.require_admin in [d.call for d in route.dependant.dependencies], route.path
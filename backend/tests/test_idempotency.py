@@ -0,0 +1,135 @@
+import asyncio
+import json
+import uuid
+
+import pytest
+from fastapi import FastAPI, File, Form, Request, UploadFile
+from fastapi.responses import JSONResponse
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
+
+from app.core.security import create_access_token
+from app.models.idempotency_key import IdempotencyKey
+from app.services import idempotency_service
+from app.services.idempotency_service import IdempotencyService
+
+PDF = b"%PDF-1.4 resume bytes"
+
+
+@pytest.fixture
+def app(tmp_path, monkeypatch):
+    engine = create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'idempotency.db'}")
+
+    async def create_table():
+        async with engine.begin() as conn:
+            await conn.run_sync(IdempotencyKey.__table__.create)
+
+    asyncio.run(create_table())
+    monkeypatch.setattr(idempotency_service, "AsyncSessionLocal", async_sessionmaker(engine, expire_on_commit=False))
+    monkeypatch.setattr(idempotency_service, "_last_purge", float("inf"))
+
+    app = FastAPI()
+    app.state.uploads = []
+
+    @app.middleware("http")
+    async def idempotent_requests(request: Request, call_next):
+        key = request.headers.get("idempotency-key")
+        if key is None or not IdempotencyService.applies(request.method, request.url.path):
+            return await call_next(request)
+        return await IdempotencyService.handle(request, key, call_next)
+
+    @app.post("/api/resumes/upload")
+    async def upload(file: UploadFile = File(...), note: str = Form("")):
+        app.state.uploads.append((file.filename, await file.read(), note))
+        response = JSONResponse({"resume_id": len(app.state.uploads)}, status_code=201)
+        response.set_cookie("a", "1")
+        response.set_cookie("b", "2")
+        return response
+
+    yield app
+    asyncio.run(engine.dispose())
+
+
+def _multipart(filename: str, content: bytes, note: str):
+    boundary = uuid.uuid4().hex
+    body = (
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"note\"\r\n\r\n{note}\r\n"
+        f"--{boundary}\r\nContent-Disposition: form-data; name=\"file\"; filename=\"{filename}\"\r\n"
+        "Content-Type: application/pdf\r\n\r\n"
+    ).encode() + content + f"\r\n--{boundary}--\r\n".encode()
+    return f"multipart/form-data; boundary={boundary}", body
+
+
+def _upload(app, key: str, filename: str = "cv.pdf", content: bytes = PDF, note: str = "first"):
+    """POST a freshly encoded multipart upload through the ASGI app; returns (status, headers, body)."""
+    content_type, body = _multipart(filename, content, note)
+    token = create_access_token({"sub": "user@example.com", "user_id": 7})
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "POST",
+        "scheme": "http",
+        "path": "/api/resumes/upload",
+        "raw_path": b"/api/resumes/upload",
+        "query_string": b"",
+        "root_path": "",
+        "server": ("testserver", 80),
+        "client": ("127.0.0.1", 1234),
+        "headers": [
+            (b"host", b"testserver"),
+            (b"content-type", content_type.encode()),
+            (b"content-length", str(len(body)).encode()),
+            (b"authorization", f"Bearer {token}".encode()),
+            (b"idempotency-key", key.encode()),
+        ],
+    }
+    messages = [{"type": "http.request", "body": body, "more_body": False}]
+    sent = []
+
+    async def receive():
+        if messages:
+            return messages.pop(0)
+        await asyncio.sleep(3600)
+
+    async def send(message):
+        sent.append(message)
+
+    asyncio.run(app(scope, receive, send))
+    start = next(m for m in sent if m["type"] == "http.response.start")
+    payload = b"".join(m.get("body", b"") for m in sent if m["type"] == "http.response.body")
+    headers = [(n.decode().lower(), v.decode()) for n, v in start["headers"]]
+    return start["status"], headers, payload
+
+
+def test_retried_upload_is_replayed_despite_a_new_boundary(app):
+    status, headers, body = _upload(app, "k1")
+    assert status == 201
+    assert json.loads(body) == {"resume_id": 1}
+    assert ("idempotent-replayed", "true") not in headers
+
+    status, headers, body = _upload(app, "k1")
+    assert status == 201
+    assert json.loads(body) == {"resume_id": 1}
+    assert ("idempotent-replayed", "true") in headers
+    # the form parsed for the fingerprint still reaches the route intact
+    assert app.state.uploads == [("cv.pdf", PDF, "first")]
+
+
+def test_replay_keeps_repeated_headers(app):
+    first = _upload(app, "k2")[1]
+    replayed = _upload(app, "k2")[1]
+
+    cookies = [v for n, v in first if n == "set-cookie"]
+    assert len(cookies) == 2
+    assert [v for n, v in replayed if n == "set-cookie"] == cookies
+    assert [v for n, v in replayed if n == "content-length"] == [v for n, v in first if n == "content-length"]
+
+
+@pytest.mark.parametrize("change", [{"content": PDF + b"!"}, {"filename": "other.pdf"}, {"note": "second"}])
+def test_key_reused_for_another_upload_is_rejected(app, change):
+    _upload(app, "k3")
+    status, _, body = _upload(app, "k3", **change)
+
+    assert status == 422
+    assert "different request" in json.loads(body)["detail"]
+    assert len(app.state.uploads) == 1
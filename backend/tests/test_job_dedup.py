@@ -0,0 +1,121 @@
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.job import Job
+from app.models.job_signature import JobSignature
+from app.services import job_dedup_service
+from app.services.job_dedup_service import (
+    BANDS,
+    ROWS,
+    JobDedupService,
+    _band_keys,
+    _LSHIndex,
+    _pack,
+    similarity,
+)
+
+POSTING = (
+    "Senior Python Engineer",
+    "Acme",
+    "We are hiring a senior Python engineer to build data pipelines on AWS with Airflow, "
+    "design REST APIs in FastAPI, mentor junior developers and own our PostgreSQL schema. "
+    "You will work closely with product and data science on analytics features.",
+)
+REPOST = (POSTING[0], POSTING[1], POSTING[2].replace("closely", "tightly"))
+UNRELATED = (
+    "Pastry Chef",
+    "Bakery Co",
+    "Bake croissants and sourdough every morning, manage the oven schedule and train apprentices.",
+)
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite://")
+    Job.__table__.create(engine)
+    JobSignature.__table__.create(engine)
+    monkeypatch.setattr(job_dedup_service, "_index", _LSHIndex())
+    session = sessionmaker(bind=engine)()
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+def _signature(posting):
+    return JobDedupService.signature_for(*posting)
+
+
+def test_band_keys_cover_the_signature():
+    signature = _signature(POSTING)
+    keys = _band_keys(signature)
+
+    assert len(keys) == BANDS
+    assert [band for band, _ in keys] == list(range(BANDS))
+    assert all(len(rows) == ROWS for _, rows in keys)
+    assert sum((rows for _, rows in keys), ()) == signature
+
+
+def test_near_duplicate_shares_a_band_and_unrelated_does_not():
+    index = _LSHIndex()
+    index.add(1, _signature(POSTING))
+    index.add(2, _signature(UNRELATED))
+
+    assert 1 in index.candidates(_signature(REPOST))
+    assert similarity(_signature(POSTING), _signature(REPOST)) >= 0.8
+    assert 2 not in index.candidates(_signature(POSTING))
+    assert similarity(_signature(POSTING), _signature(UNRELATED)) < 0.2
+
+
+def test_remove_empties_buckets():
+    index = _LSHIndex()
+    index.add(1, _signature(POSTING))
+    index.remove(1)
+
+    assert index.buckets == {}
+    assert index.candidates(_signature(POSTING)) == set()
+
+
+def test_find_duplicate_confirms_against_existing_jobs(db):
+    db.add(Job(id=1, title=POSTING[0]))
+    db.commit()
+    JobDedupService.add(db, 1, _signature(POSTING))
+
+    job_id, score = JobDedupService.find_duplicate(db, _signature(REPOST))
+    assert job_id == 1 and score >= 0.8
+    assert JobDedupService.find_duplicate(db, _signature(UNRELATED)) is None
+
+
+def test_load_picks_up_lower_ids_committed_after_a_local_add(db):
+    now = datetime.utcnow()
+    db.add(JobSignature(job_id=1, signature=_pack(_signature(UNRELATED)), inserted_at=now - timedelta(minutes=10)))
+    db.commit()
+    JobDedupService.load(db)
+
+    # this worker ingests job 7; another worker inserted job 5 earlier but commits only now
+    JobDedupService.add(db, 7, _signature(UNRELATED))
+    db.add(Job(id=5, title=POSTING[0]))
+    db.add(JobSignature(job_id=5, signature=_pack(_signature(POSTING)), inserted_at=now - timedelta(seconds=30)))
+    db.commit()
+
+    assert 5 not in job_dedup_service._index.signatures
+    JobDedupService.load(db)
+    assert 5 in job_dedup_service._index.signatures
+    assert JobDedupService.find_duplicate(db, _signature(REPOST))[0] == 5
+
+
+def test_load_is_incremental(db):
+    db.add(JobSignature(job_id=1, signature=_pack(_signature(POSTING)), inserted_at=datetime.utcnow() - timedelta(days=1)))
+    db.commit()
+    JobDedupService.load(db)
+    assert job_dedup_service._index.loaded_until is not None
+
+    # rows older than the overlap window are not read again
+    db.query(JobSignature).delete()
+    db.add(JobSignature(job_id=2, signature=_pack(_signature(UNRELATED)), inserted_at=datetime.utcnow() - timedelta(days=2)))
+    db.commit()
+    JobDedupService.load(db)
+    assert 2 not in job_dedup_service._index.signatures
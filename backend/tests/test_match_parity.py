@@ -0,0 +1,129 @@
+import os
+import uuid
+
+import numpy as np
+import pytest
+
+from app.core.skills import normalize_skill, normalize_skills
+from app.models.job import Job
+from app.models.resume import Resume
+from app.services.job_match_search_service import MATCH_SCRIPT, PARITY_TOLERANCE, _top_jobs_body, _top_jobs_result
+from app.services.job_match_service import JobMatchService
+from app.services.job_search_service import JOB_INDEX_SETTINGS, JOB_MAPPINGS, JobSearchService
+
+SKILL_SPELLINGS = [
+    ("Python", "python"),
+    ("PostgreSQL", "postgresql"),
+    ("  Node.js ", "node.js"),
+    ("Café", "cafe"),
+    ("Señor-ML", "senor-ml"),
+    ("Straße", "strasse"),
+    ("Ørsted", "orsted"),
+    ("ÉLASTIC", "elastic"),
+]
+
+RESUME = {"skills": ["Python", "SQL", "Café", "Go"], "experience_years": 3}
+JOBS = [
+    {"required_skills": ["python", "sql"]},
+    {"required_skills": ["PYTHON", "Cafe", "Rust"]},
+    {"required_skills": ["Python", "python", "Kubernetes"]},
+    {"required_skills": ["  Go ", "Café", "sql", "Java", "Scala"]},
+    {"required_skills": ["Java"]},
+]
+
+
+@pytest.mark.parametrize("raw, expected", SKILL_SPELLINGS)
+def test_normalize_skill_folds_case_accents_and_whitespace(raw, expected):
+    assert normalize_skill(raw) == expected
+
+
+def test_python_scorer_ignores_case_and_accents():
+    resume = Resume(skills=["Python", "SQL"], experience_years=1)
+    result = JobMatchService.match_resume_to_job(resume, Job(required_skills=["python", "sql"]))
+
+    assert result["match_score"] == 80
+    assert result["matched_skills"] == ["python", "sql"]
+    assert result["missing_skills"] == []
+
+
+def test_duplicate_spellings_count_once():
+    resume = Resume(skills=["python"], experience_years=0)
+    result = JobMatchService.match_resume_to_job(resume, Job(required_skills=["Python", "PYTHON", "Rust"]))
+
+    # two distinct skills after normalization, like the keyword doc values
+    assert result["match_score"] == 35
+    assert result["missing_skills"] == ["Rust"]
+
+
+def test_script_params_use_the_shared_normalization():
+    resume = Resume(**RESUME)
+    params = _top_jobs_body(resume, 10, None, None)["query"]["script_score"]["script"]["params"]
+
+    assert params["resume_skills"] == sorted(normalize_skills(RESUME["skills"]))
+
+
+def test_es_scores_are_reported_like_the_python_scorer():
+    resume = Resume(skills=["python", "sql"], experience_years=0)
+    job = Job(id=1, required_skills=["Python", "SQL", "Go"])
+    expected = JobMatchService.match_resume_to_job(resume, job)["match_score"]
+    # ES computes script scores in float32
+    hit = {"_id": "1", "_score": float(np.float32(expected)), "_source": {}}
+
+    assert hit["_score"] != expected
+    assert _top_jobs_result({"hits": {"hits": [hit]}})[0]["match_score"] == expected
+
+
+def _es_client():
+    url = os.getenv("ELASTICSEARCH_URL")
+    if not url:
+        pytest.skip("ELASTICSEARCH_URL not set")
+    from elasticsearch import Elasticsearch
+
+    es = Elasticsearch(url)
+    if not es.ping():
+        pytest.skip(f"Elasticsearch not reachable at {url}")
+    return es
+
+
+@pytest.fixture
+def es_index():
+    es = _es_client()
+    index = f"test-match-parity-{uuid.uuid4().hex[:8]}"
+    es.indices.create(index=index, settings=JOB_INDEX_SETTINGS, mappings=JOB_MAPPINGS)
+    try:
+        yield es, index
+    finally:
+        es.indices.delete(index=index, ignore_unavailable=True)
+
+
+def test_normalizer_matches_elasticsearch(es_index):
+    es, index = es_index
+    for raw, _ in SKILL_SPELLINGS:
+        tokens = es.indices.analyze(index=index, normalizer="lowercase_ascii", text=raw.strip())["tokens"]
+        assert tokens[0]["token"] == normalize_skill(raw)
+
+
+def test_es_script_matches_python_scorer(es_index):
+    es, index = es_index
+    resume = Resume(**RESUME)
+    jobs = [Job(id=i, title=f"job {i}", **fields) for i, fields in enumerate(JOBS, start=1)]
+    for job in jobs:
+        es.index(index=index, id=job.id, document=JobSearchService._document(job))
+    es.indices.refresh(index=index)
+
+    body = _top_jobs_body(resume, len(jobs), None, None)
+    # inline source instead of the stored script, so the test leaves no cluster state behind
+    body["query"]["script_score"]["script"] = {
+        "lang": "painless",
+        "source": MATCH_SCRIPT,
+        "params": body["query"]["script_score"]["script"]["params"],
+    }
+    hits = {int(hit["_id"]): hit["_score"] for hit in es.search(index=index, body=body)["hits"]["hits"]}
+
+    for job in jobs:
+        expected = JobMatchService.match_resume_to_job(resume, job)["match_score"]
+        if expected == 0:
+            # no shared skill: the candidate filter keeps it out of ES results
+            assert job.id not in hits
+        else:
+            assert abs(hits[job.id] - expected) <= PARITY_TOLERANCE, job.required_skills
@@ -0,0 +1,81 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.api import routes
+from app.core import principal_cache
+from app.core.cache import TTLCache
+from app.core.principal_cache import Principal
+from app.models.user import User
+from app.services.user_service import UserService
+
+
+@pytest.fixture(autouse=True)
+def cache(monkeypatch):
+    monkeypatch.setattr(principal_cache, "_cache", TTLCache(maxsize=100, ttl=60))
+    monkeypatch.setattr(principal_cache, "_user_versions", {})
+
+
+@pytest.fixture
+def db(monkeypatch):
+    engine = create_engine("sqlite://")
+    User.__table__.create(engine)
+    Session = sessionmaker(bind=engine)
+    # get_current_user opens its own session on a cache miss
+    monkeypatch.setattr(routes, "SessionLocal", Session)
+    session = Session()
+    session.add(User(id=1, email="a@example.com", hashed_password="x", is_active=True))
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_cached_principal_is_returned_until_the_user_version_changes():
+    principal_cache.put("t1", Principal(id=1, is_active=True))
+    principal_cache.put("t2", Principal(id=1, is_active=True))
+    principal_cache.put("other", Principal(id=2, is_active=True))
+    assert principal_cache.get("t1") == Principal(id=1, is_active=True)
+
+    principal_cache.invalidate_user(1)
+
+    assert principal_cache.get("t1") is None
+    assert principal_cache.get("t2") is None
+    assert principal_cache.get("other") is not None
+    # a principal cached after the bump is valid again
+    principal_cache.put("t1", Principal(id=1, is_active=False))
+    assert principal_cache.get("t1") == Principal(id=1, is_active=False)
+
+
+def test_entry_expires_with_its_token(monkeypatch):
+    principal_cache.put("t", Principal(id=1, is_active=True), expires_at=1000.0)
+    monkeypatch.setattr(principal_cache.time, "time", lambda: 999.0)
+    assert principal_cache.get("t") is not None
+
+    monkeypatch.setattr(principal_cache.time, "time", lambda: 1000.0)
+    assert principal_cache.get("t") is None
+
+
+def test_deactivation_rejects_an_already_cached_token(db, monkeypatch):
+    monkeypatch.setattr(routes, "decode_access_token", lambda token: {"user_id": 1})
+    assert routes.get_current_user("Bearer t").id == 1
+
+    # later requests are served from the cache, without the token being decoded again
+    monkeypatch.setattr(routes, "decode_access_token", lambda token: pytest.fail("cache miss"))
+    assert routes.get_current_user("Bearer t").id == 1
+
+    assert routes.deactivate_user(1, db=db, current_user=None).is_active is False
+    monkeypatch.setattr(routes, "decode_access_token", lambda token: {"user_id": 1})
+    with pytest.raises(HTTPException) as exc:
+        routes.get_current_user("Bearer t")
+    assert exc.value.status_code == 401
+
+    routes.activate_user(1, db=db, current_user=None)
+    assert routes.get_current_user("Bearer t").id == 1
+
+
+def test_unknown_user_cannot_be_deactivated(db):
+    assert UserService.set_active(db, 99, False) is None
+    with pytest.raises(HTTPException) as exc:
+        routes.deactivate_user(99, db=db, current_user=None)
+    assert exc.value.status_code == 404
@@ -0,0 +1,57 @@
+from app.models.job import Job
+from app.models.resume import Resume
+from app.models.resume_recommendation import ResumeRecommendation
+from app.services import skill_index_service
+from app.services.recommendation_service import RecommendationService
+from app.services.skill_index_service import SkillIndexService
+
+
+def _feed(db, resume_id):
+    return [
+        job_id
+        for (job_id,) in db.query(ResumeRecommendation.job_id)
+        .filter(ResumeRecommendation.resume_id == resume_id)
+        .order_by(ResumeRecommendation.score.desc(), ResumeRecommendation.job_id)
+    ]
+
+
+def test_rebuild_all_matches_skills_case_and_accent_insensitively(skill_index_db):
+    skill_index_db.add(Job(id=1, title="Backend", required_skills=["Python", "SQL"]))
+    skill_index_db.add(Job(id=2, title="Cook", required_skills=["Pâtisserie"]))
+    skill_index_db.add(Resume(id=1, content="cv", skills=["python", "sql", "patisserie"]))
+    skill_index_db.commit()
+
+    assert RecommendationService.rebuild_all(skill_index_db) == {"resumes": 1, "entries": 2}
+    assert _feed(skill_index_db, 1) == [1, 2]
+
+
+def test_feed_includes_jobs_another_worker_created_after_the_build(skill_index_db):
+    skill_index_db.add(Job(id=1, title="Backend", required_skills=["Python"]))
+    resume = Resume(id=1, content="cv", skills=["Python", "SQL"])
+    skill_index_db.add(resume)
+    skill_index_db.commit()
+    SkillIndexService.build(skill_index_db)
+
+    # written by another worker: this process's delta never hears of it
+    skill_index_db.add(Job(id=2, title="Data", required_skills=["sql", "python"]))
+    skill_index_db.add(Job(id=3, title="Chef", required_skills=["cooking"]))
+    skill_index_db.commit()
+
+    RecommendationService.recompute_for_resume(skill_index_db, resume)
+    assert sorted(_feed(skill_index_db, 1)) == [1, 2]
+
+
+def test_new_job_reaches_resumes_analyzed_by_another_worker_after_the_build(skill_index_db):
+    skill_index_db.add(Resume(id=1, content="cv", skills=["Go"]))
+    skill_index_db.commit()
+    SkillIndexService.build(skill_index_db)
+
+    skill_index_db.add(Resume(id=2, content="cv", skills=["Kubernetes"]))
+    skill_index_db.commit()
+    job = Job(id=1, title="Platform", required_skills=["kubernetes"])
+    skill_index_db.add(job)
+    skill_index_db.commit()
+
+    assert RecommendationService.on_job_created(skill_index_db, job) == 1
+    assert _feed(skill_index_db, 2) == [1]
+    assert _feed(skill_index_db, 1) == []
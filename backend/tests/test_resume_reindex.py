@@ -0,0 +1,157 @@
+from datetime import datetime, timezone
+
+import pytest
+from elasticsearch import helpers
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.resume import Resume
+from app.services import resume_search_service
+from app.services.resume_search_service import RESUME_INDEX, ResumeSearchService
+
+
+class FakeIndices:
+    def __init__(self):
+        self.indices = {}
+        self.aliases = {}
+
+    def exists(self, index):
+        return index in self.indices or index in self.aliases
+
+    def exists_alias(self, name):
+        return bool(self.aliases.get(name))
+
+    def get_alias(self, name):
+        return {index: {} for index in self.aliases[name]}
+
+    def create(self, index, **kwargs):
+        assert index not in self.indices
+        self.indices[index] = {}
+
+    def delete(self, index):
+        for name in index.split(","):
+            del self.indices[name]
+
+    def refresh(self, index):
+        pass
+
+    def put_alias(self, index, name):
+        self.aliases.setdefault(name, set()).add(index)
+
+    def update_aliases(self, actions):
+        for action in actions:
+            (kind, args), = action.items()
+            if kind == "add":
+                self.aliases.setdefault(args["alias"], set()).add(args["index"])
+            elif kind == "remove":
+                self.aliases[args["alias"]].discard(args["index"])
+            elif kind == "remove_index":
+                del self.indices[args["index"]]
+
+    def resolve(self, name):
+        targets = self.aliases.get(name) or ({name} if name in self.indices else set())
+        assert len(targets) == 1, f"{name} resolves to {targets}"
+        return next(iter(targets))
+
+
+class FakeES:
+    def __init__(self):
+        self.indices = FakeIndices()
+        # called with the alias's target while a bulk load runs, e.g. to write concurrently
+        self.during_bulk = None
+
+    def index(self, index, id, document):
+        self.indices.indices[self.indices.resolve(index)][id] = document
+
+    def search_target(self):
+        return self.indices.indices[self.indices.resolve(RESUME_INDEX)]
+
+
+@pytest.fixture
+def es(monkeypatch):
+    es = FakeES()
+    monkeypatch.setattr(resume_search_service, "_index_ready", False)
+    # consecutive builds get distinct index names
+    clock = iter(range(10**6, 10**7))
+    monkeypatch.setattr(resume_search_service, "time", type("Clock", (), {"time": staticmethod(lambda: next(clock))}))
+
+    def bulk(client, actions):
+        actions = list(actions)
+        if client.during_bulk is not None:
+            client.during_bulk(client.search_target())
+        for action in actions:
+            client.indices.indices[action["_index"]][action["_id"]] = action["_source"]
+        return len(actions), []
+
+    monkeypatch.setattr(helpers, "bulk", bulk)
+    return es
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Resume.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    session.add_all([
+        Resume(id=1, user_id=1, content="cv", skills=["Python"]),
+        Resume(id=2, user_id=1, content="cv", skills=["Go"]),
+        Resume(id=3, user_id=1, content="cv"),  # uploaded, not analyzed yet
+    ])
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_rerun_keeps_serving_the_old_index_until_the_swap(es, db):
+    ResumeSearchService.create_index(es)
+    ResumeSearchService.reindex_all(es, db)
+    old = es.indices.resolve(RESUME_INDEX)
+
+    seen_during_build = []
+    es.during_bulk = lambda serving: seen_during_build.append(dict(serving))
+    assert ResumeSearchService.reindex_all(es, db) == 2
+
+    assert sorted(seen_during_build[0]) == [1, 2]
+    new = es.indices.resolve(RESUME_INDEX)
+    assert new != old
+    assert old not in es.indices.indices
+    assert sorted(es.search_target()) == [1, 2]
+
+
+def test_writes_during_the_build_are_copied_after_the_swap(es, db):
+    ResumeSearchService.create_index(es)
+
+    def analyze_during_build(serving):
+        resume = db.get(Resume, 3)
+        resume.skills = ["Rust"]
+        resume.updated_at = datetime.now(timezone.utc)
+        db.commit()
+        ResumeSearchService.index_resume(es, resume)
+
+    es.during_bulk = analyze_during_build
+    ResumeSearchService.reindex_all(es, db)
+
+    assert sorted(es.search_target()) == [1, 2, 3]
+    assert es.search_target()[3]["skills"] == ["Rust"]
+
+
+def test_legacy_index_is_replaced_in_the_alias_update(es, db):
+    es.indices.indices[RESUME_INDEX] = {99: {}}
+    assert ResumeSearchService.create_index(es) is False
+
+    ResumeSearchService.reindex_all(es, db)
+
+    assert RESUME_INDEX not in es.indices.indices
+    assert es.indices.resolve(RESUME_INDEX).startswith(f"{RESUME_INDEX}-v{resume_search_service.RESUME_INDEX_VERSION}-")
+    assert ResumeSearchService.create_index(es) is True
+
+
+def test_version_bump_waits_for_reindex(es, db, monkeypatch):
+    ResumeSearchService.create_index(es)
+    monkeypatch.setattr(resume_search_service, "_index_ready", False)
+    monkeypatch.setattr(resume_search_service, "RESUME_INDEX_VERSION", resume_search_service.RESUME_INDEX_VERSION + 1)
+
+    assert ResumeSearchService.create_index(es) is False
+    ResumeSearchService.reindex_all(es, db)
+    assert ResumeSearchService.create_index(es) is True
+    assert len(es.indices.indices) == 1
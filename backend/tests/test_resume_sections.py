@@ -0,0 +1,129 @@
+from types import SimpleNamespace
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from app.models.resume import Resume
+from app.models.resume_section import ResumeSection
+from app.schemas.resume_analysis import SectionExtraction
+from app.services.resume_analyzer_service import ResumeAnalyzerService
+from app.services.resume_section_service import HEADER_SECTION, ResumeSectionService
+
+RESUME = """Jane Doe
+jane@example.com
+
+Summary:
+Backend engineer.
+
+WORK HISTORY
+Acme, 2018-2024, Python and PostgreSQL
+
+Skills
+Python, Go
+"""
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Resume.__table__.create(engine)
+    ResumeSection.__table__.create(engine)
+    session = sessionmaker(bind=engine)()
+    yield session
+    session.close()
+
+
+@pytest.fixture
+def llm(monkeypatch):
+    """Fake analyze_sections: records the sections sent and extracts skills from their headings."""
+    fake = SimpleNamespace(calls=[], skipped=set())
+
+    def analyze_sections(sections):
+        fake.calls.append([heading for heading, _ in sections])
+        return [
+            None if heading in fake.skipped else SectionExtraction(skills=[heading.title()])
+            for heading, _ in sections
+        ]
+
+    monkeypatch.setattr(ResumeAnalyzerService, "analyze_sections", analyze_sections)
+    return fake
+
+
+def _resume(db, resume_id, content, user_id=1):
+    resume = Resume(id=resume_id, user_id=user_id, content=content)
+    db.add(resume)
+    db.commit()
+    return resume
+
+
+def test_split_keeps_document_order_and_drops_empty_sections():
+    sections = ResumeSectionService.split(RESUME + "\nREFERENCES\n\n")
+
+    assert [heading for heading, _ in sections] == [HEADER_SECTION, "Summary", "WORK HISTORY", "Skills"]
+    assert sections[0][1] == "Jane Doe\njane@example.com"
+    assert sections[2][1] == "Acme, 2018-2024, Python and PostgreSQL"
+
+
+@pytest.mark.parametrize("line", ["Python, Go", "I built APIs", "SQL", "A" * 41, "MANAGED A TEAM OF FIVE ENGINEERS"])
+def test_body_lines_are_not_headings(line):
+    assert ResumeSectionService.split(f"Skills\n{line}") == [("Skills", line)]
+
+
+def test_merge_dedupes_skills_and_takes_the_longest_span_and_first_role():
+    merged = ResumeSectionService.merge([
+        SectionExtraction(skills=["Python", " SQL "], role="Backend Engineer"),
+        SectionExtraction(skills=["python", "Go", ""], experience_years=6, role="Developer"),
+        SectionExtraction(experience_years=2),
+    ])
+
+    assert merged.skills == ["Python", "SQL", "Go"]
+    assert merged.experience_years == 6
+    assert merged.role == "Backend Engineer"
+    assert ResumeSectionService.merge([]).experience_years is None
+
+
+def test_unchanged_sections_of_an_earlier_version_are_reused(db, llm):
+    _, stats = ResumeSectionService.analyze(db, _resume(db, 1, RESUME))
+    assert stats == {"reused": 0, "analyzed": 4, "missing": 0}
+
+    edited = RESUME.replace("Python, Go", "Python, Go, Rust")
+    analysis, stats = ResumeSectionService.analyze(db, _resume(db, 2, edited))
+
+    assert llm.calls[-1] == ["Skills"]
+    assert stats == {"reused": 3, "analyzed": 1, "missing": 0}
+    assert analysis.skills == ["Header", "Summary", "Work History", "Skills"]
+    assert db.query(ResumeSection).filter(ResumeSection.resume_id == 2).count() == 4
+
+
+def test_cache_is_per_user_and_ignores_whitespace_and_case(db, llm):
+    ResumeSectionService.analyze(db, _resume(db, 1, RESUME))
+
+    ResumeSectionService.analyze(db, _resume(db, 2, RESUME, user_id=2))
+    assert len(llm.calls[-1]) == 4
+
+    _, stats = ResumeSectionService.analyze(db, _resume(db, 3, RESUME.replace("Backend engineer.", "backend   ENGINEER.")))
+    assert stats["reused"] == 4
+    assert len(llm.calls) == 2
+
+
+def test_sections_the_llm_skipped_are_retried_next_time(db, llm):
+    llm.skipped.add("Skills")
+    _, stats = ResumeSectionService.analyze(db, _resume(db, 1, RESUME))
+    assert stats == {"reused": 0, "analyzed": 3, "missing": 1}
+
+    llm.skipped.clear()
+    analysis, stats = ResumeSectionService.analyze(db, _resume(db, 2, RESUME))
+
+    assert llm.calls[-1] == ["Skills"]
+    assert stats == {"reused": 3, "analyzed": 1, "missing": 0}
+    assert "Skills" in analysis.skills
+
+
+def test_reanalysis_replaces_the_resumes_own_sections(db, llm):
+    resume = _resume(db, 1, RESUME)
+    ResumeSectionService.analyze(db, resume)
+    _, stats = ResumeSectionService.analyze(db, resume)
+
+    assert stats["reused"] == 4
+    assert [s.position for s in db.query(ResumeSection).order_by(ResumeSection.position)] == [0, 1, 2, 3]
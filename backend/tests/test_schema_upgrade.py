@@ -0,0 +1,76 @@
+import pytest
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import sessionmaker
+
+from app.db.database import Base
+from app.db.upgrade import RESUME_HASH_INDEX, upgrade_schema
+from app.models.resume import Resume
+
+# the resumes table as the baseline release created it
+BASELINE_RESUMES = """
+CREATE TABLE resumes (
+    id INTEGER PRIMARY KEY,
+    user_id INTEGER,
+    filename VARCHAR(255),
+    content TEXT NOT NULL,
+    skills JSON,
+    experience_years FLOAT,
+    created_at DATETIME DEFAULT CURRENT_TIMESTAMP,
+    updated_at DATETIME
+)
+"""
+
+
+@pytest.fixture
+def engine(tmp_path):
+    return create_engine(f"sqlite:///{tmp_path / 'upgrade.db'}")
+
+
+def _columns(engine):
+    return {column["name"] for column in inspect(engine).get_columns("resumes")}
+
+
+def test_baseline_resumes_table_gets_new_columns_and_index(engine):
+    with engine.begin() as conn:
+        conn.execute(text(BASELINE_RESUMES))
+        conn.execute(text("INSERT INTO resumes (id, user_id, content) VALUES (1, 7, 'cv')"))
+
+    assert upgrade_schema(engine) == ["resumes.role", "resumes.file_sha256", "resumes.version", RESUME_HASH_INDEX]
+    assert {"role", "file_sha256", "version"} <= _columns(engine)
+
+    # the ORM model works against the upgraded table
+    session = sessionmaker(bind=engine)()
+    assert session.get(Resume, 1).file_sha256 is None
+    session.close()
+
+    with engine.begin() as conn:
+        conn.execute(text("UPDATE resumes SET file_sha256 = 'abc' WHERE id = 1"))
+    with pytest.raises(IntegrityError):
+        with engine.begin() as conn:
+            conn.execute(text("INSERT INTO resumes (id, user_id, content, file_sha256) VALUES (2, 7, 'cv', 'abc')"))
+
+
+def test_duplicate_hashes_are_cleared_before_the_unique_index(engine):
+    with engine.begin() as conn:
+        conn.execute(text(BASELINE_RESUMES))
+        conn.execute(text("ALTER TABLE resumes ADD COLUMN file_sha256 VARCHAR(64)"))
+        for resume_id, user_id, sha in [(1, 7, "a"), (2, 7, "a"), (3, 8, "a"), (4, 7, "b"), (5, 7, "a")]:
+            conn.execute(
+                text("INSERT INTO resumes (id, user_id, content, file_sha256) VALUES (:id, :user, 'cv', :sha)"),
+                {"id": resume_id, "user": user_id, "sha": sha},
+            )
+
+    assert "resumes.file_sha256" not in upgrade_schema(engine)
+
+    with engine.connect() as conn:
+        rows = dict(conn.execute(text("SELECT id, file_sha256 FROM resumes")).all())
+    assert rows == {1: "a", 2: None, 3: "a", 4: "b", 5: None}
+
+
+def test_upgrade_is_a_no_op_on_a_current_schema(engine):
+    Base.metadata.create_all(bind=engine)
+    assert RESUME_HASH_INDEX in {index["name"] for index in inspect(engine).get_indexes("resumes")}
+
+    assert upgrade_schema(engine) == []
+    assert upgrade_schema(create_engine("sqlite://")) == []
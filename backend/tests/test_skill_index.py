@@ -0,0 +1,107 @@
+import os
+import time
+
+import pytest
+from sqlalchemy.orm import sessionmaker
+
+from app.core.config import settings
+from app.models.job import Job
+from app.services import skill_index_service
+from app.services.skill_index_service import SkillIndexService
+
+
+@pytest.fixture
+def builds(monkeypatch):
+    """Background builds started, recorded instead of run."""
+    started = []
+
+    def fake_rebuild():
+        started.append(time.time())
+        skill_index_service._building.clear()
+
+    monkeypatch.setattr(skill_index_service, "_rebuild_in_background", fake_rebuild)
+    return started
+
+
+def _settle():
+    # a started build runs on its own thread; wait for it to record itself
+    while skill_index_service._building.is_set():
+        time.sleep(0.001)
+
+
+def test_build_maps_generation_and_drops_covered_delta(skill_index_db):
+    skill_index_db.add(Job(id=1, title="Backend", required_skills=["Python", "SQL"]))
+    skill_index_db.commit()
+    SkillIndexService.remove_job(99)
+
+    stats = SkillIndexService.build(skill_index_db)
+
+    assert stats["jobs"] == 1
+    assert SkillIndexService.stats()["delta"] == 0
+    assert [j["job_id"] for j in SkillIndexService.jobs_for_skills(["python"])] == [1]
+
+
+def test_build_is_skipped_while_another_worker_holds_the_lock(skill_index_db):
+    os.makedirs(settings.SKILL_INDEX_DIR)
+    open(os.path.join(settings.SKILL_INDEX_DIR, "BUILD_LOCK"), "w").close()
+
+    assert SkillIndexService.build(skill_index_db)["skipped"]
+    assert SkillIndexService.stats()["generation"] is None
+
+
+def test_stale_build_lock_is_taken_over(skill_index_db, monkeypatch):
+    monkeypatch.setattr(settings, "SKILL_INDEX_BUILD_LOCK_SECONDS", 60.0)
+    os.makedirs(settings.SKILL_INDEX_DIR)
+    lock = os.path.join(settings.SKILL_INDEX_DIR, "BUILD_LOCK")
+    open(lock, "w").close()
+    os.utime(lock, (time.time() - 120, time.time() - 120))
+
+    assert SkillIndexService.build(skill_index_db)["generation"]
+    assert not os.path.exists(lock)
+
+
+def test_delta_size_triggers_rebuild_and_keeps_every_write(skill_index_db, builds, monkeypatch, caplog):
+    monkeypatch.setattr(settings, "SKILL_INDEX_MAX_DELTA", 3)
+
+    for job_id in range(1, 3):
+        SkillIndexService.remove_job(job_id)
+    _settle()
+    assert builds == []
+
+    for job_id in range(3, 20):
+        SkillIndexService.remove_job(job_id)
+    _settle()
+    assert len(builds) == 1  # later triggers wait for REBUILD_RETRY_SECONDS
+    # the build never landed, so nothing may be forgotten
+    assert set(skill_index_service._delta.entries["jobs"]) == set(range(1, 20))
+    assert "not keeping up" in caplog.text
+
+
+def test_failed_build_keeps_deletions_out_of_results(skill_index_db, monkeypatch):
+    skill_index_db.add_all([Job(id=1, title="Backend", required_skills=["Python"]), Job(id=2, title="Data", required_skills=["Python"])])
+    skill_index_db.commit()
+    SkillIndexService.build(skill_index_db)
+    SkillIndexService.remove_job(1)
+
+    monkeypatch.setattr(settings, "SKILL_INDEX_MAX_DELTA", 1)
+    monkeypatch.setattr(skill_index_service, "_write_generation", lambda *args: 1 / 0)
+    monkeypatch.setattr("app.db.database.SessionLocal", sessionmaker(bind=skill_index_db.get_bind()))
+    # enough writes that the old 2 * SKILL_INDEX_MAX_DELTA cap would have dropped job 1's deletion
+    for job_id in range(3, 6):
+        SkillIndexService.remove_job(job_id)
+    _settle()
+
+    assert [j["job_id"] for j in SkillIndexService.jobs_for_skills(["python"])] == [2]
+
+
+def test_stale_generation_triggers_rebuild(skill_index_db, builds, monkeypatch):
+    SkillIndexService.build(skill_index_db)
+    SkillIndexService.jobs_for_skills(["python"])
+    _settle()
+    assert builds == []
+
+    monkeypatch.setattr(settings, "SKILL_INDEX_REBUILD_SECONDS", 60.0)
+    skill_index_service._generation.meta["built_at"] -= 120
+    SkillIndexService.jobs_for_skills(["python"])
+    _settle()
+    assert len(builds) == 1
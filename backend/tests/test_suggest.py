@@ -0,0 +1,101 @@
+import pytest
+
+from app.models.job import Job
+from app.services import suggest_service
+from app.services.suggest_service import TOP_K, SuggestService, _PrefixIndex
+
+
+@pytest.fixture
+def index():
+    return _PrefixIndex()
+
+
+@pytest.fixture
+def skills(monkeypatch):
+    monkeypatch.setitem(suggest_service._indexes, "skill", _PrefixIndex())
+    monkeypatch.setitem(suggest_service._indexes, "title", _PrefixIndex())
+    return lambda prefix: {s["value"]: s["count"] for s in SuggestService.suggest(prefix, "skill")}
+
+
+def _values(index, prefix, limit=TOP_K):
+    return [s["value"] for s in index.suggest(prefix, limit)]
+
+
+def _brute_force_top(counts, prefix):
+    matching = sorted((t for t in counts if t.startswith(prefix)), key=lambda t: -counts[t])
+    return [counts[t] for t in matching[:TOP_K]]
+
+
+def test_prefix_lookup_is_case_insensitive_and_keeps_first_spelling(index):
+    index.add("PostgreSQL")
+    index.add("postgresql")
+    index.add("Python", 3)
+
+    assert index.suggest("p") == [{"value": "Python", "count": 3}, {"value": "PostgreSQL", "count": 2}]
+    assert _values(index, "POST") == ["PostgreSQL"]
+    assert _values(index, "x") == []
+    assert _values(index, "p", limit=1) == ["Python"]
+
+
+def test_each_node_keeps_the_top_k_by_count(index):
+    for i in range(TOP_K + 5):
+        index.add(f"skill{i:02d}", i + 1)
+
+    top = index.suggest("skill")
+    assert len(top) == TOP_K
+    assert [s["count"] for s in top] == sorted((i + 1 for i in range(TOP_K + 5)), reverse=True)[:TOP_K]
+    # a term climbing past the cut is cached on its way up
+    index.add("skill00", 100)
+    assert _values(index, "skill")[0] == "skill00"
+
+
+def test_removal_refills_the_top_k_from_terms_below_the_cut(index):
+    counts = {}
+    for i in range(TOP_K + 3):
+        term = f"go{i:02d}"
+        counts[term] = i + 1
+        index.add(term, i + 1)
+
+    leader = f"go{TOP_K + 2:02d}"
+    index.remove(leader, counts.pop(leader))
+    assert leader not in _values(index, "go")
+    assert [s["count"] for s in index.suggest("go")] == _brute_force_top(counts, "go")
+
+    index.remove("go11", 10)
+    counts["go11"] -= 10
+    for prefix in ("g", "go", "go1"):
+        assert [s["count"] for s in index.suggest(prefix)] == _brute_force_top(counts, prefix)
+
+
+def test_removing_an_unknown_term_is_a_no_op(index):
+    index.add("Rust")
+    index.remove("Ruby")
+    index.remove("")
+    assert index.suggest("r") == [{"value": "Rust", "count": 1}]
+
+
+def test_reanalysis_only_counts_the_skill_difference(skills):
+    SuggestService.update_skills(None, ["Python", "SQL"])
+    SuggestService.update_skills(["Python", "SQL"], ["python", "SQL", "Go"])
+
+    assert skills("p") == {"Python": 1}
+    assert skills("s") == {"SQL": 1}
+    assert skills("g") == {"Go": 1}
+
+    SuggestService.update_skills(["python", "SQL", "Go"], ["Go"])
+    assert skills("p") == {}
+    assert skills("s") == {}
+
+
+def test_job_delete_uncounts_its_title_and_skills(skills):
+    job = Job(title="Data Engineer", required_skills=["Python", "python", "Airflow"])
+    other = Job(title="Data Analyst", required_skills=["Python"])
+    SuggestService.add_job(job)
+    SuggestService.add_job(other)
+    assert skills("py") == {"Python": 2}
+
+    SuggestService.remove_job(job)
+
+    assert skills("py") == {"Python": 1}
+    assert skills("a") == {}
+    assert [s["value"] for s in SuggestService.suggest("data", "title")] == ["Data Analyst"]
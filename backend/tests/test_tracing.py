@@ -0,0 +1,147 @@
+import asyncio
+
+import pytest
+
+from app.core import tracing
+from app.core.config import settings
+from app.core.tracing import trace_service, traced
+
+TRACE_ID = "4bf92f3577b34da6a3ce929d0e0e4736"
+PARENT_ID = "00f067aa0ba902b7"
+
+
+@pytest.fixture
+def exported(monkeypatch):
+    """Traces handed to the exporter, captured instead of written anywhere."""
+    traces = []
+    monkeypatch.setattr(settings, "TRACE_EXPORTER", "file")
+    monkeypatch.setattr(settings, "TRACE_SAMPLE_RATE", 1.0)
+    monkeypatch.setattr(tracing._exporter, "submit", traces.append)
+    return traces
+
+
+def _spans(trace):
+    return {s.name: s for s in trace.spans}
+
+
+@pytest.mark.parametrize("header", [None, "", "garbage", f"00-{TRACE_ID}-short-01", f"00-{TRACE_ID}-{PARENT_ID}-zz"])
+def test_invalid_traceparent_is_ignored(header):
+    assert tracing._parse_traceparent(header) is None
+
+
+def test_traceparent_is_parsed():
+    assert tracing._parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-01") == (TRACE_ID, PARENT_ID, True)
+    assert tracing._parse_traceparent(f"00-{TRACE_ID}-{PARENT_ID}-00") == (TRACE_ID, PARENT_ID, False)
+
+
+def test_unsampled_request_records_nothing(exported, monkeypatch):
+    monkeypatch.setattr(settings, "TRACE_SAMPLE_RATE", 0.0)
+
+    with tracing.start_trace("GET /") as root:
+        with tracing.span("work") as child:
+            assert root is None and child is None
+    assert exported == []
+
+
+def test_disabled_exporter_ignores_sampled_parent(exported, monkeypatch):
+    monkeypatch.setattr(settings, "TRACE_EXPORTER", "none")
+
+    with tracing.start_trace("GET /", f"00-{TRACE_ID}-{PARENT_ID}-01") as root:
+        assert root is None
+    assert exported == []
+
+
+def test_sampled_parent_decides_over_local_rate(exported, monkeypatch):
+    monkeypatch.setattr(settings, "TRACE_SAMPLE_RATE", 0.0)
+
+    with tracing.start_trace("GET /", f"00-{TRACE_ID}-{PARENT_ID}-01") as root:
+        pass
+    assert root.trace_id == TRACE_ID
+    assert root.parent_id == PARENT_ID
+    assert tracing.traceparent_for(root) == f"00-{TRACE_ID}-{root.span_id}-01"
+
+    with tracing.start_trace("GET /", f"00-{TRACE_ID}-{PARENT_ID}-00") as root:
+        assert root is None
+    assert len(exported) == 1
+
+
+def test_nested_spans_form_a_tree_and_the_current_span_is_restored(exported):
+    with tracing.start_trace("GET /") as root:
+        with tracing.span("service") as service:
+            with tracing.span("sql", kind="client", statement="SELECT 1"):
+                assert tracing.current_span().name == "sql"
+            assert tracing.current_span() is service
+        assert tracing.current_span() is root
+    assert tracing.current_span() is None
+
+    spans = _spans(exported[0])
+    assert spans["service"].parent_id == root.span_id
+    assert spans["sql"].parent_id == spans["service"].span_id
+    assert spans["sql"].attributes == {"statement": "SELECT 1"}
+    assert all(s.end_ns is not None for s in exported[0].spans)
+
+
+def test_errors_are_recorded_on_the_failing_span_and_the_root(exported):
+    with pytest.raises(ValueError):
+        with tracing.start_trace("GET /"):
+            with tracing.span("service"):
+                raise ValueError("boom")
+
+    spans = _spans(exported[0])
+    assert "boom" in spans["service"].error
+    assert "boom" in spans["GET /"].error
+
+
+def test_span_cap_drops_and_counts_extra_spans(exported, monkeypatch):
+    monkeypatch.setattr(settings, "TRACE_MAX_SPANS", 3)
+
+    with tracing.start_trace("GET /"):
+        for _ in range(5):
+            with tracing.span("sql"):
+                pass
+
+    assert len(exported[0].spans) == 3
+    assert exported[0].dropped == 3
+
+
+def test_trace_follows_the_request_into_threads_and_awaits(exported):
+    @trace_service
+    class Service:
+        @staticmethod
+        def lookup():
+            with tracing.span("sql"):
+                return tracing.current_span().name
+
+        @staticmethod
+        async def lookup_async():
+            await asyncio.sleep(0)
+            return await asyncio.to_thread(Service.lookup)
+
+        @staticmethod
+        def _private():
+            return tracing.current_span()
+
+    async def handler():
+        with tracing.start_trace("GET /"):
+            assert await Service.lookup_async() == "sql"
+            assert Service._private().name == "GET /"
+
+    asyncio.run(handler())
+
+    spans = _spans(exported[0])
+    assert spans["Service.lookup_async"].parent_id == spans["GET /"].span_id
+    assert spans["Service.lookup"].parent_id == spans["Service.lookup_async"].span_id
+    assert spans["sql"].parent_id == spans["Service.lookup"].span_id
+    assert spans["Service.lookup"].kind == "service"
+    # the async span stays open for the whole await, not just the coroutine's creation
+    assert spans["Service.lookup_async"].end_ns >= spans["Service.lookup"].end_ns
+    assert "Service._private" not in spans
+
+
+def test_traced_outside_a_trace_just_calls_through(exported):
+    @traced("plain")
+    def plain(x):
+        return x + 1
+
+    assert plain(1) == 2
+    assert exported == []
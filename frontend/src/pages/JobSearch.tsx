@@ -8,11 +8,12 @@ type SearchHit = {
   source: {
     title: string;
     company: string;
-    description: string;
+    description?: string;
     required_skills?: string[];
     location?: string;
     salary?: string;
   };
+  snippet?: string;
 };
 
 type SearchJobsResponse = {
@@ -34,7 +35,7 @@ const JobSearch: React.FC = () => {
         id: Number(r.job_id),
         title: r.source.title,
         company: r.source.company,
-        description: r.source.description,
+        description: r.snippet ?? r.source.description ?? "",
         required_skills: r.source.required_skills || [],
         location: r.source.location || "",
         salary: r.source.salary || "",